@@ -4,12 +4,22 @@ import os
 # Add the current directory to Python path so we can import from app
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, render_template_string, request, jsonify, g, stream_with_context
 from datetime import datetime, timedelta
-from sqlalchemy import select, func, create_engine
+from sqlalchemy import select, func, create_engine, tuple_, Float, cast
 from sqlalchemy.orm import sessionmaker
+import base64
+import csv
+import hashlib
+import io
+import json
 import os
+import uuid
 import app.config as config
+from app.logger import logger
+from app.profiling import Profiler
+from app.content import decompress_html, html_to_text
+from api.cache import DataVersion, LruCache, TtlCache
 # Create synchronous database engine for API
 POSTGRES_USERNAME = os.getenv('POSTGRES_USERNAME', config.POSTGRES_USERNAME)
 POSTGRES_PASSWORD = os.getenv('POSTGRES_PASSWORD', config.POSTGRES_PASSWORD)
@@ -22,8 +32,41 @@ DATABASE_URL = f"postgresql://{POSTGRES_USERNAME}:{POSTGRES_PASSWORD}@{POSTGRES_
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Bumped by the spider's NOTIFY after every write, invalidating cached results
+data_version = DataVersion(DATABASE_URL)
+stats_cache = TtlCache(ttl=config.API_STATS_CACHE_TTL, data_version=data_version)
+data_version_cache = TtlCache(ttl=config.API_DATA_VERSION_TTL, data_version=data_version)
+response_cache = LruCache(max_entries=config.API_RESPONSE_CACHE_SIZE)
+
 app = Flask(__name__)
 
+profiler = Profiler("request", config.PROFILE_REQUEST_SAMPLE_RATE)
+
+
+@app.before_request
+def start_profile():
+    """Profile a sampled share of requests, named by their X-Request-ID or a generated one"""
+    if not profiler.enabled:
+        return
+    request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    # Keep the id usable as a file name
+    request_id = ''.join(c for c in request_id if c.isalnum() or c in '-_')[:64] or uuid.uuid4().hex
+    g.profile = profiler.session(f"{request.endpoint or 'unknown'}-{request_id}")
+
+
+@app.after_request
+def mark_profiled(response):
+    if g.get('profile') is not None:
+        response.headers['X-Profile-Id'] = g.profile.name
+    return response
+
+
+@app.teardown_request
+def stop_profile(exc):
+    session = g.pop('profile', None)
+    if session is not None:
+        session.stop()
+
 # HTML template for the form
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -130,6 +173,8 @@ HTML_TEMPLATE = """
             <a href="/api/articles">Get All Articles</a>
             <a href="/api/articles/count">Get Article Count</a>
             <a href="/api/articles/stats">Get Article Statistics</a>
+            <a href="/api/articles/search?q=ukraine">Search Articles</a>
+            <a href="/api/articles/facets">Get Top Tags and Authors</a>
         </div>
         
         <div id="results" class="results" style="display: none;">
@@ -184,91 +229,433 @@ HTML_TEMPLATE = """
 </html>
 """
 
-def get_articles_with_filters(start_date=None, end_date=None, limit=100):
-    """Get articles from database with optional time filters"""
+class InvalidCursor(ValueError):
+    pass
+
+class InvalidFields(ValueError):
+    pass
+
+class ArticleNotFound(LookupError):
+    pass
+
+# What a list entry can carry, ?fields= picks a subset. Full bodies only come from /api/articles/detail:
+# a list entry's content is the start of the body, which is also offered as preview, on request only
+LIST_FIELDS = ('url', 'title', 'subtitle', 'author', 'published_at', 'scraped_at', 'updated_at', 'tags', 'image_url', 'content', 'preview')
+DEFAULT_LIST_FIELDS = tuple(field for field in LIST_FIELDS if field != 'preview')
+PREVIEW_FIELDS = ('content', 'preview')
+DETAIL_FIELDS = ('url', 'title', 'subtitle', 'author', 'published_at', 'scraped_at', 'updated_at', 'tags', 'image_url', 'content_text')
+PREVIEW_LENGTH = 200
+# Raw HTML bodies open with markup, the preview is cut from at most this much of one so
+# that Postgres only has to read the beginning of long articles
+PREVIEW_SOURCE_LENGTH = 4000
+
+def _pack_cursor(values):
+    payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def _unpack_cursor(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+
+def encode_cursor(published_at, url):
+    """Opaque cursor pointing right after the article with this published_at and url"""
+    return _pack_cursor([published_at.isoformat(), url])
+
+def decode_cursor(cursor):
+    try:
+        published_at, url = _unpack_cursor(cursor)
+        return datetime.fromisoformat(published_at), str(url)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+def encode_search_cursor(rank, published_at, url):
+    """Opaque cursor pointing right after the search result with this rank, published_at and url"""
+    return _pack_cursor([rank, published_at.isoformat(), url])
+
+def decode_search_cursor(cursor):
+    try:
+        rank, published_at, url = _unpack_cursor(cursor)
+        return float(rank), datetime.fromisoformat(published_at), str(url)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+def clamp_page_size(limit):
+    return max(1, min(limit, config.API_MAX_PAGE_SIZE))
+
+def apply_article_filters(query, start_date=None, end_date=None, tags=None, author=None):
+    """Restrict query to articles in the time range carrying all of tags and written by author"""
     # Import Article model here to avoid circular import
     from app.models import Article
-    
+
+    if start_date:
+        query = query.where(Article.published_at >= start_date)
+    if end_date:
+        query = query.where(Article.published_at <= end_date)
+    if tags:
+        # tags @> ARRAY[...]::varchar[], answered by the GIN index on tags (a text[] operand
+        # would not match the column type)
+        query = query.where(Article.tags.contains(cast(tags, Article.tags.type)))
+    if author:
+        query = query.where(Article.author == author)
+    return query
+
+def parse_fields(value):
+    """Requested list fields in their canonical order, the default ones when none are given"""
+    fields = {field.strip() for field in (value or '').split(',') if field.strip()}
+    unknown = sorted(fields.difference(LIST_FIELDS))
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)}, expected any of {', '.join(LIST_FIELDS)}")
+    return tuple(field for field in LIST_FIELDS if field in fields) or DEFAULT_LIST_FIELDS
+
+def preview_expression():
+    """Plain-text start of the article body, computed by Postgres so the body never leaves it"""
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    # One character more than shown tells whether the preview was cut
+    from_text = func.replace(func.left(Article.content_text, PREVIEW_LENGTH + 1), '\n', ' ')
+
+    # Rows with raw HTML only: drop tags, including one cut off at the end, and collapse the whitespace left behind
+    text_only = func.regexp_replace(func.left(Article.content, PREVIEW_SOURCE_LENGTH), '<[^>]*(>|$)', ' ', 'g')
+    collapsed = func.btrim(func.regexp_replace(text_only, r'\s+', ' ', 'g'))
+    return func.coalesce(from_text, func.left(collapsed, PREVIEW_LENGTH + 1))
+
+def list_columns(fields):
+    """Columns of the requested fields, plus the published_at and url every cursor needs"""
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    names = dict.fromkeys(fields + ('published_at', 'url'))
+    return [
+        preview_expression().label(name) if name in PREVIEW_FIELDS else getattr(Article, name)
+        for name in names
+    ]
+
+def row_to_dict(row, fields):
+    values = row._mapping
+    article = {}
+    for name in fields:
+        value = values[name]
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif name in PREVIEW_FIELDS and value is not None and len(value) > PREVIEW_LENGTH:
+            value = value[:PREVIEW_LENGTH] + '...'
+        article[name] = value
+    return article
+
+def build_articles_query(
+    start_date=None, end_date=None, limit=100, cursor=None, tags=None, author=None, fields=DEFAULT_LIST_FIELDS
+):
+    """Page of articles newest first, ordered by (published_at, url) so every row has a stable position.
+
+    Pages continue with a row comparison against the cursor instead of an OFFSET, which the
+    (published_at, url) index answers without reading the skipped rows. One row more than
+    limit is selected to tell whether another page follows.
+    """
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    # Undated rows have no place in the ordering, the spider never stores them
+    query = select(*list_columns(fields)).where(Article.published_at.isnot(None))
+    query = apply_article_filters(query, start_date, end_date, tags, author)
+
+    if cursor:
+        query = query.where(tuple_(Article.published_at, Article.url) < tuple_(*decode_cursor(cursor)))
+
+    return query.order_by(Article.published_at.desc(), Article.url.desc()).limit(limit + 1)
+
+def get_articles_with_filters(
+    start_date=None, end_date=None, limit=100, cursor=None, tags=None, author=None, fields=DEFAULT_LIST_FIELDS
+):
+    """Get a page of articles with optional time, tag and author filters and the cursor of the next page"""
+    query = build_articles_query(start_date, end_date, limit, cursor, tags, author, fields)
+
     with SessionLocal() as session:
-        query = select(Article)
-        
-        if start_date:
-            query = query.where(Article.published_at >= start_date)
-        if end_date:
-            query = query.where(Article.published_at <= end_date)
-            
-        query = query.order_by(Article.published_at.desc()).limit(limit)
-        
-        result = session.execute(query)
-        articles = result.scalars().all()
+        rows = session.execute(query).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].published_at, rows[-1].url)
         
-        return [
-            {
-                'url': article.url,
-                'title': article.title,
-                'content': article.content[:200] + '...' if len(article.content) > 200 else article.content,
-                'author': article.author,
-                'published_at': article.published_at.isoformat() if article.published_at else None,
-                'scraped_at': article.scraped_at.isoformat() if article.scraped_at else None,
-                'subtitle': article.subtitle,
-                'tags': article.tags,
-                'image_url': article.image_url
-            }
-            for article in articles
-        ]
+        return [row_to_dict(row, fields) for row in rows], next_cursor
+
+def article_html(values):
+    """Body HTML of a row, decompressed only here; raw content for rows from before content_html_gz"""
+    if values.get('content_html_gz') is not None:
+        return decompress_html(values['content_html_gz'])
+    return values.get('content')
+
+def body_columns(html=False):
+    """Columns to read an article's text, and its HTML when asked for, from"""
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    columns = [Article.content_text, Article.content]
+    if html:
+        columns.append(Article.content_html_gz)
+    return columns
+
+def body_to_dict(values, html=False):
+    content_text = values['content_text']
+    if content_text is None and values['content'] is not None:
+        content_text = html_to_text(values['content'])
+    body = {'content_text': content_text}
+    if html:
+        body['content'] = article_html(values)
+    return body
+
+def get_article_detail(url, html=False):
+    """The whole article: its plain text, and its HTML when html is set"""
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    metadata = [getattr(Article, name) for name in DETAIL_FIELDS if name != 'content_text']
+    query = select(*metadata, *body_columns(html)).where(Article.url == url)
+    with SessionLocal() as session:
+        row = session.execute(query).first()
+
+    if row is None:
+        raise ArticleNotFound(f"No article with url {url}")
+    article = row_to_dict(row, [name for name in DETAIL_FIELDS if name != 'content_text'])
+    article.update(body_to_dict(row._mapping, html))
+    return article
+
+def build_search_query(q, start_date=None, end_date=None, limit=100, cursor=None, fields=DEFAULT_LIST_FIELDS):
+    """Page of articles matching a web search style query, best match first.
+
+    Matches come from the GIN index on search_vector, so the cost follows the number of
+    matching articles rather than the table size. Ties in rank keep the (published_at, url)
+    order of the article list, which makes the rank-first keyset cursor stable too.
+    """
+    # Import Article model here to avoid circular import
+    from app.models import Article, SEARCH_CONFIG
 
-def get_article_count(start_date=None, end_date=None):
-    """Get count of articles with optional time filters"""
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank(Article.search_vector, ts_query, type_=Float)
+    query = (
+        select(*list_columns(fields), rank.label('rank'))
+        .where(Article.search_vector.op('@@')(ts_query))
+        .where(Article.published_at.isnot(None))
+    )
+    query = apply_article_filters(query, start_date, end_date)
+
+    if cursor:
+        query = query.where(tuple_(rank, Article.published_at, Article.url) < tuple_(*decode_search_cursor(cursor)))
+
+    return query.order_by(rank.desc(), Article.published_at.desc(), Article.url.desc()).limit(limit + 1)
+
+def search_articles(q, start_date=None, end_date=None, limit=100, cursor=None, fields=DEFAULT_LIST_FIELDS):
+    """Get a page of search results with their rank and the cursor of the next page"""
+    query = build_search_query(q, start_date, end_date, limit, cursor, fields)
+
+    with SessionLocal() as session:
+        rows = session.execute(query).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_search_cursor(rows[-1].rank, rows[-1].published_at, rows[-1].url)
+
+        return [dict(row_to_dict(row, fields), rank=row.rank) for row in rows], next_cursor
+
+def get_article_count(start_date=None, end_date=None, tags=None, author=None):
+    """Get count of articles with optional time, tag and author filters"""
     # Import Article model here to avoid circular import
     from app.models import Article
     
     with SessionLocal() as session:
-        query = select(func.count(Article.url))
-        
-        if start_date:
-            query = query.where(Article.published_at >= start_date)
-        if end_date:
-            query = query.where(Article.published_at <= end_date)
-            
+        query = apply_article_filters(select(func.count(Article.url)), start_date, end_date, tags, author)
         result = session.execute(query)
         return result.scalar()
 
-def get_article_stats():
-    """Get basic statistics about articles"""
+def build_facet_queries(start_date, end_date, tags=None, author=None, limit=20):
+    """Most frequent tags and authors among the matching articles, as (value, count) rows.
+
+    Both aggregate only the rows in the time range, located through the published_at
+    indexes, so the cost follows the range rather than the table size.
+    """
     # Import Article model here to avoid circular import
     from app.models import Article
-    
+
+    tag_rows = apply_article_filters(
+        select(func.unnest(Article.tags).label('tag')), start_date, end_date, tags, author
+    ).subquery()
+    tag_count = func.count().label('count')
+    tags_query = (
+        select(tag_rows.c.tag, tag_count)
+        .group_by(tag_rows.c.tag)
+        .order_by(tag_count.desc(), tag_rows.c.tag)
+        .limit(limit)
+    )
+
+    author_count = func.count().label('count')
+    authors_query = (
+        apply_article_filters(select(Article.author, author_count), start_date, end_date, tags, author)
+        .where(Article.author.isnot(None))
+        .group_by(Article.author)
+        .order_by(author_count.desc(), Article.author)
+        .limit(limit)
+    )
+    return tags_query, authors_query
+
+def get_article_facets(start_date, end_date, tags=None, author=None, limit=20):
+    tags_query, authors_query = build_facet_queries(start_date, end_date, tags, author, limit)
+
     with SessionLocal() as session:
-        # Total count
-        total_count = session.execute(select(func.count(Article.url)))
-        total_count = total_count.scalar()
-        
-        # Latest article
-        latest_article = session.execute(
-            select(Article).order_by(Article.published_at.desc()).limit(1)
-        )
-        latest_article = latest_article.scalar()
-        
-        # Oldest article
-        oldest_article = session.execute(
-            select(Article).order_by(Article.published_at.asc()).limit(1)
-        )
-        oldest_article = oldest_article.scalar()
-        
-        # Articles in last 24 hours
-        yesterday = datetime.now() - timedelta(days=1)
-        recent_count = session.execute(
-            select(func.count(Article.url)).where(Article.published_at >= yesterday)
-        )
-        recent_count = recent_count.scalar()
-        
         return {
-            'total_articles': total_count,
-            'articles_last_24h': recent_count,
-            'latest_article_date': latest_article.published_at.isoformat() if latest_article else None,
-            'oldest_article_date': oldest_article.published_at.isoformat() if oldest_article else None
+            'tags': [{'tag': tag, 'count': count} for tag, count in session.execute(tags_query)],
+            'authors': [{'author': author, 'count': count} for author, count in session.execute(authors_query)]
         }
 
+def query_article_stats():
+    """Compute article statistics in a single aggregate query"""
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    yesterday = datetime.now() - timedelta(days=1)
+    query = select(
+        func.count(),
+        func.count().filter(Article.published_at >= yesterday),
+        func.max(Article.published_at),
+        func.min(Article.published_at)
+    ).select_from(Article)
+
+    with SessionLocal() as session:
+        total_count, recent_count, latest_date, oldest_date = session.execute(query).one()
+
+    return {
+        'total_articles': total_count,
+        'articles_last_24h': recent_count,
+        'latest_article_date': latest_date.isoformat() if latest_date else None,
+        'oldest_article_date': oldest_date.isoformat() if oldest_date else None
+    }
+
+def get_article_stats():
+    """Get basic statistics about articles, cached until the spider writes or the TTL runs out"""
+    data_version.start()
+    return stats_cache.get_or_compute('stats', query_article_stats)
+
+def query_data_version():
+    """Latest scraped_at, stamped by the database with every article the spider writes"""
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    with SessionLocal() as session:
+        latest = session.execute(select(func.max(Article.scraped_at))).scalar()
+    return latest.isoformat() if latest else 'empty'
+
+def get_data_version():
+    data_version.start()
+    return data_version_cache.get_or_compute('data_version', query_data_version)
+
+def cached_json_response(endpoint, params, build):
+    """JSON response of build() with a strong ETag over endpoint, normalized params and data version.
+
+    A matching If-None-Match is answered with 304 without querying the articles, other
+    repeated requests are served from the response cache until the data version moves.
+    """
+    key = json.dumps([endpoint, params, get_data_version()], sort_keys=True, default=str)
+    etag = hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        body = response_cache.get(etag)
+        if body is None:
+            body = jsonify(build()).get_data()
+            response_cache.put(etag, body)
+        response = app.response_class(body, mimetype='application/json')
+
+    response.set_etag(etag)
+    # Let clients keep the body but check back every time
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+EXPORT_COLUMNS = ('url', 'title', 'subtitle', 'author', 'published_at', 'scraped_at', 'updated_at', 'tags', 'image_url', 'content_text')
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+def export_columns(html=False):
+    return EXPORT_COLUMNS + ('content',) if html else EXPORT_COLUMNS
+
+def build_export_query(start_date=None, end_date=None, tags=None, author=None, html=False):
+    """Matching articles oldest first as plain rows, read through a server-side cursor.
+
+    Rows are fetched API_EXPORT_CHUNK_SIZE at a time and never become ORM objects, so
+    the memory an export takes doesn't grow with the number of articles.
+    """
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    metadata = [getattr(Article, name) for name in EXPORT_COLUMNS if name != 'content_text']
+    query = select(*metadata, *body_columns(html))
+    query = apply_article_filters(query, start_date, end_date, tags, author)
+    return (
+        query.order_by(Article.published_at, Article.url)
+        .execution_options(stream_results=True, yield_per=config.API_EXPORT_CHUNK_SIZE)
+    )
+
+def export_row(row, html=False):
+    article = row_to_dict(row, [name for name in EXPORT_COLUMNS if name != 'content_text'])
+    article.update(body_to_dict(row._mapping, html))
+    return article
+
+def format_ndjson(chunk, html=False):
+    return ''.join(json.dumps(export_row(row, html), ensure_ascii=False) + '\n' for row in chunk)
+
+def format_csv(chunk, html=False):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    for row in chunk:
+        values = export_row(row, html)
+        values['tags'] = '|'.join(values['tags'] or [])
+        writer.writerow(values[name] for name in export_columns(html))
+    return output.getvalue()
+
+def export_articles(export_format, start_date=None, end_date=None, tags=None, author=None, html=False):
+    """Yield the export one chunk of rows at a time, the CSV header first"""
+    query = build_export_query(start_date, end_date, tags, author, html)
+    format_chunk = format_ndjson if export_format == 'ndjson' else format_csv
+
+    exported = 0
+    with SessionLocal() as session:
+        partitions = session.execute(query).partitions()
+        if export_format == 'csv':
+            yield ','.join(export_columns(html)) + '\r\n'
+        try:
+            for chunk in partitions:
+                exported += len(chunk)
+                yield format_chunk(chunk, html)
+        except Exception as e:
+            # The status line is long gone, all that is left is to cut the body short
+            logger.error(f"Article export failed after {exported} articles: {e}")
+            raise
+    logger.info(f"Exported {exported} articles as {export_format}")
+
+def parse_date_filters():
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+
+    start_date = None
+    end_date = None
+
+    if start_date_str:
+        start_date = datetime.fromisoformat(start_date_str.replace('T', ' '))
+    if end_date_str:
+        end_date = datetime.fromisoformat(end_date_str.replace('T', ' '))
+    return start_date, end_date
+
+def parse_flag(name):
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+def parse_article_filters():
+    """tag (repeatable, all have to match) and author parameters, normalized"""
+    tags = sorted({tag.strip() for tag in request.args.getlist('tag') if tag.strip()}) or None
+    author = request.args.get('author', '').strip() or None
+    return tags, author
+
 @app.route('/')
 def index():
     """Main page with form for time range selection"""
@@ -279,32 +666,76 @@ def get_articles():
     """Get articles with optional time range filtering"""
     try:
         # Parse query parameters
-        start_date_str = request.args.get('start_date')
-        end_date_str = request.args.get('end_date')
-        limit = int(request.args.get('limit', 100))
-        
-        start_date = None
-        end_date = None
-        
-        if start_date_str:
-            start_date = datetime.fromisoformat(start_date_str.replace('T', ' '))
-        if end_date_str:
-            end_date = datetime.fromisoformat(end_date_str.replace('T', ' '))
-        
-        # Get articles
-        articles = get_articles_with_filters(start_date, end_date, limit)
+        start_date, end_date = parse_date_filters()
+        tags, author = parse_article_filters()
+        fields = parse_fields(request.args.get('fields'))
+        limit = clamp_page_size(int(request.args.get('limit', config.API_DEFAULT_PAGE_SIZE)))
+        cursor = request.args.get('cursor') or None
+        if cursor:
+            decode_cursor(cursor)
+
+        # Equivalent requests share one cache entry and ETag
+        filters = {
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat() if end_date else None,
+            'tags': tags,
+            'author': author,
+            'fields': list(fields),
+            'limit': limit,
+            'cursor': cursor
+        }
+
+        def build():
+            articles, next_cursor = get_articles_with_filters(
+                start_date, end_date, limit, cursor, tags=tags, author=author, fields=fields
+            )
+            return {
+                'success': True,
+                'articles': articles,
+                'count': len(articles),
+                'next_cursor': next_cursor,
+                'filters': filters
+            }
+
+        return cached_json_response('articles', filters, build)
         
+    except (InvalidCursor, InvalidFields) as e:
         return jsonify({
-            'success': True,
-            'articles': articles,
-            'count': len(articles),
-            'filters': {
-                'start_date': start_date_str,
-                'end_date': end_date_str,
-                'limit': limit
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/articles/detail')
+def get_article():
+    """Get a single article with its full text by its url, and its HTML with html=1"""
+    try:
+        url = request.args.get('url', '').strip()
+        if not url:
+            return jsonify({
+                'success': False,
+                'error': 'Missing article url, pass it as url'
+            }), 400
+
+        html = parse_flag('html')
+
+        def build():
+            return {
+                'success': True,
+                'article': get_article_detail(url, html)
             }
-        })
-        
+
+        return cached_json_response('detail', {'url': url, 'html': html}, build)
+
+    except ArticleNotFound as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
     except Exception as e:
         return jsonify({
             'success': False,
@@ -315,28 +746,149 @@ def get_articles():
 def get_articles_count():
     """Get count of articles with optional time range filtering"""
     try:
-        start_date_str = request.args.get('start_date')
-        end_date_str = request.args.get('end_date')
-        
-        start_date = None
-        end_date = None
-        
-        if start_date_str:
-            start_date = datetime.fromisoformat(start_date_str.replace('T', ' '))
-        if end_date_str:
-            end_date = datetime.fromisoformat(end_date_str.replace('T', ' '))
-        
-        count = get_article_count(start_date, end_date)
+        start_date, end_date = parse_date_filters()
+        tags, author = parse_article_filters()
+        filters = {
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat() if end_date else None,
+            'tags': tags,
+            'author': author
+        }
+
+        def build():
+            return {
+                'success': True,
+                'count': get_article_count(start_date, end_date, tags=tags, author=author),
+                'filters': filters
+            }
+
+        return cached_json_response('count', filters, build)
         
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'count': count,
-            'filters': {
-                'start_date': start_date_str,
-                'end_date': end_date_str
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/articles/facets')
+def get_articles_facets():
+    """Top tags and authors with article counts, by default over the last API_FACETS_DEFAULT_DAYS days"""
+    try:
+        start_date, end_date = parse_date_filters()
+        tags, author = parse_article_filters()
+        if start_date is None:
+            start_date = (end_date or datetime.now()) - timedelta(days=config.API_FACETS_DEFAULT_DAYS)
+            # Whole minutes, so the default range and its cache entry hold for a while
+            start_date = start_date.replace(second=0, microsecond=0)
+        limit = max(1, min(int(request.args.get('limit', config.API_FACETS_LIMIT)), config.API_FACETS_MAX_LIMIT))
+
+        filters = {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat() if end_date else None,
+            'tags': tags,
+            'author': author,
+            'limit': limit
+        }
+
+        def build():
+            facets = get_article_facets(start_date, end_date, tags, author, limit)
+            return {
+                'success': True,
+                'tags': facets['tags'],
+                'authors': facets['authors'],
+                'filters': filters
             }
-        })
-        
+
+        return cached_json_response('facets', filters, build)
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/articles/export')
+def get_articles_export():
+    """Stream every article matching the time range, tag and author filters as NDJSON or CSV"""
+    try:
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown format '{export_format}', expected one of {', '.join(EXPORT_FORMATS)}"
+            }), 400
+
+        start_date, end_date = parse_date_filters()
+        tags, author = parse_article_filters()
+        html = parse_flag('html')
+
+        chunks = export_articles(export_format, start_date, end_date, tags, author, html)
+        # Run the query before answering 200, so an unreachable database still gets a 500
+        first_chunk = next(chunks, '')
+
+        def stream():
+            yield first_chunk
+            yield from chunks
+
+        # stream_with_context keeps the request, and a profile of it, open until the last chunk
+        response = app.response_class(stream_with_context(stream()), mimetype=EXPORT_FORMATS[export_format])
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename="articles-{datetime.now():%Y%m%dT%H%M%S}.{export_format}"'
+        )
+        # Ask proxies such as nginx to pass chunks on instead of buffering the export
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/articles/search')
+def get_articles_search():
+    """Full-text search over titles, standfirsts and article text with optional time range filtering"""
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({
+                'success': False,
+                'error': 'Missing search query, pass it as q'
+            }), 400
+
+        start_date, end_date = parse_date_filters()
+        fields = parse_fields(request.args.get('fields'))
+        limit = clamp_page_size(int(request.args.get('limit', config.API_DEFAULT_PAGE_SIZE)))
+        cursor = request.args.get('cursor') or None
+        if cursor:
+            decode_search_cursor(cursor)
+
+        filters = {
+            'q': q,
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat() if end_date else None,
+            'fields': list(fields),
+            'limit': limit,
+            'cursor': cursor
+        }
+
+        def build():
+            articles, next_cursor = search_articles(q, start_date, end_date, limit, cursor, fields)
+            return {
+                'success': True,
+                'articles': articles,
+                'count': len(articles),
+                'next_cursor': next_cursor,
+                'filters': filters
+            }
+
+        return cached_json_response('search', filters, build)
+
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -0,0 +1,153 @@
+import select
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+import app.config as config
+from app.logger import logger
+
+
+class DataVersion:
+    """Number that goes up whenever the spider writes articles, learnt through LISTEN on the notify channel.
+
+    Caches remember the version their entries were computed at and drop them once it moves.
+    The listener runs on a daemon thread with its own connection; while it is disconnected
+    changes can be missed, so the version is bumped on every (re)connect and caches have to
+    keep a TTL as the upper bound on staleness.
+    """
+
+    def __init__(self, dsn: str, channel: str = config.ARTICLE_NOTIFY_CHANNEL, poll_interval: float = 5.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.listening = False
+        self._version = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def current(self) -> int:
+        return self._version
+
+    def bump(self) -> None:
+        with self._lock:
+            self._version += 1
+
+    def start(self) -> None:
+        """Start listening unless already started, safe to call on every request"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen_forever, name="data-version-listener", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _listen_forever(self) -> None:
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                self._listen()
+                delay = 1.0
+            except psycopg2.Error as e:
+                logger.warning(f"Listening on '{self.channel}' failed, retrying in {delay:.0f}s: {e}")
+            finally:
+                self.listening = False
+            self._stop.wait(delay)
+            delay = min(delay * 2, 60.0)
+
+    def _listen(self) -> None:
+        connection = psycopg2.connect(self.dsn)
+        try:
+            connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with connection.cursor() as cursor:
+                cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+            self.listening = True
+            # Anything written while we weren't listening went unnoticed
+            self.bump()
+            logger.info(f"Listening for article changes on '{self.channel}'")
+
+            while not self._stop.is_set():
+                if select.select([connection], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                connection.poll()
+                if connection.notifies:
+                    logger.debug(f"Got {len(connection.notifies)} article change notifications")
+                    connection.notifies.clear()
+                    self.bump()
+        finally:
+            connection.close()
+
+
+class TtlCache:
+    """Thread-safe in-process cache whose entries expire after ttl seconds or once the data version moves"""
+
+    def __init__(self, ttl: float, data_version: DataVersion | None = None, clock=time.monotonic):
+        self.ttl = ttl
+        self.data_version = data_version
+        self.clock = clock
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def _version(self) -> int:
+        return self.data_version.current if self.data_version is not None else 0
+
+    def _fresh(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, version = entry
+        if self.clock() >= expires_at or version != self._version():
+            return None
+        return entry
+
+    def get_or_compute(self, key, compute):
+        entry = self._fresh(key)
+        if entry is not None:
+            return entry[0]
+        # One thread recomputes while the others wait for its result instead of querying too
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry[0]
+            version = self._version()
+            value = compute()
+            self._entries[key] = (value, self.clock() + self.ttl, version)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class LruCache:
+    """Thread-safe mapping that keeps the max_entries most recently used entries"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
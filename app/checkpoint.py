@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass
+class Checkpoint:
+    """Progress of a run's listing walk, saved as it goes so a restarted parser carries on from it"""
+    # Time the run's window is measured back from
+    started_at: datetime
+    first_run: bool
+    # Run after a restart: first run window, but stops at stored URLs like a regular one
+    catching_up: bool
+    # Next listing page to read, and the one the walk ends after once it is known
+    page: int
+    stop_page: int | None = None
+    # Queued article URLs not stored yet, with their listing page
+    pending: dict[str, int] = field(default_factory=dict)
+    finished_at: datetime | None = None
+
+    def pending_by_page(self) -> dict[int, list[str]]:
+        pages: dict[int, list[str]] = {}
+        for url, page in self.pending.items():
+            pages.setdefault(page, []).append(url)
+        return dict(sorted(pages.items()))
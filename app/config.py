@@ -9,6 +9,111 @@ POSTGRES_HOST = os.getenv('POSTGRES_HOST', 'localhost')
 POSTGRES_PORT = os.getenv('POSTGRES_PORT', '5432')
 POSTGRES_DB = os.getenv('POSTGRES_DB', 'newsdb')
 
+# Site the spider crawls, e.g. a local stand-in server (bench/standin.py) for load tests
+FT_ORIGIN = os.getenv('FT_ORIGIN', 'https://www.ft.com').rstrip('/')
+
+# Article writes: what to do with rows whose url is already stored ('nothing' or 'update')
+# and rows per multi-row INSERT
+INSERT_ON_CONFLICT = os.getenv('INSERT_ON_CONFLICT', 'nothing')
+INSERT_BATCH_SIZE = int(os.getenv('INSERT_BATCH_SIZE', '1000'))
+# Channel article writes are announced on with NOTIFY, the API drops cached results on it
+ARTICLE_NOTIFY_CHANNEL = os.getenv('ARTICLE_NOTIFY_CHANNEL', 'article_changes')
+
+# HTTP client: 'concurrent' fetches a page's articles in parallel through the
+# shared connection pool, 'sequential' keeps the old one-by-one behaviour
+FETCH_MODE = os.getenv('FETCH_MODE', 'concurrent')
+FETCH_CONCURRENCY_PER_HOST = int(os.getenv('FETCH_CONCURRENCY_PER_HOST', '4'))
+FETCH_TIMEOUT = float(os.getenv('FETCH_TIMEOUT', '30'))
+FETCH_KEEPALIVE_TIMEOUT = float(os.getenv('FETCH_KEEPALIVE_TIMEOUT', '30'))
+FETCH_RETRIES = int(os.getenv('FETCH_RETRIES', '3'))
+# Wait before retrying a request that got no answer (connection error or timeout), seconds;
+# such failures are not throttling and leave the rate limiter alone
+FETCH_ERROR_RETRY_DELAY = float(os.getenv('FETCH_ERROR_RETRY_DELAY', '2'))
+
+# Crawl pipeline: article URLs queued ahead of the fetch stage, listing pages read ahead of
+# the oldest page still in flight, rows per DB write and the longest time a partial batch
+# waits before it is written, seconds
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '50'))
+LISTING_LOOKAHEAD = int(os.getenv('LISTING_LOOKAHEAD', '1'))
+WRITE_BATCH_SIZE = int(os.getenv('WRITE_BATCH_SIZE', '50'))
+WRITE_FLUSH_INTERVAL = float(os.getenv('WRITE_FLUSH_INTERVAL', '30'))
+
+# Article extraction engine: 'lxml' (single pass) or 'bs4' (the original BeautifulSoup parser)
+PARSER_ENGINE = os.getenv('PARSER_ENGINE', 'lxml')
+# Worker processes parsing article HTML (0 parses inline on the event loop) and how many
+# documents may wait for them before fetching is held back (empty means twice the workers)
+PARSER_WORKERS = int(os.getenv('PARSER_WORKERS', str(os.cpu_count() or 1)))
+PARSER_MAX_IN_FLIGHT = int(os.getenv('PARSER_MAX_IN_FLIGHT') or 0) or None
+
+# Distributed crawling: replicas share a crawl frontier table in Postgres, one of them walks
+# the listing while all of them claim article URLs from it in batches, under leases renewed
+# while they work and taken over by others once they run out; URLs are given up after
+# FRONTIER_MAX_ATTEMPTS claims. Requests to the origin are paced together (crawl_rate_limit).
+# The worker id defaults to hostname-pid, unique per container
+FRONTIER_ENABLED = os.getenv('FRONTIER_ENABLED', '0') == '1'
+FRONTIER_WORKER_ID = os.getenv('FRONTIER_WORKER_ID', '')
+FRONTIER_CLAIM_BATCH = int(os.getenv('FRONTIER_CLAIM_BATCH', '10'))
+FRONTIER_LEASE_SECONDS = float(os.getenv('FRONTIER_LEASE_SECONDS', '300'))
+FRONTIER_MAX_ATTEMPTS = int(os.getenv('FRONTIER_MAX_ATTEMPTS', '3'))
+FRONTIER_POLL_INTERVAL = float(os.getenv('FRONTIER_POLL_INTERVAL', '2'))
+
+# Saving the progress of every listing walk in crawl_checkpoint, which a restarted parser
+# carries on from instead of starting over (and backfilling 30 days again)
+CHECKPOINT_ENABLED = os.getenv('CHECKPOINT_ENABLED', '1') == '1'
+
+# Revisiting stored articles for updates after every run: 'max_age:interval' steps in hours,
+# e.g. hourly while under a day old, every 6 hours until 3 days, daily until a week
+RECRAWL_ENABLED = os.getenv('RECRAWL_ENABLED', '0') == '1'
+RECRAWL_SCHEDULE = os.getenv('RECRAWL_SCHEDULE', '24:1,72:6,168:24')
+
+# On-disk cache of ETag/Last-Modified validators used for conditional requests
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', '1') == '1'
+HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', 'cache/http')
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+HTTP_CACHE_MAX_AGE = float(os.getenv('HTTP_CACHE_MAX_AGE', str(7 * 24 * 3600)))
+
+# Request pacing: 'aimd' adapts to how FT answers, 'fixed' is the old constant delay
+RATE_LIMITER = os.getenv('RATE_LIMITER', 'aimd')
+RATE_LIMIT_FIXED_DELAY = float(os.getenv('RATE_LIMIT_FIXED_DELAY', '5'))
+RATE_LIMIT_INITIAL_RATE = float(os.getenv('RATE_LIMIT_INITIAL_RATE', '0.5'))
+RATE_LIMIT_MIN_RATE = float(os.getenv('RATE_LIMIT_MIN_RATE', '0.05'))
+RATE_LIMIT_MAX_RATE = float(os.getenv('RATE_LIMIT_MAX_RATE', '5'))
+RATE_LIMIT_INCREASE = float(os.getenv('RATE_LIMIT_INCREASE', '0.05'))
+RATE_LIMIT_DECREASE_FACTOR = float(os.getenv('RATE_LIMIT_DECREASE_FACTOR', '0.5'))
+RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', '2'))
+RATE_LIMIT_BACKOFF = float(os.getenv('RATE_LIMIT_BACKOFF', '60'))
+RATE_LIMIT_MAX_BACKOFF = float(os.getenv('RATE_LIMIT_MAX_BACKOFF', '600'))
+
+# Prometheus metrics endpoint of the parser process (http://host:port/metrics, port 0 disables it)
+METRICS_HOST = os.getenv('METRICS_HOST', '0.0.0.0')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9101'))
+
+# API paging: articles per page when no limit is given and the largest limit accepted
+API_DEFAULT_PAGE_SIZE = int(os.getenv('API_DEFAULT_PAGE_SIZE', '100'))
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '500'))
+# /api/articles/facets: range used without start_date, entries per facet
+API_FACETS_DEFAULT_DAYS = int(os.getenv('API_FACETS_DEFAULT_DAYS', '30'))
+API_FACETS_LIMIT = int(os.getenv('API_FACETS_LIMIT', '20'))
+API_FACETS_MAX_LIMIT = int(os.getenv('API_FACETS_MAX_LIMIT', '100'))
+# Rows /api/articles/export reads from its server-side cursor and writes out at a time
+API_EXPORT_CHUNK_SIZE = int(os.getenv('API_EXPORT_CHUNK_SIZE', '1000'))
+# Longest time /api/articles/stats is served from cache when no write notification arrives, seconds
+API_STATS_CACHE_TTL = float(os.getenv('API_STATS_CACHE_TTL', '60'))
+# Responses of the article read endpoints kept in memory, and the longest time the data
+# version behind their ETags (latest scraped_at) is reused when no write notification arrives, seconds
+API_RESPONSE_CACHE_SIZE = int(os.getenv('API_RESPONSE_CACHE_SIZE', '1024'))
+API_DATA_VERSION_TTL = float(os.getenv('API_DATA_VERSION_TTL', '30'))
+
+# Opt-in profiling of sampled crawl runs and API requests: CPU profile ('cprofile', or
+# 'pyinstrument' when installed) plus a tracemalloc diff, written to PROFILE_DIR
+PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', '0') == '1'
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILER = os.getenv('PROFILER', 'cprofile')
+PROFILE_RUN_SAMPLE_RATE = float(os.getenv('PROFILE_RUN_SAMPLE_RATE', '1'))
+PROFILE_REQUEST_SAMPLE_RATE = float(os.getenv('PROFILE_REQUEST_SAMPLE_RATE', '0.01'))
+PROFILE_MEMORY = os.getenv('PROFILE_MEMORY', '1') == '1'
+PROFILE_MEMORY_TOP = int(os.getenv('PROFILE_MEMORY_TOP', '25'))
+
 coockies = {
     "consentUUID": "ce1ed1d2-84b6-4a7a-94d5-3484590d2054_46",
     "FTCookieConsentGDPR": "true"
@@ -17,9 +122,8 @@ headers = {
     'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
     'accept-language': 'ru-UA,ru;q=0.9,uk-UA;q=0.8,uk;q=0.7,ru-RU;q=0.6,en-US;q=0.5,en;q=0.4',
     'cache-control': 'max-age=0',
-    'if-none-match': 'W/"23e94-l+9jDIGyHK2ESAqOTn+abWSfn5k"',
     'priority': 'u=0, i',
-    'referer': 'https://www.ft.com/world?page=1',
+    'referer': f'{FT_ORIGIN}/world?page=1',
     'sec-ch-ua': '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
     'sec-ch-ua-mobile': '?1',
     'sec-ch-ua-platform': '"Android"',
@@ -0,0 +1,72 @@
+import gzip
+import hashlib
+import json
+
+import lxml.html
+from lxml import etree
+
+# Elements that start a new line of the plain-text body
+BLOCK_ELEMENTS = (
+    "p", "div", "section", "article", "blockquote", "pre", "figure", "figcaption", "ul", "ol", "li",
+    "table", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "br", "hr",
+)
+NON_TEXT_ELEMENTS = ("script", "style", "template")
+# Extracted fields whose change makes a re-scraped article worth writing again
+HASHED_FIELDS = ("title", "subtitle", "author", "published_at", "tags", "image_url", "content_text")
+# Level 6 gets within a few percent of 9 on article markup at a fraction of the time
+GZIP_LEVEL = 6
+
+
+def html_to_text(html: str | None) -> str | None:
+    """Plain text of an article body, one line per paragraph or other block"""
+    if html is None:
+        return None
+    if not html.strip():
+        return ""
+
+    root = lxml.html.fragment_fromstring(html, create_parent="div")
+    for element in list(root.iter(*NON_TEXT_ELEMENTS, etree.Comment)):
+        element.drop_tree()
+    for element in root.iter(*BLOCK_ELEMENTS):
+        element.tail = "\n" + (element.tail or "")
+        if len(element) or element.text:
+            element.text = "\n" + (element.text or "")
+
+    lines = (" ".join(line.split()) for line in root.text_content().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def compress_html(html: str | None) -> bytes | None:
+    if html is None:
+        return None
+    # mtime=0 keeps the output a function of the input alone
+    return gzip.compress(html.encode("utf-8"), compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def decompress_html(data: bytes | None) -> str | None:
+    if data is None:
+        return None
+    return gzip.decompress(data).decode("utf-8")
+
+
+def content_hash(article: dict) -> str:
+    """Fingerprint of the extracted fields of a compacted article, markup-only changes to the body excluded"""
+    values = [article.get(field) for field in HASHED_FIELDS]
+    payload = json.dumps(values, default=str, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compact_article(article: dict) -> dict:
+    """Replace the raw content HTML of a parsed article with its plain text and a gzipped copy,
+    and fingerprint the result.
+
+    Articles without a content key, e.g. partial updates or already compacted ones, are
+    returned unchanged.
+    """
+    if "content" not in article:
+        return article
+    compacted = {key: value for key, value in article.items() if key != "content"}
+    compacted["content_text"] = html_to_text(article["content"])
+    compacted["content_html_gz"] = compress_html(article["content"])
+    compacted["content_hash"] = content_hash(compacted)
+    return compacted
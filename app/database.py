@@ -5,6 +5,7 @@ from sqlalchemy.orm import DeclarativeBase
 import app.config as config
 import os
 from app.logger import logger
+from app.migrations import migrate
 
 # Get database configuration from environment variables or config
 POSTGRES_USERNAME = os.getenv('POSTGRES_USERNAME', config.POSTGRES_USERNAME)
@@ -45,6 +46,10 @@ async def init_db():
             else:
                 raise e
 
+    # create_all leaves existing tables alone, schema changes since reach them through migrations
+    async with engine.begin() as conn:
+        await migrate(conn)
+
 async def get_async_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
@@ -1,19 +1,350 @@
-from datetime import datetime
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from app.checkpoint import Checkpoint
+from app.content import compact_article
 from app.database import AsyncSessionLocal
+from app.recrawl import RecrawlCandidate
 from app.logger import logger
+import app.config as config
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import insert
+from sqlalchemy import delete, func, insert, literal_column, or_, select, text, update
+from sqlalchemy.dialects.postgresql import Insert, insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
 
+@dataclass
+class ChunkInsertResult:
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+
+@lru_cache(maxsize=None)
+def article_columns() -> tuple[str, ...]:
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    # Generated columns such as search_vector are filled in by Postgres and can't be written
+    return tuple(model_column.name for model_column in Article.__table__.columns if model_column.computed is None)
+
+
+async def get_known_urls() -> set[str]:
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream_scalars(select(Article.url).execution_options(yield_per=10000))
+        urls = {url async for url in result}
+
+    logger.info(f"Loaded {len(urls)} known article URLs from database")
+    return urls
+
+
+async def get_recrawl_candidates(published_since: datetime) -> list[RecrawlCandidate]:
+    """Stored articles published since the given time, newest first, with what the recrawl needs to know"""
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    query = (
+        select(Article.url, Article.published_at, Article.last_checked_at, Article.content_hash)
+        .where(Article.published_at >= published_since)
+        .order_by(Article.published_at.desc())
+    )
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(query)
+        return [RecrawlCandidate(*row) for row in result]
+
+
+async def mark_articles_checked(urls: list[str], checked_at: datetime) -> None:
+    """Record a recrawl visit to articles that turned out unchanged or were rejected, written rows carry it already"""
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    if not urls:
+        return
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Article).where(Article.url.in_(urls)).values(last_checked_at=checked_at))
+        await session.commit()
+    logger.info(f"Marked {len(urls)} revisited articles as checked")
+
+
+async def load_crawl_checkpoint(origin: str) -> Checkpoint | None:
+    # Import CrawlCheckpoint model here to avoid circular import
+    from app.models import CrawlCheckpoint
+
+    async with AsyncSessionLocal() as session:
+        row = await session.get(CrawlCheckpoint, origin)
+    if row is None:
+        return None
+    return Checkpoint(
+        started_at=row.started_at,
+        first_run=row.first_run,
+        catching_up=row.catching_up,
+        page=row.page,
+        stop_page=row.stop_page,
+        pending=row.pending,
+        finished_at=row.finished_at
+    )
+
+
+async def save_crawl_checkpoint(origin: str, checkpoint: Checkpoint) -> None:
+    """Replace the checkpoint of origin, a single upsert so it can go out after every listing page"""
+    # Import CrawlCheckpoint model here to avoid circular import
+    from app.models import CrawlCheckpoint
+
+    values = {
+        "started_at": checkpoint.started_at,
+        "first_run": checkpoint.first_run,
+        "catching_up": checkpoint.catching_up,
+        "page": checkpoint.page,
+        "stop_page": checkpoint.stop_page,
+        "pending": checkpoint.pending,
+        "saved_at": datetime.now(),
+        "finished_at": checkpoint.finished_at,
+    }
+    stmt = pg_insert(CrawlCheckpoint).values(origin=origin, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=["origin"], set_=values)
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def enqueue_frontier_urls(urls: list[str], page: int, first_run: bool) -> int:
+    """Add article URLs to the shared crawl frontier, leaving ones already queued alone"""
+    # Import CrawlFrontier model here to avoid circular import
+    from app.models import CrawlFrontier
+
+    if not urls:
+        return 0
+    stmt = (
+        pg_insert(CrawlFrontier)
+        .values([{"url": url, "page": page, "first_run": first_run, "attempts": 0} for url in urls])
+        .on_conflict_do_nothing(index_elements=["url"])
+        .returning(CrawlFrontier.url)
+    )
+    async with AsyncSessionLocal() as session:
+        queued = len((await session.execute(stmt)).all())
+        await session.commit()
+    return queued
+
+
+def _claim_frontier_query(owner: str, limit: int, lease: timedelta, max_attempts: int):
+    # Import CrawlFrontier model here to avoid circular import
+    from app.models import CrawlFrontier
+
+    now = func.localtimestamp()
+    # Rows another replica is claiming right now are skipped rather than waited for
+    claimable = (
+        select(CrawlFrontier.url)
+        .where(CrawlFrontier.attempts < max_attempts)
+        .where(or_(CrawlFrontier.lease_expires_at.is_(None), CrawlFrontier.lease_expires_at < now))
+        .order_by(CrawlFrontier.page, CrawlFrontier.queued_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    return (
+        update(CrawlFrontier)
+        .where(CrawlFrontier.url.in_(claimable))
+        .values(lease_owner=owner, lease_expires_at=now + lease, attempts=CrawlFrontier.attempts + 1)
+        .returning(CrawlFrontier.url, CrawlFrontier.page, CrawlFrontier.first_run)
+    )
+
+
+async def claim_frontier_urls(owner: str, limit: int, lease: timedelta, max_attempts: int) -> list[tuple[str, int, bool]]:
+    """Lease up to limit unclaimed or expired frontier rows to owner, lowest listing page first"""
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(_claim_frontier_query(owner, limit, lease, max_attempts))).all()
+        await session.commit()
+    return sorted((tuple(row) for row in rows), key=lambda row: row[1])
+
+
+async def renew_frontier_leases(owner: str, urls: list[str], lease: timedelta) -> int:
+    # Import CrawlFrontier model here to avoid circular import
+    from app.models import CrawlFrontier
+
+    if not urls:
+        return 0
+    stmt = (
+        update(CrawlFrontier)
+        .where(CrawlFrontier.lease_owner == owner, CrawlFrontier.url.in_(urls))
+        .values(lease_expires_at=func.localtimestamp() + lease)
+    )
+    async with AsyncSessionLocal() as session:
+        renewed = (await session.execute(stmt)).rowcount
+        await session.commit()
+    return renewed
+
+
+async def complete_frontier_urls(owner: str, urls: list[str]) -> None:
+    """Drop handled rows, unless their lease ran out and another replica holds them now"""
+    # Import CrawlFrontier model here to avoid circular import
+    from app.models import CrawlFrontier
+
+    if not urls:
+        return
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            delete(CrawlFrontier).where(CrawlFrontier.lease_owner == owner, CrawlFrontier.url.in_(urls))
+        )
+        await session.commit()
+
+
+async def release_frontier_urls(owner: str, urls: list[str]) -> None:
+    """Hand unhandled rows back without waiting for their lease to run out, the claim doesn't count"""
+    # Import CrawlFrontier model here to avoid circular import
+    from app.models import CrawlFrontier
+
+    if not urls:
+        return
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(CrawlFrontier)
+            .where(CrawlFrontier.lease_owner == owner, CrawlFrontier.url.in_(urls))
+            .values(lease_owner=None, lease_expires_at=None, attempts=CrawlFrontier.attempts - 1)
+        )
+        await session.commit()
+
+
+async def count_frontier_urls(max_attempts: int, through_page: int | None = None, excluding: list[str] = ()) -> int:
+    """Rows still to be handled, claimed ones included, optionally only those of listing pages up to
+    through_page and leaving out the given URLs"""
+    # Import CrawlFrontier model here to avoid circular import
+    from app.models import CrawlFrontier
+
+    query = select(func.count()).select_from(CrawlFrontier).where(CrawlFrontier.attempts < max_attempts)
+    if through_page is not None:
+        query = query.where(CrawlFrontier.page <= through_page)
+    if excluding:
+        query = query.where(CrawlFrontier.url.not_in(excluding))
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(query)).scalar()
+
+
+async def purge_exhausted_frontier_urls(max_attempts: int) -> list[str]:
+    # Import CrawlFrontier model here to avoid circular import
+    from app.models import CrawlFrontier
+
+    stmt = delete(CrawlFrontier).where(CrawlFrontier.attempts >= max_attempts).returning(CrawlFrontier.url)
+    async with AsyncSessionLocal() as session:
+        urls = list((await session.execute(stmt)).scalars())
+        await session.commit()
+    return urls
+
+
+async def start_frontier_progress(origin: str) -> None:
+    """Clear what an earlier walk of origin left behind, e.g. one whose replica crashed"""
+    # Import CrawlFrontierProgress model here to avoid circular import
+    from app.models import CrawlFrontierProgress
+
+    values = {"stop_page": None, "accepted_page": 0}
+    stmt = pg_insert(CrawlFrontierProgress).values(origin=origin, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=["origin"], set_=values)
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def sync_frontier_progress(origin: str, stop_page: int | None, accepted_page: int) -> tuple[int | None, int] | None:
+    """Merge a replica's stop page and last page with an accepted article into the walk's progress
+    and return the result, or None when no walk of origin is going on"""
+    # Import CrawlFrontierProgress model here to avoid circular import
+    from app.models import CrawlFrontierProgress
+
+    # least() and greatest() skip NULLs, so a replica without a stop page leaves the stored one alone
+    stmt = (
+        update(CrawlFrontierProgress)
+        .where(CrawlFrontierProgress.origin == origin)
+        .values(
+            stop_page=func.least(CrawlFrontierProgress.stop_page, stop_page),
+            accepted_page=func.greatest(CrawlFrontierProgress.accepted_page, accepted_page)
+        )
+        .returning(CrawlFrontierProgress.stop_page, CrawlFrontierProgress.accepted_page)
+    )
+    async with AsyncSessionLocal() as session:
+        row = (await session.execute(stmt)).first()
+        await session.commit()
+    return tuple(row) if row is not None else None
+
+
+async def end_frontier_progress(origin: str) -> None:
+    # Import CrawlFrontierProgress model here to avoid circular import
+    from app.models import CrawlFrontierProgress
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(CrawlFrontierProgress).where(CrawlFrontierProgress.origin == origin))
+        await session.commit()
+
+
+async def advisory_lock_held(lock_id: int) -> bool:
+    """Whether any session holds the pg_advisory_lock(lock_id) of this database"""
+    query = text(
+        "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND granted "
+        "AND database = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+        "AND classid = 0 AND objid = :lock_id AND objsubid = 1)"
+    )
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(query, {"lock_id": lock_id})).scalar()
+
+
+# Reserves the next request slot of an origin in a single statement, so concurrent replicas
+# queue up on the row lock; a pause pushes back every replica's next slot
+RESERVE_REQUEST_SLOT = text(
+    "WITH clock AS (SELECT clock_timestamp()::timestamp AS now, "
+    "make_interval(secs => CAST(:spacing AS float8)) AS spacing, "
+    "make_interval(secs => CAST(:pause AS float8)) AS pause) "
+    "INSERT INTO crawl_rate_limit AS rate (origin, next_request_at, paused_until) "
+    "SELECT :origin, now + pause + spacing, now + pause FROM clock "
+    "ON CONFLICT (origin) DO UPDATE SET "
+    "paused_until = greatest(rate.paused_until, excluded.paused_until), "
+    "next_request_at = greatest(rate.next_request_at, rate.paused_until, excluded.paused_until) "
+    "+ make_interval(secs => CAST(:spacing AS float8)) "
+    "RETURNING extract(epoch FROM next_request_at - make_interval(secs => CAST(:spacing AS float8)) "
+    "- clock_timestamp()::timestamp)"
+)
+
+
+async def reserve_request_slot(origin: str, spacing: float, pause: float = 0.0) -> float:
+    """Book the next request to origin spacing seconds after the one before it and return
+    how long to wait for it, after holding every replica back for pause seconds first"""
+    async with AsyncSessionLocal() as session:
+        wait = (await session.execute(
+            RESERVE_REQUEST_SLOT, {"origin": origin, "spacing": float(spacing), "pause": float(pause)}
+        )).scalar()
+        await session.commit()
+    return max(0.0, float(wait))
+
+
+def _ingest(article_data: dict[str, str|None|datetime]) -> dict[str, str|None|datetime]:
+    """Compact the body of a parsed article and stamp it as changed and checked when it was scraped.
+
+    Without a scraped_at the database stamps the row as it stores it, so the latest scraped_at the
+    API versions its responses by moves with every write, whatever the order batches arrive in.
+    """
+    article_data = compact_article(article_data)
+    if "content_hash" not in article_data:
+        return article_data
+    # Clears the raw HTML an article stored before content_text may still carry
+    article_data = {"scraped_at": func.localtimestamp(), **article_data, "content": None}
+    if article_data["scraped_at"] is not None:
+        article_data = {
+            "updated_at": article_data["scraped_at"],
+            "last_checked_at": article_data["scraped_at"],
+            **article_data
+        }
+    return article_data
+
+
 async def insert_article(session: AsyncSession, article_data: dict[str, str|None|datetime])->None:
     try:
         # Import Article model here to avoid circular import
         from app.models import Article
         
         # Filter out any extra fields that don't exist in the model
-        model_fields = {column.name for column in Article.__table__.columns}
-        filtered_data = {k: v for k, v in article_data.items() if k in model_fields}
+        model_fields = article_columns()
+        filtered_data = {k: v for k, v in _ingest(article_data).items() if k in model_fields}
         
         stmt = insert(Article).values(**filtered_data)
         await session.execute(stmt)
@@ -29,16 +360,92 @@ async def insert_article(session: AsyncSession, article_data: dict[str, str|None
 
 
 
-async def insert_article_chunk(articles_list: list[dict[str, str|None|datetime]])->None:
+def _prepare_rows(articles_list: list[dict[str, str|None|datetime]]) -> list[dict[str, str|None|datetime]]:
+    """Store content as plain text and gzipped HTML, keep only model columns, give every row
+    the same keys and drop repeated URLs (last one wins)"""
+    model_fields = article_columns()
+    articles_list = [_ingest(article) for article in articles_list]
+    present_fields = [field for field in model_fields if any(field in article for article in articles_list)]
+    rows = {}
+    for article_data in articles_list:
+        rows[article_data["url"]] = {field: article_data.get(field) for field in present_fields}
+    return list(rows.values())
+
+
+def _with_conflict_handling(stmt: Insert, fields: list[str], on_conflict: str) -> Insert:
+    if on_conflict == "update":
+        # Rows whose extracted fields are unchanged are left alone, re-scrapes only write actual changes
+        changed = stmt.table.c.content_hash.is_distinct_from(stmt.excluded.content_hash) if "content_hash" in fields else None
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["url"],
+            set_={field: stmt.excluded[field] for field in fields if field != "url"},
+            where=changed
+        )
+    elif on_conflict == "nothing":
+        stmt = stmt.on_conflict_do_nothing(index_elements=["url"])
+    else:
+        raise ValueError(f"Unknown conflict handling '{on_conflict}', expected 'nothing' or 'update'")
+    # xmax is 0 only for freshly inserted row versions, updated ones carry the updating transaction id
+    return stmt.returning(literal_column("xmax = 0").label("inserted"))
+
+
+async def _execute_upsert(session: AsyncSession, stmt: Insert, result: ChunkInsertResult) -> int:
+    returned = (await session.execute(stmt)).all()
+    inserted = sum(1 for row in returned if row.inserted)
+    result.inserted += inserted
+    result.updated += len(returned) - inserted
+    return len(returned)
+
+
+async def _insert_rows(session: AsyncSession, rows: list[dict], on_conflict: str, result: ChunkInsertResult) -> None:
+    # Import Article model here to avoid circular import
+    from app.models import Article
+
+    fields = list(rows[0])
+    for start in range(0, len(rows), config.INSERT_BATCH_SIZE):
+        batch = rows[start:start + config.INSERT_BATCH_SIZE]
+        stmt = _with_conflict_handling(pg_insert(Article).values(batch), fields, on_conflict)
+        affected = await _execute_upsert(session, stmt, result)
+        result.skipped += len(batch) - affected
+
+
+async def _notify_article_changes(session: AsyncSession, result: ChunkInsertResult) -> None:
+    """Announce written rows to listeners (the API's caches); delivered when the transaction commits"""
+    if not result.inserted and not result.updated:
+        return
+    payload = json.dumps({"inserted": result.inserted, "updated": result.updated})
+    await session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": config.ARTICLE_NOTIFY_CHANNEL, "payload": payload}
+    )
+
+
+async def insert_article_chunk(
+    articles_list: list[dict[str, str|None|datetime]],
+    on_conflict: str = config.INSERT_ON_CONFLICT
+) -> ChunkInsertResult:
+    """Write a chunk of articles in one transaction with multi-row INSERT ... ON CONFLICT (url) statements"""
+    result = ChunkInsertResult()
     if not articles_list:
         logger.warning("No articles to insert")
-        return
+        return result
         
     logger.info(f"Attempting to insert {len(articles_list)} articles to database")
-    
+    rows = _prepare_rows(articles_list)
+    result.skipped += len(articles_list) - len(rows)
+
     async with AsyncSessionLocal() as session:
-        for i, article_data in enumerate(articles_list, 1):
-            logger.debug(f"Inserting article {i}/{len(articles_list)}: {article_data.get('title', 'Unknown')}")
-            await insert_article(session, article_data)
+        try:
+            await _insert_rows(session, rows, on_conflict, result)
+            await _notify_article_changes(session, result)
+            await session.commit()
+        except Exception as e:
+            logger.error(f"Error while inserting chunk of {len(rows)} articles. Error: {str(e)}")
+            await session.rollback()
+            raise
     
-    logger.info(f"Completed inserting {len(articles_list)} articles to database")
\ No newline at end of file
+    logger.info(
+        f"Completed inserting {len(articles_list)} articles to database: "
+        f"{result.inserted} inserted, {result.updated} updated, {result.skipped} skipped"
+    )
+    return result
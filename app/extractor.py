@@ -0,0 +1,265 @@
+from datetime import datetime
+from html import escape
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+import app.config as config
+from app.logger import logger
+
+# Elements BeautifulSoup's html.parser builder treats as empty and renders as "<tag/>"
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta",
+    "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer",
+}
+# Strings of these are not BeautifulSoup's plain NavigableStrings: skipped by get_text(),
+# and the first two are written out unescaped
+NON_TEXT_ELEMENTS = {"script", "style", "template"}
+RAW_TEXT_ELEMENTS = {"script", "style"}
+MULTI_VALUED_ATTRIBUTES = {"class", "rel", "rev", "accept-charset", "headers", "accesskey", "dropzone"}
+
+TIME_CLASSES = ["article-info__timestamp", "o3-editorial-typography-byline-timestamp", "o-date"]
+
+
+def _classes(element) -> list[str]:
+    return element.get("class", "").split()
+
+
+def _get_text(element) -> str:
+    """Same as BeautifulSoup's get_text(strip=True): stripped text nodes joined without separator"""
+    parts = []
+
+    def collect(node):
+        if node.text and node.tag not in NON_TEXT_ELEMENTS:
+            text = node.text.strip()
+            if text:
+                parts.append(text)
+        for child in node:
+            if isinstance(child.tag, str):
+                collect(child)
+            if child.tail:
+                tail = child.tail.strip()
+                if tail:
+                    parts.append(tail)
+
+    collect(element)
+    return "".join(parts)
+
+
+def _serialize_attribute(name: str, value: str) -> str:
+    if name in MULTI_VALUED_ATTRIBUTES:
+        value = " ".join(value.split())
+    value = escape(value, quote=False)
+    if '"' not in value:
+        return f' {name}="{value}"'
+    if "'" not in value:
+        return f" {name}='{value}'"
+    return f' {name}="{value.replace(chr(34), "&quot;")}"'
+
+
+def _serialize(node, out: list[str]) -> None:
+    """Render an element the way BeautifulSoup's decode() does with the default 'minimal' formatter"""
+    if node.tag is etree.Comment:
+        out.append(f"<!--{node.text or ''}-->")
+    elif node.tag is etree.ProcessingInstruction:
+        out.append(f"<?{node.target} {node.text or ''}>")
+    elif isinstance(node.tag, str):
+        attributes = "".join(_serialize_attribute(name, value) for name, value in node.attrib.items())
+        if node.tag in VOID_ELEMENTS:
+            out.append(f"<{node.tag}{attributes}/>")
+        else:
+            out.append(f"<{node.tag}{attributes}>")
+            _serialize_contents(node, out)
+            out.append(f"</{node.tag}>")
+
+    if node.tail:
+        out.append(escape(node.tail, quote=False))
+
+
+def _serialize_contents(element, out: list[str]) -> None:
+    if element.text:
+        out.append(element.text if element.tag in RAW_TEXT_ELEMENTS else escape(element.text, quote=False))
+    for child in element:
+        _serialize(child, out)
+
+
+def decode_contents(element) -> str:
+    out = []
+    _serialize_contents(element, out)
+    return "".join(out)
+
+
+def parse_article_lxml(text: str) -> dict[str, str|None|datetime] | None:
+    """Single pass lxml extractor returning the same dict as the BeautifulSoup based parse_article"""
+    try:
+        root = lxml.html.document_fromstring(text)
+    except ValueError:
+        # lxml refuses str input carrying an XML encoding declaration
+        root = lxml.html.document_fromstring(text.encode("utf-8"))
+    except etree.ParserError as e:
+        logger.warning(f"Failed to build document tree: {e}")
+        return None
+
+    title_tag = subtitle_tag = author_tag = time_tag = article_tag = picture_tag = ul_tag = None
+
+    # Walk the tree once, keeping the first element matching each field like soup.find() does
+    for element in root.iter(tag=etree.Element):
+        tag = element.tag
+        if tag == "a":
+            if element.get("id") == "charge-button":
+                logger.debug("Found paywall button - skipping article")
+                return None
+            if author_tag is None and "o3-editorial-typography-byline-author" in _classes(element):
+                author_tag = element
+        elif tag == "span":
+            if title_tag is None and "headline__text" in _classes(element):
+                title_tag = element
+        elif tag == "div":
+            if subtitle_tag is None and "o-topper__standfirst" in _classes(element):
+                subtitle_tag = element
+        elif tag == "time":
+            if time_tag is None and _classes(element) == TIME_CLASSES:
+                time_tag = element
+        elif tag == "article":
+            if article_tag is None and element.get("id") == "article-body":
+                article_tag = element
+        elif tag == "picture":
+            if picture_tag is None:
+                picture_tag = element
+        elif tag == "ul":
+            if ul_tag is None and "concept-list__list" in _classes(element):
+                ul_tag = element
+
+    result = {}
+    logger.debug("Starting to parse article content")
+
+    result["title"] = _get_text(title_tag) if title_tag is not None else None
+    logger.debug(f"Title: {result['title']}")
+
+    result["subtitle"] = _get_text(subtitle_tag) if subtitle_tag is not None else None
+    logger.debug(f"Subtitle: {result['subtitle']}")
+
+    result["author"] = _get_text(author_tag) if author_tag is not None else None
+    logger.debug(f"Author: {result['author']}")
+
+    if time_tag is not None:
+        try:
+            result["published_at"] = datetime.strptime(time_tag.get("datetime"), "%Y-%m-%dT%H:%M:%S.%fZ")
+            logger.debug(f"Published at: {result['published_at']}")
+        except Exception as e:
+            logger.error(f"Failed to parse date: {time_tag.get('datetime')} - Error: {e}")
+            result["published_at"] = None
+    else:
+        result["published_at"] = None
+        logger.debug("No published date found")
+
+    if article_tag is not None:
+        result["content"] = decode_contents(article_tag)
+        logger.debug(f"Content length: {len(result['content'])} characters")
+    else:
+        result["content"] = None
+        logger.debug("No article content found")
+
+    img_tag = next(picture_tag.iter("img"), None) if picture_tag is not None else None
+    result["image_url"] = img_tag.get("src") if img_tag is not None else None
+    logger.debug(f"Image URL: {result['image_url']}")
+
+    tag_list = []
+    if ul_tag is not None:
+        for li in ul_tag.iter("li"):
+            a_tag = next(li.iter("a"), None)
+            if a_tag is not None:
+                tag_list.append(_get_text(a_tag))
+    result["tags"] = tag_list
+    logger.debug(f"Tags: {tag_list}")
+
+    if not result.get("title") or not result.get("published_at"):
+        logger.warning(f"Article missing essential data - Title: {result.get('title')}, Date: {result.get('published_at')}")
+        return None
+
+    logger.info(f"Successfully parsed article: {result['title']}")
+    return result
+
+
+def parse_article(text: str, engine: str = config.PARSER_ENGINE)->dict[str, str|None|datetime] | None:
+    if engine == "lxml":
+        return parse_article_lxml(text)
+    if engine == "bs4":
+        return parse_article_bs4(text)
+    raise ValueError(f"Unknown parser engine '{engine}', expected 'lxml' or 'bs4'")
+
+
+def parse_article_bs4(text: str)->dict[str, str|None|datetime] | None:
+    soup = BeautifulSoup(text, "html.parser")
+    
+    # Check for paywall
+    if soup.find("a", {"id": "charge-button"}):
+        logger.debug("Found paywall button - skipping article")
+        return None
+    
+    result = {}
+    logger.debug("Starting to parse article content")
+
+    # Parse title
+    title_tag = soup.find("span", {"class": "headline__text"})
+    result["title"] = title_tag.get_text(strip=True) if title_tag else None
+    logger.debug(f"Title: {result['title']}")
+
+    # Parse subtitle
+    subtitle_tag = soup.find("div", {"class": "o-topper__standfirst"})
+    result["subtitle"] = subtitle_tag.get_text(strip=True) if subtitle_tag else None
+    logger.debug(f"Subtitle: {result['subtitle']}")
+
+    # Parse author
+    author_tag = soup.find("a", {"class": "o3-editorial-typography-byline-author"})
+    result["author"] = author_tag.get_text(strip=True) if author_tag else None
+    logger.debug(f"Author: {result['author']}")
+
+    # Parse published date
+    time_tag = soup.find("time", {"class": "article-info__timestamp o3-editorial-typography-byline-timestamp o-date"})
+    if time_tag:
+        try:
+            result["published_at"] = datetime.strptime(time_tag.get("datetime"), "%Y-%m-%dT%H:%M:%S.%fZ")
+            logger.debug(f"Published at: {result['published_at']}")
+        except Exception as e:
+            logger.error(f"Failed to parse date: {time_tag.get('datetime')} - Error: {e}")
+            result["published_at"] = None
+    else:
+        result["published_at"] = None
+        logger.debug("No published date found")
+
+    # Parse content
+    article_tag = soup.find("article", {"id": "article-body"})
+    if article_tag:
+        result["content"] = article_tag.decode_contents()
+        logger.debug(f"Content length: {len(result['content'])} characters")
+    else:
+        result["content"] = None
+        logger.debug("No article content found")
+
+    # Parse image
+    picture_tag = soup.find("picture")
+    img_tag = picture_tag.find("img") if picture_tag else None
+    result["image_url"] = img_tag.get("src") if img_tag else None
+    logger.debug(f"Image URL: {result['image_url']}")
+
+    # Parse tags
+    tag_list = []
+    ul_tag = soup.find("ul", {"class": "concept-list__list"})
+    if ul_tag:
+        for li in ul_tag.find_all("li"):
+            a_tag = li.find("a")
+            if a_tag:
+                tag_list.append(a_tag.get_text(strip=True))
+    result["tags"] = tag_list
+    logger.debug(f"Tags: {tag_list}")
+
+    # Check if we have essential data
+    if not result.get("title") or not result.get("published_at"):
+        logger.warning(f"Article missing essential data - Title: {result.get('title')}, Date: {result.get('published_at')}")
+        return None
+
+    logger.info(f"Successfully parsed article: {result['title']}")
+    return result
@@ -0,0 +1,115 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Mapping
+
+import aiohttp
+from multidict import CIMultiDict
+
+import app.config as config
+from app import metrics
+from app.logger import logger
+from app.rate_limiter import RateLimiter, create_rate_limiter, is_throttle_status, parse_retry_after
+
+
+@dataclass
+class FetchResponse:
+    url: str
+    status: int
+    text: str | None
+    headers: Mapping[str, str]
+
+
+class Fetcher:
+    """Pooled aiohttp client shared by the listing and article stages of the spider"""
+
+    def __init__(
+        self,
+        concurrency_per_host: int = config.FETCH_CONCURRENCY_PER_HOST,
+        timeout: float = config.FETCH_TIMEOUT,
+        keepalive_timeout: float = config.FETCH_KEEPALIVE_TIMEOUT,
+        retries: int = config.FETCH_RETRIES,
+        error_retry_delay: float = config.FETCH_ERROR_RETRY_DELAY,
+        rate_limiter: RateLimiter | None = None
+    ):
+        self.concurrency_per_host = concurrency_per_host
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.retries = retries
+        self.error_retry_delay = error_retry_delay
+        self.rate_limiter = rate_limiter if rate_limiter is not None else create_rate_limiter()
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> "Fetcher":
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self.concurrency_per_host,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        logger.info(
+            f"Opened HTTP connection pool (per-host limit: {self.concurrency_per_host}, "
+            f"rate limiter: {self.rate_limiter.describe()})"
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.info("Closed HTTP connection pool")
+
+    async def get(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        cookies: dict[str, str] | None = None
+    ) -> FetchResponse:
+        if self._session is None:
+            raise RuntimeError("Fetcher is not opened, use it as 'async with Fetcher() as fetcher'")
+
+        attempt = 0
+        while True:
+            with metrics.RATE_LIMIT_WAIT_SECONDS.time():
+                await self.rate_limiter.acquire()
+            try:
+                with metrics.HTTP_REQUEST_SECONDS.time():
+                    response = await self._request(url, headers, cookies)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # No answer says nothing about the server's limits, so the rate limiter isn't told
+                metrics.HTTP_RESPONSES.inc(status="error")
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+                logger.info(f"Retrying url='{url}' after {type(e).__name__}: {e} (attempt {attempt}/{self.retries})")
+                await asyncio.sleep(self.error_retry_delay)
+                continue
+
+            metrics.HTTP_RESPONSES.inc(status=str(response.status))
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.rate_limiter.record(response.status, retry_after)
+            if not is_throttle_status(response.status) or attempt >= self.retries:
+                return response
+
+            attempt += 1
+            logger.info(f"Retrying url='{url}' after status {response.status} (attempt {attempt}/{self.retries})")
+
+    async def _request(
+        self,
+        url: str,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None
+    ) -> FetchResponse:
+        async with self._session.get(url, headers=headers, cookies=cookies) as response:
+            text = await response.text()
+            return FetchResponse(
+                url=url,
+                status=response.status,
+                text=text,
+                headers=CIMultiDict(response.headers)
+            )
@@ -0,0 +1,213 @@
+import asyncio
+import os
+import socket
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import AsyncIterator, Awaitable, Callable
+
+from sqlalchemy import text
+
+import app.config as config
+import app.database_operations as db_services
+from app import metrics
+from app.database import engine
+from app.logger import logger
+from app.rate_limiter import RateLimiter, is_throttle_status
+
+# pg_advisory_lock key of the replica walking the listing, next to MIGRATION_LOCK_ID
+LEADER_LOCK_ID = 7_241_002
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass(frozen=True)
+class FrontierItem:
+    url: str
+    page: int
+    first_run: bool
+
+
+class Frontier:
+    """This replica's side of the crawl frontier shared through Postgres (app.models.CrawlFrontier).
+
+    Keeps track of the leases it holds, batches the completion of handled URLs into one
+    statement per claim and settles which replica walks the listing.
+    """
+
+    def __init__(
+        self,
+        worker_id: str = config.FRONTIER_WORKER_ID,
+        claim_batch: int = config.FRONTIER_CLAIM_BATCH,
+        lease_seconds: float = config.FRONTIER_LEASE_SECONDS,
+        max_attempts: int = config.FRONTIER_MAX_ATTEMPTS,
+        poll_interval: float = config.FRONTIER_POLL_INTERVAL
+    ):
+        self.worker_id = worker_id or default_worker_id()
+        self.claim_batch = claim_batch
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.leases: dict[str, FrontierItem] = {}
+        # Leased URLs whose article is accepted and waits in the write stage, handed in once it is stored
+        self.unwritten: set[str] = set()
+        self._completed: list[str] = []
+        # Stop page and last page with an accepted article of the walk, as of the last sync
+        self.progress: tuple[int | None, int] = (None, 0)
+
+    @asynccontextmanager
+    async def leadership(self) -> AsyncIterator[bool]:
+        """Try to become the replica that walks the listing, for as long as the context lasts.
+
+        The session-level advisory lock goes with the connection holding it, so a replica
+        that dies hands the listing over to the next one to start a run.
+        """
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = (await conn.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": LEADER_LOCK_ID}
+            )).scalar()
+            logger.info(
+                f"Worker {self.worker_id} {'walks the listing' if acquired else 'claims URLs another replica walks the listing for'}"
+            )
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    await conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": LEADER_LOCK_ID})
+
+    async def leader_active(self) -> bool:
+        return await db_services.advisory_lock_held(LEADER_LOCK_ID)
+
+    async def add(self, urls: list[str], page: int, first_run: bool) -> None:
+        queued = await db_services.enqueue_frontier_urls(urls, page, first_run)
+        metrics.FRONTIER_URLS.inc(queued, event="queued")
+        logger.info(f"Queued {queued} of {len(urls)} URLs from page {page} in the crawl frontier")
+
+    async def claim(self) -> list[FrontierItem]:
+        await self.flush()
+        rows = await db_services.claim_frontier_urls(self.worker_id, self.claim_batch, self.lease, self.max_attempts)
+        items = [FrontierItem(*row) for row in rows]
+        self.leases.update((item.url, item) for item in items)
+        metrics.FRONTIER_URLS.inc(len(items), event="claimed")
+        return items
+
+    def complete(self, url: str) -> None:
+        """Mark a claimed URL handled, it leaves the frontier with the next flush"""
+        self.unwritten.discard(url)
+        if self.leases.pop(url, None) is not None:
+            self._completed.append(url)
+
+    def hold(self, url: str) -> None:
+        """Keep the lease of a handled URL until its article is written, see complete() and release()"""
+        if url in self.leases:
+            self.unwritten.add(url)
+
+    async def flush(self) -> None:
+        completed, self._completed = self._completed, []
+        if not completed:
+            return
+        await db_services.complete_frontier_urls(self.worker_id, completed)
+        metrics.FRONTIER_URLS.inc(len(completed), event="completed")
+
+    async def pending(self, through_page: int | None = None) -> int:
+        """URLs left to handle across all replicas, including the ones this one holds but not the
+        ones it has handled and only has to write"""
+        await self.flush()
+        return await db_services.count_frontier_urls(self.max_attempts, through_page, sorted(self.unwritten))
+
+    async def wait_for_pages(self, last_page: int) -> None:
+        """Wait until every URL of listing pages up to last_page has been handled by some replica"""
+        while await self.pending(last_page):
+            await asyncio.sleep(self.poll_interval)
+
+    async def keep_leases(self) -> None:
+        """Renew the held leases well before they run out, for as long as the task runs"""
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            renewed = await db_services.renew_frontier_leases(self.worker_id, list(self.leases), self.lease)
+            logger.debug(f"Renewed {renewed} frontier leases")
+
+    async def release(self, urls: list[str] | None = None) -> None:
+        """Hand back the given URLs or all the ones still held, e.g. when a write fails or the run is cancelled"""
+        await self.flush()
+        urls = [url for url in (urls if urls is not None else list(self.leases)) if url in self.leases]
+        for url in urls:
+            del self.leases[url]
+            self.unwritten.discard(url)
+        await db_services.release_frontier_urls(self.worker_id, urls)
+        metrics.FRONTIER_URLS.inc(len(urls), event="released")
+        if urls:
+            logger.info(f"Released {len(urls)} unhandled frontier URLs")
+
+    async def start_walk(self, origin: str) -> None:
+        await db_services.start_frontier_progress(origin)
+        self.progress = (None, 0)
+
+    async def end_walk(self, origin: str) -> None:
+        await db_services.end_frontier_progress(origin)
+
+    async def sync_progress(self, origin: str, stop_page: int | None, accepted_page: int) -> tuple[int | None, int]:
+        """Report what this replica knows about the walk's end and learn what the others found.
+
+        Returns the walk's stop page and last page with an accepted article; without a walk
+        going on, this replica's own.
+        """
+        progress = await db_services.sync_frontier_progress(origin, stop_page, accepted_page)
+        self.progress = progress if progress is not None else (stop_page, accepted_page)
+        return self.progress
+
+    async def purge_exhausted(self) -> None:
+        urls = await db_services.purge_exhausted_frontier_urls(self.max_attempts)
+        metrics.FRONTIER_URLS.inc(len(urls), event="given_up")
+        for url in urls:
+            logger.warning(f"Giving up on {url}, claimed {self.max_attempts} times without being handled")
+
+
+class SharedRateLimiter(RateLimiter):
+    """Keeps all replicas to one request schedule per origin, booked in the crawl_rate_limit table.
+
+    The wrapped limiter still adapts the pace to the responses this replica gets. Every
+    request reserves a slot at that spacing after the last one any replica booked, and a
+    throttled replica pushes everybody's next slot past its pause.
+    """
+    name = "shared"
+
+    def __init__(
+        self,
+        local: RateLimiter,
+        origin: str = config.FT_ORIGIN,
+        reserve: Callable[[str, float, float], Awaitable[float]] = db_services.reserve_request_slot,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.local = local
+        self.origin = origin
+        self._reserve = reserve
+        # Pause of a throttled response, handed to the others with the next reservation
+        self._pending_pause = 0.0
+
+    async def acquire(self) -> None:
+        pause, self._pending_pause = self._pending_pause, 0.0
+        try:
+            wait = await self._reserve(self.origin, self.local.spacing, pause)
+        except Exception as e:
+            logger.warning(f"Rate limiter [{self.name}]: shared schedule unavailable, pacing locally - {e}")
+            self._pending_pause = max(self._pending_pause, pause)
+            await self.local.acquire()
+            return
+        await self._wait(wait)
+
+    def record(self, status: int, retry_after: float | None = None) -> None:
+        self.local.record(status, retry_after)
+        if is_throttle_status(status):
+            self._pending_pause = max(self._pending_pause, self.local.pause_remaining())
+
+    @property
+    def spacing(self) -> float:
+        return self.local.spacing
+
+    def describe(self) -> str:
+        return f"shared schedule of {self.origin}, slept={self.slept_seconds:.1f}s, local {self.local.describe()}"
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping
+
+import app.config as config
+from app.logger import logger
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+    payload: Any
+
+    def validators(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """On-disk cache of ETag/Last-Modified validators keyed by URL.
+
+    Next to the validators every entry keeps the payload extracted from the page
+    (article URLs of a listing page, the parsed article), so a 304 answer needs
+    neither the body nor a new parse.
+    """
+
+    def __init__(
+        self,
+        directory: str = config.HTTP_CACHE_DIR,
+        max_bytes: int = config.HTTP_CACHE_MAX_BYTES,
+        max_age: float = config.HTTP_CACHE_MAX_AGE,
+        enabled: bool = config.HTTP_CACHE_ENABLED
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.enabled = enabled
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        if not self.enabled:
+            return None
+
+        path = self._path(url)
+        try:
+            # The file's mtime is refreshed on every revalidation, so age counts from last use
+            if time.time() - path.stat().st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, encoding="utf-8") as file:
+                return CacheEntry(**json.load(file))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Dropping unreadable HTTP cache entry for url='{url}'. Error: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def store(self, url: str, headers: Mapping[str, str], payload: Any) -> None:
+        if not self.enabled:
+            return
+
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        entry = CacheEntry(url=url, etag=etag, last_modified=last_modified, stored_at=time.time(), payload=payload)
+        path = self._path(url)
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # A temp file of its own per writer, so concurrent stores of one URL can't mix their bytes
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+            ) as file:
+                tmp_path = file.name
+                json.dump(entry.__dict__, file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to store HTTP cache entry for url='{url}'. Error: {e}")
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as recently used after a successful revalidation"""
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """Drop entries older than max_age, then least recently used ones until under max_bytes"""
+        if not self.enabled or not self.directory.exists():
+            return
+
+        now = time.time()
+        entries = []
+        total_size = 0
+        removed = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                removed += 1
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+        entries.sort()
+        while total_size > self.max_bytes and entries:
+            _, size, path = entries.pop(0)
+            path.unlink(missing_ok=True)
+            total_size -= size
+            removed += 1
+
+        logger.info(f"HTTP cache holds {len(entries)} entries ({total_size} bytes), evicted {removed}")
@@ -0,0 +1,239 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from aiohttp import web
+
+import app.config as config
+from app.logger import logger
+
+# Latency buckets from a fast local request up to the longest rate limiter pause, seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RUN_BUCKETS = (10, 30, 60, 120, 300, 600, 900, 1200, 1800, 2700, 3600, 7200)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [
+        f'{name}="{value.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), chr(92) + "n")}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric(ABC):
+    """A metric family in the Prometheus text exposition format, one series per label combination"""
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        ...
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only go up")
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float | Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        """Read the value from function whenever the metrics are scraped, e.g. a queue's qsize"""
+        self._values[self._key(labels)] = function
+
+    def value(self, **labels: str) -> float:
+        value = self._values.get(self._key(labels), 0)
+        return value() if callable(value) else value
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items(), key=lambda item: item[0]):
+            value = value() if callable(value) else value
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per series: observations per bucket (not cumulative), sum and count
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        if key not in self._series:
+            self._series[key] = ([0] * len(self.buckets), [0.0, 0])
+        counts, totals = self._series[key]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        totals[0] += value
+        totals[1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall time of the with block, including time spent awaiting inside it"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return series[1][1] if series else 0
+
+    def sum(self, **labels: str) -> float:
+        series = self._series.get(self._key(labels))
+        return series[1][0] if series else 0.0
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, (total, count)) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP client: every attempt the fetcher makes, including retries of throttled requests
+HTTP_RESPONSES = REGISTRY.register(Counter(
+    "parser_http_responses_total", "HTTP responses by status code ('error' for failed requests)", ("status",)
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "parser_http_request_seconds", "Time of a single HTTP request, excluding rate limiter waits"
+))
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "parser_rate_limit_wait_seconds", "Time requests waited for the rate limiter, pauses after throttling included"
+))
+
+# Crawl stages
+FETCH_SECONDS = REGISTRY.register(Histogram(
+    "parser_fetch_seconds", "Time to fetch a page, rate limiter waits and retries included", ("kind",)
+))
+FETCHES = REGISTRY.register(Counter(
+    "parser_fetches_total", "Fetched pages by kind and final status ('error' for failed requests)", ("kind", "status")
+))
+PARSE_SECONDS = REGISTRY.register(Histogram(
+    "parser_parse_seconds", "Time to parse an article page, time waiting for a free worker excluded"
+))
+DB_WRITE_SECONDS = REGISTRY.register(Histogram(
+    "parser_db_write_seconds", "Time to write a batch of articles to the database"
+))
+ARTICLES = REGISTRY.register(Counter(
+    "parser_articles_total", "Articles by what became of them", ("outcome",)
+))
+ARTICLES_WRITTEN = REGISTRY.register(Counter(
+    "parser_articles_written_total", "Articles sent to the database by write result", ("result",)
+))
+FRONTIER_URLS = REGISTRY.register(Counter(
+    "parser_frontier_urls_total", "Shared crawl frontier URLs this replica queued, claimed, completed, released or gave up", ("event",)
+))
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "parser_queue_depth", "Items waiting in a crawl pipeline queue", ("queue",)
+))
+
+# Runs
+RUNS = REGISTRY.register(Counter("parser_runs_total", "Spider runs by result", ("result",)))
+RUN_SECONDS = REGISTRY.register(Histogram("parser_run_seconds", "Duration of a spider run", buckets=RUN_BUCKETS))
+LAST_RUN_TIMESTAMP = REGISTRY.register(Gauge(
+    "parser_last_run_timestamp_seconds", "Unix time at which the last spider run finished"
+))
+
+
+async def start_metrics_server(
+    port: int = config.METRICS_PORT,
+    host: str = config.METRICS_HOST,
+    registry: Registry = REGISTRY
+) -> web.AppRunner:
+    """Serve the registry on http://host:port/metrics until the returned runner is cleaned up"""
+
+    async def handle_metrics(request: web.Request) -> web.Response:
+        return web.Response(body=registry.render().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.logger import logger
+
+# pg_advisory_xact_lock key: the parser and the API both run init_db on startup
+MIGRATION_LOCK_ID = 7_241_001
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    statements: tuple[str, ...]
+
+
+# Applied in order to databases created by create_all as well as to ones restored from an
+# older dump, so every statement has to hold for both (IF NOT EXISTS, widening only).
+# Append new migrations at the end, never edit one that has been released. New tables, such
+# as crawl_frontier, need none: create_all adds the ones missing from either kind of database.
+MIGRATIONS = (
+    Migration(1, "Reconcile article columns with the model", (
+        # Restored dumps have title varchar(400) NOT NULL, content NOT NULL and
+        # author varchar(200) NOT NULL, which rejects articles without a byline
+        # Postgres refuses any type change of a column search_vector is generated from, even to
+        # the type it has already, and create_all has made both on new databases
+        "DO $$ BEGIN "
+        "IF (SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = 'article'::regclass AND attname = 'title') <> 'character varying(1000)' THEN "
+        "ALTER TABLE article ALTER COLUMN title TYPE varchar(1000); "
+        "END IF; "
+        "END $$",
+        "ALTER TABLE article ALTER COLUMN title DROP NOT NULL",
+        "ALTER TABLE article ALTER COLUMN content DROP NOT NULL",
+        "ALTER TABLE article ALTER COLUMN author TYPE varchar(400)",
+        "ALTER TABLE article ALTER COLUMN author DROP NOT NULL",
+    )),
+    Migration(2, "Index article listing, recency and tag lookups", (
+        # Leading column also serves published_at range filters and sorts on its own
+        "CREATE INDEX IF NOT EXISTS ix_article_published_at_url ON article (published_at, url)",
+        "CREATE INDEX IF NOT EXISTS ix_article_scraped_at ON article (scraped_at)",
+        "CREATE INDEX IF NOT EXISTS ix_article_tags ON article USING gin (tags)",
+    )),
+    Migration(3, "Add full-text search vector", (
+        # Same expression as Article.search_vector, rewrites the table once to fill it for stored articles
+        "ALTER TABLE article ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(subtitle, '')), 'B') || "
+        "setweight(to_tsvector('english', regexp_replace(coalesce(content, ''), '<[^>]*>', ' ', 'g')), 'C')"
+        ") STORED",
+        "CREATE INDEX IF NOT EXISTS ix_article_search_vector ON article USING gin (search_vector)",
+    )),
+    Migration(4, "Index author lookups", (
+        "CREATE INDEX IF NOT EXISTS ix_article_author_published_at ON article (author, published_at)",
+    )),
+    Migration(5, "Store article bodies as plain text and gzipped HTML", (
+        "ALTER TABLE article ADD COLUMN IF NOT EXISTS content_text text",
+        "ALTER TABLE article ADD COLUMN IF NOT EXISTS content_html_gz bytea",
+        # gzip output doesn't shrink any further, spare TOAST the attempt
+        "ALTER TABLE article ALTER COLUMN content_html_gz SET STORAGE EXTERNAL",
+        # Index search over content_text. Generation expressions can't be changed in place and
+        # rebuilding the column rewrites the table, so only databases from before this get it;
+        # create_all has made the current one on new databases already
+        "DO $$ BEGIN "
+        "IF NOT EXISTS ("
+        "SELECT 1 FROM pg_attribute a JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum "
+        "WHERE a.attrelid = 'article'::regclass AND a.attname = 'search_vector' AND NOT a.attisdropped "
+        "AND pg_get_expr(d.adbin, d.adrelid) LIKE '%content_text%'"
+        ") THEN "
+        "ALTER TABLE article DROP COLUMN IF EXISTS search_vector; "
+        "ALTER TABLE article ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(subtitle, '')), 'B') || "
+        "setweight(to_tsvector('english', "
+        "coalesce(content_text, regexp_replace(coalesce(content, ''), '<[^>]*>', ' ', 'g'))), 'C')"
+        ") STORED; "
+        "END IF; "
+        "END $$",
+        "CREATE INDEX IF NOT EXISTS ix_article_search_vector ON article USING gin (search_vector)",
+    )),
+    Migration(6, "Track content changes of re-scraped articles", (
+        # Left empty for stored articles: the first recrawl of each one writes it once
+        "ALTER TABLE article ADD COLUMN IF NOT EXISTS content_hash varchar(64)",
+        "ALTER TABLE article ADD COLUMN IF NOT EXISTS updated_at timestamp without time zone",
+        "ALTER TABLE article ADD COLUMN IF NOT EXISTS last_checked_at timestamp without time zone",
+    )),
+)
+
+
+async def get_schema_version(conn: AsyncConnection) -> int:
+    result = await conn.execute(text("SELECT coalesce(max(version), 0) FROM schema_version"))
+    return result.scalar()
+
+
+async def migrate(conn: AsyncConnection, migrations: tuple[Migration, ...] = MIGRATIONS) -> int:
+    """Apply the migrations newer than the recorded schema version, in the caller's transaction.
+
+    Returns the schema version the database is at afterwards.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version integer PRIMARY KEY, "
+        "description text NOT NULL, "
+        "applied_at timestamp without time zone NOT NULL DEFAULT now())"
+    ))
+
+    version = await get_schema_version(conn)
+    pending = [migration for migration in migrations if migration.version > version]
+    if not pending:
+        logger.info(f"Database schema is up to date (version {version})")
+        return version
+
+    for migration in pending:
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        for statement in migration.statements:
+            await conn.execute(text(statement))
+        await conn.execute(
+            text("INSERT INTO schema_version (version, description) VALUES (:version, :description)"),
+            {"version": migration.version, "description": migration.description}
+        )
+        version = migration.version
+
+    logger.info(f"Database schema migrated to version {version}")
+    return version
@@ -1,10 +1,21 @@
 from typing import List
-from sqlalchemy import String, DateTime, Text, Integer, ARRAY
+from sqlalchemy import String, DateTime, Text, Integer, Boolean, Index, Computed, LargeBinary, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 
 from app.database import Base
 
+# Text search configuration of search_vector, queries have to use the same one
+SEARCH_CONFIG = "english"
+# Title ranks above the standfirst, which ranks above the body text (that of raw HTML
+# content with its tags stripped for rows migrate_content.py hasn't reached yet)
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(subtitle, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+    f"coalesce(content_text, regexp_replace(coalesce(content, ''), '<[^>]*>', ' ', 'g'))), 'C')"
+)
 
 
 class Article(Base):
@@ -12,10 +23,103 @@ class Article(Base):
 
     url: Mapped[str] = mapped_column(String(2048), primary_key=True)
     title: Mapped[str] = mapped_column(String(1000), nullable=True)
+    # Raw body HTML of articles stored before content_text and content_html_gz, which
+    # migrate_content.py moves over; new articles leave it empty (see app/content.py)
     content: Mapped[str] = mapped_column(Text, nullable=True)
+    content_text: Mapped[str] = mapped_column(Text, nullable=True)
+    content_html_gz: Mapped[bytes] = mapped_column(LargeBinary, nullable=True, deferred=True)
     author: Mapped[str] = mapped_column(String(400), nullable=True)
     published_at: Mapped[datetime] = mapped_column(DateTime)
     scraped_at: Mapped[datetime] = mapped_column(DateTime)
     subtitle: Mapped[str] = mapped_column(String(400), nullable=True)
     tags: Mapped[List[str]] = mapped_column(ARRAY(String), nullable=True)
     image_url: Mapped[str] = mapped_column(String(400), nullable=True)
+    # sha256 of the extracted fields (app/content.py), a re-scrape only writes the row when it changes
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True)
+    # When the extracted fields last changed and when the recrawl last fetched the article
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    last_checked_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # Kept up to date by Postgres on every insert and update, whichever way rows are written
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True), nullable=True, deferred=True
+    )
+
+    # Existing databases get these through app/migrations.py, keep both in step
+    __table_args__ = (
+        # Serves the API's keyset pagination on (published_at DESC, url DESC) with a backward scan
+        # and, through its leading column, every published_at filter and sort
+        Index("ix_article_published_at_url", "published_at", "url"),
+        Index("ix_article_scraped_at", "scraped_at"),
+        Index("ix_article_tags", "tags", postgresql_using="gin"),
+        # Author filters and the author facet of a time range
+        Index("ix_article_author_published_at", "author", "published_at"),
+        Index("ix_article_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+class CrawlFrontier(Base):
+    """Article URLs found on the listing and not yet handled, shared by all parser replicas.
+
+    Replicas claim rows with FOR UPDATE SKIP LOCKED and lease them while they fetch, parse
+    and write them; a handled row is deleted, the lease of a crashed replica runs out.
+    """
+    __tablename__ = "crawl_frontier"
+
+    url: Mapped[str] = mapped_column(String(2048), primary_key=True)
+    # Listing page the URL was found on, lower pages are claimed first
+    page: Mapped[int] = mapped_column(Integer)
+    # Time window of the run that queued it, a 30 day backfill or the regular hour
+    first_run: Mapped[bool] = mapped_column(Boolean, default=False)
+    queued_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.localtimestamp())
+    lease_owner: Mapped[str] = mapped_column(String(200), nullable=True)
+    lease_expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # Claims so far, URLs that keep taking their worker down are given up after FRONTIER_MAX_ATTEMPTS
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_crawl_frontier_page_queued_at", "page", "queued_at"),
+    )
+
+
+class CrawlFrontierProgress(Base):
+    """How far the shared listing walk of an origin has got, as found by any replica.
+
+    Reset by the replica walking the listing when its walk starts and dropped when its
+    run is over; the others report what they learn from the articles they parse, so the
+    walk ends on an out-of-window article whichever replica fetched it.
+    """
+    __tablename__ = "crawl_frontier_progress"
+
+    origin: Mapped[str] = mapped_column(String(400), primary_key=True)
+    # Lowest listing page an article older than the time window was found on
+    stop_page: Mapped[int] = mapped_column(Integer, nullable=True)
+    # Highest listing page an article was accepted from
+    accepted_page: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class CrawlRateLimit(Base):
+    """Request schedule of an origin shared by all parser replicas, so together they keep to one rate"""
+    __tablename__ = "crawl_rate_limit"
+
+    origin: Mapped[str] = mapped_column(String(400), primary_key=True)
+    # Earliest start of the next request, every request pushes it on by its spacing
+    next_request_at: Mapped[datetime] = mapped_column(DateTime)
+    # Set when a replica is throttled, holds back all of them
+    paused_until: Mapped[datetime] = mapped_column(DateTime)
+
+
+class CrawlCheckpoint(Base):
+    """Progress of the latest listing walk of an origin, one row per origin (app/checkpoint.py)"""
+    __tablename__ = "crawl_checkpoint"
+
+    origin: Mapped[str] = mapped_column(String(400), primary_key=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime)
+    first_run: Mapped[bool] = mapped_column(Boolean)
+    catching_up: Mapped[bool] = mapped_column(Boolean)
+    page: Mapped[int] = mapped_column(Integer)
+    stop_page: Mapped[int] = mapped_column(Integer, nullable=True)
+    # {url: listing page} of the URLs queued and not stored yet
+    pending: Mapped[dict] = mapped_column(JSONB)
+    saved_at: Mapped[datetime] = mapped_column(DateTime)
+    # Set once the run is over, the row then only tells a restarted parser that it isn't the first run
+    finished_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
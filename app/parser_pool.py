@@ -0,0 +1,63 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import app.config as config
+from app import metrics
+from app.extractor import parse_article
+from app.logger import logger
+
+
+def parse_document(text: str, engine: str) -> tuple[dict[str, str|None|datetime] | None, float]:
+    """Parse an article page, returning the result and the seconds the parse itself took"""
+    started = time.perf_counter()
+    article = parse_article(text, engine)
+    return article, time.perf_counter() - started
+
+
+class ParserPool:
+    """Parses raw article HTML in worker processes, keeping at most max_in_flight documents queued"""
+
+    def __init__(
+        self,
+        workers: int = config.PARSER_WORKERS,
+        max_in_flight: int | None = config.PARSER_MAX_IN_FLIGHT,
+        engine: str = config.PARSER_ENGINE
+    ):
+        self.workers = workers
+        self.max_in_flight = max_in_flight or max(1, workers) * 2
+        self.engine = engine
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    async def __aenter__(self) -> "ParserPool":
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        logger.info(
+            f"Started parser pool (workers: {self.workers or 'inline'}, "
+            f"max in flight: {self.max_in_flight}, engine: {self.engine})"
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("Stopped parser pool")
+
+    async def parse(self, text: str) -> dict[str, str|None|datetime] | None:
+        # Callers wait here once max_in_flight documents are queued, so fetched HTML can't pile up
+        async with self._semaphore:
+            if self._executor is None:
+                article, seconds = parse_document(text, self.engine)
+            else:
+                # Timed in the worker: documents queue in the executor for a free process first
+                article, seconds = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, parse_document, text, self.engine
+                )
+        metrics.PARSE_SECONDS.observe(seconds)
+        return article
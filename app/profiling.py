@@ -0,0 +1,168 @@
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+import app.config as config
+from app.logger import logger
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+class ProfileSession:
+    """CPU profile and tracemalloc diff of one crawl run or API request, written to directory on stop()"""
+
+    # tracemalloc is process wide: the first session to need it starts it and the last one stops it.
+    # Sessions overlap (a run and its recrawl, concurrent requests) while there is only one peak,
+    # so every reset first folds it into the peaks of the sessions still open
+    _tracing_lock = threading.Lock()
+    _memory_sessions: list["ProfileSession"] = []
+
+    def __init__(self, name: str, directory: str, profiler: str, memory: bool, memory_top: int):
+        self.name = name
+        self.directory = directory
+        self.profiler = profiler
+        self.memory = memory
+        self.memory_top = memory_top
+        self._cpu = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._peak = 0
+        self._started_at = 0.0
+
+    def start(self) -> "ProfileSession":
+        if self.memory:
+            with ProfileSession._tracing_lock:
+                if not ProfileSession._memory_sessions and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                _, peak = tracemalloc.get_traced_memory()
+                for session in ProfileSession._memory_sessions:
+                    session._peak = max(session._peak, peak)
+                tracemalloc.reset_peak()
+                ProfileSession._memory_sessions.append(self)
+            self._snapshot = tracemalloc.take_snapshot()
+
+        if self.profiler == "pyinstrument":
+            self._cpu = pyinstrument.Profiler(async_mode="enabled")
+            self._cpu.start()
+        else:
+            self._cpu = cProfile.Profile()
+            try:
+                self._cpu.enable()
+            except ValueError:
+                # Another profiler is already active on this thread
+                logger.warning(f"Profiler busy, skipping CPU profile of {self.name}")
+                self._cpu = None
+        self._started_at = time.perf_counter()
+        return self
+
+    def stop(self) -> None:
+        elapsed = time.perf_counter() - self._started_at
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_cpu_report(elapsed)
+            self._write_memory_report()
+        except OSError as e:
+            logger.error(f"Failed to write profile of {self.name} to {self.directory}: {e}")
+        finally:
+            if self.memory:
+                with ProfileSession._tracing_lock:
+                    ProfileSession._memory_sessions.remove(self)
+                    if not ProfileSession._memory_sessions:
+                        tracemalloc.stop()
+        logger.info(f"Wrote profile {self.name} ({elapsed:.2f}s) to {self.directory}")
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.directory, f"{self.name}{suffix}")
+
+    def _write_cpu_report(self, elapsed: float) -> None:
+        if self._cpu is None:
+            return
+        if self.profiler == "pyinstrument":
+            self._cpu.stop()
+            with open(self._path(".html"), "w", encoding="utf-8") as file:
+                file.write(self._cpu.output_html())
+            with open(self._path(".txt"), "w", encoding="utf-8") as file:
+                file.write(self._cpu.output_text(unicode=True))
+            return
+
+        self._cpu.disable()
+        self._cpu.dump_stats(self._path(".prof"))
+        report = io.StringIO()
+        report.write(f"{self.name}: {elapsed:.3f}s wall time\n\n")
+        pstats.Stats(self._cpu, stream=report).sort_stats("cumulative").print_stats(50)
+        with open(self._path(".txt"), "w", encoding="utf-8") as file:
+            file.write(report.getvalue())
+
+    def _write_memory_report(self) -> None:
+        if self._snapshot is None:
+            return
+        snapshot = tracemalloc.take_snapshot()
+        with ProfileSession._tracing_lock:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(self._peak, peak)
+        ignored = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        differences = snapshot.filter_traces(ignored).compare_to(self._snapshot.filter_traces(ignored), "lineno")
+
+        with open(self._path(".memory.txt"), "w", encoding="utf-8") as file:
+            file.write(f"{self.name}: traced memory {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n")
+            file.write(f"Top {self.memory_top} allocation sites by growth:\n\n")
+            for difference in differences[:self.memory_top]:
+                file.write(f"{difference}\n")
+
+
+class Profiler:
+    """Profiles a sampled share of crawl runs or API requests, configured through the PROFILE_* settings"""
+
+    def __init__(
+        self,
+        kind: str,
+        sample_rate: float,
+        enabled: bool = config.PROFILE_ENABLED,
+        directory: str = config.PROFILE_DIR,
+        profiler: str = config.PROFILER,
+        memory: bool = config.PROFILE_MEMORY,
+        memory_top: int = config.PROFILE_MEMORY_TOP
+    ):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of {', '.join(PROFILERS)}")
+        if profiler == "pyinstrument" and pyinstrument is None:
+            logger.warning("pyinstrument is not installed, falling back to cProfile")
+            profiler = "cprofile"
+        self.kind = kind
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+        self.directory = directory
+        self.profiler = profiler
+        self.memory = memory
+        self.memory_top = memory_top
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def session(self, profile_id: str) -> ProfileSession | None:
+        """A started session for a sampled run or request, None for the others"""
+        if not self.should_sample():
+            return None
+        name = f"{self.kind}-{datetime.now():%Y%m%dT%H%M%S}-{profile_id}"
+        return ProfileSession(name, self.directory, self.profiler, self.memory, self.memory_top).start()
+
+    @contextmanager
+    def profile(self, profile_id: str) -> Iterator[ProfileSession | None]:
+        session = self.session(profile_id)
+        try:
+            yield session
+        finally:
+            if session is not None:
+                session.stop()
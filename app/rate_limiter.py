@@ -0,0 +1,202 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable
+
+import app.config as config
+from app.logger import logger
+
+# Statuses FT answers with when it wants us to slow down
+THROTTLE_STATUSES = {406, 429}
+
+
+def is_throttle_status(status: int) -> bool:
+    return status in THROTTLE_STATUSES or status >= 500
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given either as delay-seconds or as an HTTP-date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Unparseable Retry-After header: {value!r}")
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter(ABC):
+    """Paces outgoing requests. acquire() is awaited before a request, record() is called with the status
+    it was answered with; requests that got no answer at all are not recorded"""
+    name = "base"
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = asyncio.Lock()
+        self.paused_until = 0.0
+        self.slept_seconds = 0.0
+
+    @abstractmethod
+    async def acquire(self) -> None:
+        ...
+
+    @abstractmethod
+    def record(self, status: int, retry_after: float | None = None) -> None:
+        ...
+
+    @abstractmethod
+    def describe(self) -> str:
+        ...
+
+    @property
+    @abstractmethod
+    def spacing(self) -> float:
+        """Seconds between requests at the current pace"""
+
+    def pause_remaining(self) -> float:
+        return max(0.0, self.paused_until - self._clock())
+
+    async def _wait(self, seconds: float) -> None:
+        if seconds > 0:
+            self.slept_seconds += seconds
+            await self._sleep(seconds)
+
+    def _pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, self._clock() + seconds)
+
+
+class FixedDelayRateLimiter(RateLimiter):
+    """The original pacing: a fixed delay between requests and a long pause when throttled"""
+    name = "fixed"
+
+    def __init__(
+        self,
+        delay: float = config.RATE_LIMIT_FIXED_DELAY,
+        backoff: float = config.RATE_LIMIT_BACKOFF,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.backoff = backoff
+        self._next_request_at = 0.0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = self._clock()
+            start_at = max(now, self._next_request_at, self.paused_until)
+            self._next_request_at = start_at + self.delay
+            await self._wait(start_at - now)
+
+    def record(self, status: int, retry_after: float | None = None) -> None:
+        if is_throttle_status(status):
+            pause = retry_after if retry_after is not None else self.backoff
+            self._pause(pause)
+            logger.warning(f"Rate limiter [{self.name}]: got status {status}, pausing for {pause:.0f}s")
+
+    @property
+    def spacing(self) -> float:
+        return self.delay
+
+    def describe(self) -> str:
+        return f"fixed delay={self.delay:.1f}s, slept={self.slept_seconds:.1f}s"
+
+
+class AimdRateLimiter(RateLimiter):
+    """Token bucket whose refill rate grows additively on success and shrinks multiplicatively on throttling"""
+    name = "aimd"
+
+    def __init__(
+        self,
+        initial_rate: float = config.RATE_LIMIT_INITIAL_RATE,
+        min_rate: float = config.RATE_LIMIT_MIN_RATE,
+        max_rate: float = config.RATE_LIMIT_MAX_RATE,
+        increase: float = config.RATE_LIMIT_INCREASE,
+        decrease_factor: float = config.RATE_LIMIT_DECREASE_FACTOR,
+        burst: float = config.RATE_LIMIT_BURST,
+        backoff: float = config.RATE_LIMIT_BACKOFF,
+        max_backoff: float = config.RATE_LIMIT_MAX_BACKOFF,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.burst = burst
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.tokens = 1.0
+        self.consecutive_throttles = 0
+        self._updated_at = self._clock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = self._clock()
+            if now < self.paused_until:
+                await self._wait(self.paused_until - now)
+                now = self._clock()
+            self._refill(now)
+            if self.tokens < 1:
+                await self._wait((1 - self.tokens) / self.rate)
+                self._refill(self._clock())
+            self.tokens -= 1
+
+    def record(self, status: int, retry_after: float | None = None) -> None:
+        self._refill(self._clock())
+        if not is_throttle_status(status):
+            self.consecutive_throttles = 0
+            self.rate = min(self.max_rate, self.rate + self.increase)
+            logger.debug(f"Rate limiter: {self.describe()}")
+            return
+
+        self.consecutive_throttles += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.tokens = min(self.tokens, 0.0)
+        if retry_after is not None:
+            pause = retry_after
+        else:
+            pause = min(self.max_backoff, self.backoff * 2 ** (self.consecutive_throttles - 1))
+        self._pause(pause)
+        logger.warning(f"Rate limiter: got status {status}, pausing for {pause:.0f}s - {self.describe()}")
+
+    @property
+    def spacing(self) -> float:
+        return 1 / self.rate
+
+    def describe(self) -> str:
+        return (
+            f"aimd rate={self.rate:.2f} req/s, tokens={self.tokens:.2f}, "
+            f"throttled {self.consecutive_throttles}x in a row, slept={self.slept_seconds:.1f}s"
+        )
+
+
+RATE_LIMITERS: dict[str, type[RateLimiter]] = {
+    FixedDelayRateLimiter.name: FixedDelayRateLimiter,
+    AimdRateLimiter.name: AimdRateLimiter,
+}
+
+
+def create_rate_limiter(kind: str = config.RATE_LIMITER, **kwargs) -> RateLimiter:
+    try:
+        limiter_class = RATE_LIMITERS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown rate limiter '{kind}', expected one of: {', '.join(RATE_LIMITERS)}")
+    return limiter_class(**kwargs)
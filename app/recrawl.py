@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# A check is due this share of its interval early, so an hourly schedule isn't skipped
+# by a run that happens to start a few seconds before the hour is up
+EARLY_SHARE = 0.1
+
+
+@dataclass(frozen=True)
+class RecrawlCandidate:
+    url: str
+    published_at: datetime
+    last_checked_at: datetime | None
+    content_hash: str | None
+
+
+class RecrawlSchedule:
+    """How often stored articles are revisited, less often the older they get.
+
+    Built from (max age, interval) steps: an article younger than the first max age is
+    checked every first interval, and so on; articles older than the last max age are
+    left alone.
+    """
+
+    def __init__(self, steps: list[tuple[timedelta, timedelta]]):
+        self.steps = sorted(steps)
+
+    @classmethod
+    def parse(cls, spec: str) -> "RecrawlSchedule":
+        """Parse 'max_age:interval' pairs in hours, e.g. '24:1,72:6,168:24'"""
+        steps = []
+        for step in spec.split(","):
+            if not step.strip():
+                continue
+            try:
+                max_age, interval = (float(value) for value in step.split(":"))
+            except ValueError as e:
+                raise ValueError(f"Invalid recrawl schedule step '{step}', expected 'max_age_hours:interval_hours'") from e
+            if max_age <= 0 or interval <= 0:
+                raise ValueError(f"Invalid recrawl schedule step '{step}', hours have to be positive")
+            steps.append((timedelta(hours=max_age), timedelta(hours=interval)))
+        return cls(steps)
+
+    @property
+    def horizon(self) -> timedelta:
+        """Age after which articles are never revisited"""
+        return self.steps[-1][0] if self.steps else timedelta(0)
+
+    def interval(self, age: timedelta) -> timedelta | None:
+        for max_age, interval in self.steps:
+            if age < max_age:
+                return interval
+        return None
+
+    def is_due(self, candidate: RecrawlCandidate, now: datetime) -> bool:
+        interval = self.interval(now - candidate.published_at)
+        if interval is None:
+            return False
+        if candidate.last_checked_at is None:
+            return True
+        return now - candidate.last_checked_at >= interval * (1 - EARLY_SHARE)
+
+    def describe(self) -> str:
+        return ", ".join(
+            f"every {interval.total_seconds() / 3600:g}h until {max_age.total_seconds() / 3600:g}h old"
+            for max_age, interval in self.steps
+        ) or "never"
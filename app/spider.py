@@ -1,257 +1,824 @@
-from datetime import datetime
-import requests
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from bs4 import BeautifulSoup, Tag
 import asyncio
+import time
+from typing import Awaitable
 
 import app.database_operations as db_services
+from app import metrics
+from app.checkpoint import Checkpoint
+from app.content import compact_article
+from app.fetcher import Fetcher, FetchResponse
+from app.frontier import Frontier, SharedRateLimiter
+from app.http_cache import CacheEntry, HttpCache
+from app.parser_pool import ParserPool
 from app.logger import logger
+from app.rate_limiter import RateLimiter, create_rate_limiter
+from app.recrawl import RecrawlSchedule
+from app.url_index import KnownUrlIndex
 import app.config as config
 
 
 def get_articles_urls(content: Tag)->list[str]:
-    urls = list()
+    # dict keeps the listing order while making the duplicate check O(1)
+    urls = dict()
     all_links = content.find_all('a')
     logger.debug(f"Found {len(all_links)} total links on page")
     
     for url in all_links:
         href = url.get("href", "")
         if href.startswith("/content") and href not in urls:
-            urls.append(href)
+            urls[href] = None
             logger.debug(f"Added article URL: {href}")
     
     logger.info(f"Extracted {len(urls)} unique article URLs from page")
-    return urls
+    return list(urls)
+
+def parse_teaser_timestamp(value: str | None) -> datetime | None:
+    """Parse a listing <time datetime="..."> value into naive UTC, like article publish dates"""
+    if not value:
+        return None
+    try:
+        timestamp = datetime.fromisoformat(value.strip())
+    except ValueError:
+        logger.debug(f"Unparseable teaser timestamp: {value}")
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def get_articles_teasers(content: Tag)->dict[str, datetime | None]:
+    """Article URLs of a listing page in listing order, with the publish time shown on their teaser.
+
+    A link's teaser is its closest ancestor holding a <time datetime> element; the time is
+    only used if that ancestor links to no other article, so neighbouring teasers can't mix.
+    """
+    teasers = dict()
+    for link in content.find_all('a', href=True):
+        href = link["href"]
+        if not href.startswith("/content") or href in teasers:
+            continue
+
+        published_at = None
+        for ancestor in link.parents:
+            time_tag = ancestor.find("time", datetime=True)
+            if time_tag is None:
+                continue
+            linked = {a["href"] for a in ancestor.find_all('a', href=True) if a["href"].startswith("/content")}
+            if linked == {href}:
+                published_at = parse_teaser_timestamp(time_tag["datetime"])
+            break
+        teasers[href] = published_at
+
+    logger.info(
+        f"Extracted {len(teasers)} unique article URLs from page, "
+        f"{sum(1 for published_at in teasers.values() if published_at)} with teaser timestamps"
+    )
+    return teasers
 
 def should_parse_article(
     published_at: datetime,
     hours: int = None,
     days: int = None,
-    parsing_start_at: datetime=datetime.now()
+    parsing_start_at: datetime | None = None
 ) -> bool:
+    if parsing_start_at is None:
+        parsing_start_at = datetime.now()
     if hours is not None:
         return (parsing_start_at - published_at).total_seconds() <= hours * 3600
     elif days is not None:
         return (parsing_start_at - published_at).days <= days
     return False
 
-def parse_article(text: str)->dict[str, str|None|datetime] | None:
-    soup = BeautifulSoup(text, "html.parser")
-    
-    # Check for paywall
-    if soup.find("a", {"id": "charge-button"}):
-        logger.debug("Found paywall button - skipping article")
+def article_to_payload(article: dict[str, str|None|datetime] | None) -> dict | None:
+    if article is None:
         return None
-    
-    result = {}
-    logger.debug("Starting to parse article content")
-
-    # Parse title
-    title_tag = soup.find("span", {"class": "headline__text"})
-    result["title"] = title_tag.get_text(strip=True) if title_tag else None
-    logger.debug(f"Title: {result['title']}")
-
-    # Parse subtitle
-    subtitle_tag = soup.find("div", {"class": "o-topper__standfirst"})
-    result["subtitle"] = subtitle_tag.get_text(strip=True) if subtitle_tag else None
-    logger.debug(f"Subtitle: {result['subtitle']}")
-
-    # Parse author
-    author_tag = soup.find("a", {"class": "o3-editorial-typography-byline-author"})
-    result["author"] = author_tag.get_text(strip=True) if author_tag else None
-    logger.debug(f"Author: {result['author']}")
-
-    # Parse published date
-    time_tag = soup.find("time", {"class": "article-info__timestamp o3-editorial-typography-byline-timestamp o-date"})
-    if time_tag:
-        try:
-            result["published_at"] = datetime.strptime(time_tag.get("datetime"), "%Y-%m-%dT%H:%M:%S.%fZ")
-            logger.debug(f"Published at: {result['published_at']}")
-        except Exception as e:
-            logger.error(f"Failed to parse date: {time_tag.get('datetime')} - Error: {e}")
-            result["published_at"] = None
-    else:
-        result["published_at"] = None
-        logger.debug("No published date found")
-
-    # Parse content
-    article_tag = soup.find("article", {"id": "article-body"})
-    if article_tag:
-        result["content"] = article_tag.decode_contents()
-        logger.debug(f"Content length: {len(result['content'])} characters")
-    else:
-        result["content"] = None
-        logger.debug("No article content found")
-
-    # Parse image
-    picture_tag = soup.find("picture")
-    img_tag = picture_tag.find("img") if picture_tag else None
-    result["image_url"] = img_tag.get("src") if img_tag else None
-    logger.debug(f"Image URL: {result['image_url']}")
-
-    # Parse tags
-    tag_list = []
-    ul_tag = soup.find("ul", {"class": "concept-list__list"})
-    if ul_tag:
-        for li in ul_tag.find_all("li"):
-            a_tag = li.find("a")
-            if a_tag:
-                tag_list.append(a_tag.get_text(strip=True))
-    result["tags"] = tag_list
-    logger.debug(f"Tags: {tag_list}")
-
-    # Check if we have essential data
-    if not result.get("title") or not result.get("published_at"):
-        logger.warning(f"Article missing essential data - Title: {result.get('title')}, Date: {result.get('published_at')}")
+    published_at = article.get("published_at")
+    return {**article, "published_at": published_at.isoformat() if published_at else None}
+
+def article_from_payload(payload: dict | None) -> dict[str, str|None|datetime] | None:
+    if payload is None:
         return None
+    published_at = payload.get("published_at")
+    return {**payload, "published_at": datetime.fromisoformat(published_at) if published_at else None}
+
+def teasers_to_payload(teasers: dict[str, datetime | None]) -> list:
+    return [[url, published_at.isoformat() if published_at else None] for url, published_at in teasers.items()]
+
+def teasers_from_payload(payload: list) -> dict[str, datetime | None]:
+    teasers = dict()
+    for item in payload:
+        # Entries cached before teaser timestamps were extracted hold bare URLs
+        url, published_at = (item, None) if isinstance(item, str) else item
+        teasers[url] = datetime.fromisoformat(published_at) if published_at else None
+    return teasers
+
+@dataclass
+class CrawlStats:
+    """Counts of a single spider run, the process-wide totals are in app.metrics"""
+    listing_pages: int = 0
+    requested_articles: int = 0
+    parsed_articles: int = 0
+    rejected_articles: int = 0
+    unchanged_articles: int = 0
 
-    logger.info(f"Successfully parsed article: {result['title']}")
-    return result
 
 class Spider:
+    """Crawls FT listing pages as a pipeline of stages connected by bounded queues:
+
+    listing discovery -> article fetch -> parse -> batched DB write
+
+    Every stage works on its own, so listing page N+1 is fetched while page N's
+    articles are still in flight, and memory stays flat however deep the crawl goes.
+    A recrawl run feeds the same pipeline with stored articles due for a revisit
+    instead, and writes only the ones whose content changed.
+
+    With a shared Frontier, discovery queues URLs in Postgres instead, and only on the
+    replica that holds the listing lock; every replica feeds its fetch stage with URLs
+    claimed from there, so any number of them crawl one listing without fetching an
+    article twice.
+
+    Whichever process walks the listing saves its progress after every page (Checkpoint),
+    so a restarted parser carries on with the interrupted run rather than starting over.
+    """
     first_run = None
     start_time = None
-    require_subscription = 0
-    requested_articles = 0
-    parsed_articles = 0
-    base_url = "https://www.ft.com{}"
-    main_page_url = "https://www.ft.com".format("/world?page={}")
+    base_url = config.FT_ORIGIN + "{}"
+    main_page_url = config.FT_ORIGIN + "/world?page={}"
 
-    def __init__(self, first_run: bool = False):
+    def __init__(
+        self,
+        first_run: bool = False,
+        fetch_mode: str = config.FETCH_MODE,
+        origin: str | None = None,
+        frontier: Frontier | None = None
+    ):
         self.first_run = first_run
+        if origin is not None:
+            self.base_url = origin.rstrip("/") + "{}"
+            self.main_page_url = origin.rstrip("/") + "/world?page={}"
+        self.fetch_mode = fetch_mode
+        self.fetcher: Fetcher | None = None
+        self.parser_pool: ParserPool | None = None
+        self.known_urls: KnownUrlIndex | None = None
+        self.attempted_urls: set[str] = set()
+        self.http_cache = HttpCache()
+        self.stats = CrawlStats()
+        # Lowest listing page on which an article older than the time window was found
+        self.stop_page: int | None = None
+        # Highest listing page an article was accepted from
+        self.accepted_page = 0
+        # Articles of every listing page that are still going through the pipeline
+        self.page_pending: dict[int, int] = {}
+        self.page_done = asyncio.Condition()
+        self.recrawl_schedule = RecrawlSchedule.parse(config.RECRAWL_SCHEDULE)
+        self.recrawling = False
+        # Stored content hash of every article the recrawl revisits, and the ones it won't write:
+        # unchanged, or rejected so they wait for their next due visit instead of every recrawl
+        self.recrawl_hashes: dict[str, str | None] = {}
+        self.checked_urls: list[str] = []
+        self.frontier = frontier
+        # Whether this run's articles come from the shared frontier, recrawls stay local
+        self.sharing = False
+        # Next run walks with the first run window but stops at stored URLs, set after restarts
+        self.catching_up = False
+        # Whether this run's listing walk is saved to crawl_checkpoint, and whether it was resumed from there
+        self.checkpointing = False
+        self.resumed = False
+        self.next_page = 1
+        # Queued URLs still on their way through the pipeline, and accepted ones not written yet
+        self.unfinished: dict[str, int] = {}
+        self.unwritten: dict[str, int] = {}
 
-    async def run(self):
-        page_counter = 1
-        bad_requests_counter = 0
+    async def run(self, recrawl: bool = False):
+        """Crawl the listing for new articles, or with recrawl revisit stored articles due on RECRAWL_SCHEDULE"""
+        # Other replicas store articles too, a shared crawl needs a fresh index every run
+        if self.known_urls is None or self.frontier is not None:
+            self.known_urls = await KnownUrlIndex.load()
+        self.attempted_urls = set()
+        self.stats = CrawlStats()
+        self.stop_page = None
+        self.accepted_page = 0
+        self.page_pending = {}
+        self.recrawling = recrawl
+        self.sharing = self.frontier is not None and not recrawl
+        self.checkpointing = False
+        self.resumed = False
+        self.next_page = 1
+        self.unfinished = {}
+        self.unwritten = {}
+        self.recrawl_hashes = {}
+        self.checked_urls = []
+        self.http_cache.evict()
+
+        result = "failed"
+        try:
+            with metrics.RUN_SECONDS.time():
+                async with Fetcher(rate_limiter=self.create_rate_limiter()) as fetcher, ParserPool() as parser_pool:
+                    self.fetcher = fetcher
+                    self.parser_pool = parser_pool
+                    try:
+                        await self._crawl()
+                    finally:
+                        self.fetcher = None
+                        self.parser_pool = None
+            result = "completed"
+        finally:
+            metrics.RUNS.inc(result=result)
+            metrics.LAST_RUN_TIMESTAMP.set(time.time())
+
+    async def _crawl(self):
         self.start_time = datetime.now()
-        stop_parsing = False
-        
-        logger.info(f"Starting spider run - First run: {self.first_run}")
+        fetch_workers = 1 if self.fetch_mode == "sequential" else config.FETCH_CONCURRENCY_PER_HOST
+        parse_workers = self.parser_pool.max_in_flight
+
+        logger.info(
+            f"Starting spider run - First run: {self.first_run}, recrawl: {self.recrawling}, fetch mode: {self.fetch_mode}"
+        )
         logger.info(f"Start time: {self.start_time}")
-        
-        while bad_requests_counter < 5 and not stop_parsing:
+
+        url_queue: asyncio.Queue[tuple[str, int] | None] = asyncio.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+        html_queue: asyncio.Queue[tuple[str, int, FetchResponse, CacheEntry | None] | None] = asyncio.Queue(maxsize=parse_workers)
+        row_queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=config.WRITE_BATCH_SIZE)
+        queues = {"urls": url_queue, "html": html_queue, "rows": row_queue}
+        for name, queue in queues.items():
+            metrics.QUEUE_DEPTH.set_function(queue.qsize, queue=name)
+
+        writer = asyncio.create_task(self._write_stage(row_queue))
+        parsers = [asyncio.create_task(self._parse_stage(html_queue, row_queue)) for _ in range(parse_workers)]
+        fetchers = [asyncio.create_task(self._fetch_stage(url_queue, html_queue)) for _ in range(fetch_workers)]
+        tasks = [writer, *parsers, *fetchers]
+        # Claimed URLs stay leased until their articles are written, not just until they are parsed
+        lease_keeper = asyncio.create_task(self.frontier.keep_leases()) if self.sharing else None
+
+        try:
+            if self.frontier is not None:
+                discover = self._frontier_stage
+            else:
+                discover = self._recrawl_stage if self.recrawling else self._discover_stage
+            page_counter, bad_requests_counter = await self._unless_stage_fails(discover(url_queue), tasks)
+
+            # Shut the stages down in order, each one once everything upstream has drained into it
+            for _ in fetchers:
+                await self._unless_stage_fails(url_queue.put(None), tasks)
+            await self._unless_stage_fails(asyncio.gather(*fetchers), tasks)
+            for _ in parsers:
+                await self._unless_stage_fails(html_queue.put(None), tasks)
+            await self._unless_stage_fails(asyncio.gather(*parsers), tasks)
+            await self._unless_stage_fails(row_queue.put(None), tasks)
+            await writer
+        finally:
+            for task in tasks:
+                task.cancel()
+            if lease_keeper is not None:
+                lease_keeper.cancel()
+                # Nothing is held after a clean finish, whatever is left goes back to the others
+                await self.frontier.release()
+            # Drop the references to this run's queues
+            for name in queues:
+                metrics.QUEUE_DEPTH.set(0, queue=name)
+
+        logger.info(f"Spider run completed:")
+        logger.info(f"  - Listing pages: {self.stats.listing_pages}")
+        logger.info(f"  - Requested articles: {self.stats.requested_articles}")
+        logger.info(f"  - Parsed articles: {self.stats.parsed_articles}")
+        logger.info(f"  - Rejected (paywalled or incomplete): {self.stats.rejected_articles}")
+        if self.recrawling:
+            logger.info(f"  - Unchanged since the last visit: {self.stats.unchanged_articles}")
+            await db_services.mark_articles_checked(self.checked_urls, self.start_time)
+        logger.info(f"  - Bad requests count: {bad_requests_counter}")
+        logger.info(f"  - Processed pages: {page_counter}")
+        logger.info(f"  - Rate limiter: {self.fetcher.rate_limiter.describe()}")
+        if self.checkpointing:
+            await self.save_checkpoint(finished=True)
+            # Articles published while the parser was down sit above the ones stored before
+            self.catching_up = self.resumed
+        self.first_run = False
+
+    @staticmethod
+    async def _unless_stage_fails(awaitable: Awaitable, stages: list[asyncio.Task]):
+        """Await awaitable, raising the error of any stage that fails in the meantime.
+
+        A failed stage stops draining its queue, so everything upstream of it would
+        otherwise block on a full queue for good.
+        """
+        waiter = asyncio.ensure_future(awaitable)
+        try:
+            while not waiter.done():
+                for stage in stages:
+                    if stage.done() and not stage.cancelled() and stage.exception() is not None:
+                        raise stage.exception()
+                running = [stage for stage in stages if not stage.done()]
+                await asyncio.wait([waiter, *running], return_when=asyncio.FIRST_COMPLETED)
+            return waiter.result()
+        finally:
+            waiter.cancel()
+
+    async def _discover_stage(self, url_queue: asyncio.Queue) -> tuple[int, int]:
+        """Walk the listing pages and queue new article URLs until the time window or the stored articles are reached"""
+        page_counter = await self.resume(url_queue)
+        bad_requests_counter = 0
+        # Last page read that listed stored articles too, the next one is only read if it had new ones
+        stored_page = None
+
+        while bad_requests_counter < 5:
+            # Only LISTING_LOOKAHEAD pages may be read ahead of the oldest page still in flight,
+            # so the time window check of that page can stop discovery before it runs off
+            await self.wait_for_pages(page_counter - 1 - config.LISTING_LOOKAHEAD)
+            if stored_page is not None:
+                await self.end_at_stored_articles(stored_page)
+                stored_page = None
+            await self.sync_progress()
+            if self.stop_page is not None and page_counter > self.stop_page:
+                break
+            await self.save_checkpoint(page_counter)
+
             logger.info(f"Processing page {page_counter}")
             
             try:
-                response = requests.get(self.main_page_url.format(page_counter))
-                self.requested_articles += 1
-                logger.info(f"Page {page_counter} response status: {response.status_code}")
+                page_url = self.main_page_url.format(page_counter)
+                response, cached = await self.fetch_page(page_url, kind="listing")
+                self.stats.listing_pages += 1
+                logger.info(f"Page {page_counter} response status: {response.status}")
                 
-                if response.status_code != 200:
+                if cached is not None:
+                    logger.info(f"Page {page_counter} not modified, reusing its article URLs")
+                    teasers = teasers_from_payload(cached.payload)
+                elif response.status != 200:
                     bad_requests_counter += 1
-                    logger.warning(f"Bad response from page {page_counter}: {response.status_code}")
+                    logger.warning(f"Bad response from page {page_counter}: {response.status}")
                     continue
-
-                soup = BeautifulSoup(response.text, 'html.parser')
-                urls = get_articles_urls(soup)
+                else:
+                    soup = BeautifulSoup(response.text, 'html.parser')
+                    teasers = get_articles_teasers(soup)
+                    self.http_cache.store(page_url, response.headers, teasers_to_payload(teasers))
                 
-                if not urls:
+                if not teasers:
                     logger.warning(f"No article URLs found on page {page_counter}")
                     bad_requests_counter += 1
                     page_counter += 1
                     continue
-                
-                logger.info(f"Processing {len(urls)} articles from page {page_counter}")
-                result, stop_parsing = await self.process_articles(urls)
-                
-                logger.info(f"From page {page_counter} retrieved {len(result)} articles")
-                if result:
-                    logger.debug(f"Sample article data: {result[0] if result else 'No articles'}")
-                
-                if result:
-                    await db_services.insert_article_chunk(result)
-                    logger.info(f"Successfully inserted {len(result)} articles to database")
-                else:
-                    logger.warning(f"No articles to insert from page {page_counter}")
-                
+
+                # Teasers already older than the time window are dropped before any fetch; the
+                # listing is newest first, so nothing on the following pages is in the window either
+                urls = [
+                    url for url, published_at in teasers.items()
+                    if published_at is None or self.within_window(published_at)
+                ]
+                reached_window_end = len(urls) < len(teasers)
+                if reached_window_end:
+                    logger.info(f"Pruned {len(teasers) - len(urls)} out of window articles from page {page_counter}")
+
+                urls, listed_stored = self.select_new_urls(urls)
+                urls = [url for url in urls if url not in self.attempted_urls]
+                self.attempted_urls.update(urls)
+
+                logger.info(f"Queueing {len(urls)} articles from page {page_counter}")
+                await self.queue_urls(url_queue, urls, page_counter)
+
+                if reached_window_end:
+                    self.stop(page_counter)
+                elif listed_stored and not self.first_run:
+                    stored_page = page_counter
                 page_counter += 1
+                logger.info(f"Rate limiter state: {self.fetcher.rate_limiter.describe()}")
                 
             except Exception as e:
                 logger.error(f"Error processing page {page_counter}: {e}")
                 bad_requests_counter += 1
                 page_counter += 1
-        
-        logger.info(f"Spider run completed:")
-        logger.info(f"  - Requested articles: {self.requested_articles}")
-        logger.info(f"  - Parsed articles: {self.parsed_articles}")
-        logger.info(f"  - Required subscription: {self.require_subscription}")
-        logger.info(f"  - Bad requests count: {bad_requests_counter}")
-        logger.info(f"  - Processed pages: {page_counter}")
-        self.first_run = False
 
+        return page_counter, bad_requests_counter
 
-    async def process_articles(self, urls: list[str]) -> tuple[list[dict[str, str | None | datetime]], bool]:
-        result = []
-        stop_parsing = False
-        
-        logger.info(f"Processing {len(urls)} article URLs")
-        
-        for i, url in enumerate(urls, 1):
-            logger.info(f"Processing article {i}/{len(urls)}: {url}")
-            
+    async def resume(self, url_queue: asyncio.Queue) -> int:
+        """Pick up the checkpoint of an interrupted run, returning the listing page to carry on from"""
+        if not config.CHECKPOINT_ENABLED:
+            return 1
+        self.checkpointing = True
+        try:
+            checkpoint = await db_services.load_crawl_checkpoint(self.origin)
+        except Exception as e:
+            logger.error(f"Error loading crawl checkpoint, walking the listing from page 1: {e}")
+            return 1
+        if checkpoint is None:
+            return 1
+
+        if checkpoint.finished_at is not None:
+            # Restarted between runs: the backfill is done already, only what came out since is missing
+            if self.first_run:
+                logger.info(f"Last run finished at {checkpoint.finished_at}, catching up instead of a first run")
+                self.first_run = False
+                self.catching_up = True
+            return 1
+
+        logger.info(
+            f"Resuming the run started at {checkpoint.started_at} (first run: {checkpoint.first_run}, "
+            f"catching up: {checkpoint.catching_up}) at page {checkpoint.page} with {len(checkpoint.pending)} pending URLs"
+        )
+        self.resumed = True
+        self.start_time = checkpoint.started_at
+        self.first_run = checkpoint.first_run
+        self.catching_up = checkpoint.catching_up
+        self.stop_page = checkpoint.stop_page
+        for page, urls in checkpoint.pending_by_page().items():
+            urls = [url for url in urls if url not in self.known_urls and url not in self.attempted_urls]
+            self.attempted_urls.update(urls)
+            await self.queue_urls(url_queue, urls, page)
+        return checkpoint.page
+
+    async def save_checkpoint(self, page: int | None = None, finished: bool = False) -> None:
+        """Record the walk's progress, page being the next listing page to read"""
+        if not self.checkpointing:
+            return
+        if page is not None:
+            self.next_page = page
+        checkpoint = Checkpoint(
+            started_at=self.start_time,
+            first_run=self.first_run,
+            catching_up=self.catching_up,
+            page=self.next_page,
+            stop_page=self.stop_page,
+            # The shared frontier keeps its URLs itself
+            pending={} if finished or self.sharing else {**self.unwritten, **self.unfinished},
+            finished_at=datetime.now() if finished else None
+        )
+        try:
+            await db_services.save_crawl_checkpoint(self.origin, checkpoint)
+        except Exception as e:
+            logger.error(f"Error saving crawl checkpoint at page {checkpoint.page}: {e}")
+
+    async def _recrawl_stage(self, url_queue: asyncio.Queue) -> tuple[int, int]:
+        """Queue the stored articles due for a revisit, all as page 0 since no listing is involved"""
+        published_since = self.start_time - self.recrawl_schedule.horizon
+        candidates = await db_services.get_recrawl_candidates(published_since)
+        due = [candidate for candidate in candidates if self.recrawl_schedule.is_due(candidate, self.start_time)]
+        logger.info(
+            f"Revisiting {len(due)} of {len(candidates)} articles published since {published_since} "
+            f"(schedule: {self.recrawl_schedule.describe()})"
+        )
+
+        self.recrawl_hashes = {candidate.url: candidate.content_hash for candidate in due}
+        self.attempted_urls.update(self.recrawl_hashes)
+        self.page_pending[0] = len(due)
+        for candidate in due:
+            await url_queue.put((candidate.url, 0))
+        return 0, 0
+
+    async def _frontier_stage(self, url_queue: asyncio.Queue) -> tuple[int, int]:
+        """Walk the listing into the shared frontier if no other replica does, and claim URLs from it either way"""
+        async with self.frontier.leadership() as leader:
+            if self.recrawling:
+                if not leader:
+                    logger.info("Another replica walks the listing, leaving the recrawl to it")
+                    return 0, 0
+                return await self._recrawl_stage(url_queue)
+
+            discovery = None
+            if leader:
+                await self.frontier.purge_exhausted()
+                await self.frontier.start_walk(self.origin)
+                discovery = asyncio.create_task(self._discover_stage(url_queue))
             try:
-                response = requests.get(
-                    self.base_url.format(url),
-                    cookies=config.coockies,
-                    headers=config.headers
-                )
-                logger.debug(f"Status code of request to url='{url}' is {response.status_code}")
-                
-                if response.status_code != 200:
-                    logger.warning(f"Bad response for {url}: {response.status_code}")
-                    continue
-                    
-                if response.status_code == 406:
-                    logger.info("Too many requests waiting 10 minutes before parsing will continued")
-                    await asyncio.sleep(360)
-                    
-            except Exception as e:
-                logger.error(f"Error occurred while fetching url='{url}'. Exception={e}")
+                await self._claim_stage(url_queue, discovery)
+                if discovery is None:
+                    return 0, 0
+                result = await discovery
+                await self.frontier.end_walk(self.origin)
+                return result
+            finally:
+                if discovery is not None:
+                    discovery.cancel()
+
+    async def _claim_stage(self, url_queue: asyncio.Queue, discovery: asyncio.Task | None) -> None:
+        """Feed the fetch stage with frontier URLs until the frontier is empty and nobody walks the listing any more"""
+        while True:
+            items = await self.frontier.claim()
+            # Learn where the walk ends, so URLs of pages past it are dropped unfetched
+            await self.sync_progress()
+            for item in items:
+                await url_queue.put((item.url, item.page))
+            if items:
                 continue
-                
-            await asyncio.sleep(5)
-            logger.debug(f"Sleeping 5 seconds after processing {url}")
 
-            article_dict = parse_article(response.text)
-            
-            if not article_dict:
-                logger.warning(f"Failed to parse article: {url}")
-                self.require_subscription += 1
+            listing_done = discovery.done() if discovery is not None else not await self.frontier.leader_active()
+            if listing_done and not await self.frontier.pending():
+                break
+            await asyncio.sleep(self.frontier.poll_interval)
+
+    async def _fetch_stage(self, url_queue: asyncio.Queue, html_queue: asyncio.Queue) -> None:
+        while (item := await url_queue.get()) is not None:
+            url, page = item
+            if self.stop_page is not None and page > self.stop_page:
+                logger.debug(f"Skipping {url} from page {page}, crawl stops at page {self.stop_page}")
+                metrics.ARTICLES.inc(outcome="skipped")
+                await self.article_done(url, page)
                 continue
-                
-            if not article_dict.get("published_at"):
-                logger.warning(f"Article missing published date: {url}")
-                self.require_subscription += 1
+            # Stored by the write stage since the listing page was read
+            if url in self.known_urls and not self.recrawling:
+                metrics.ARTICLES.inc(outcome="skipped")
+                await self.article_done(url, page)
                 continue
 
-            published_at = article_dict["published_at"]
-            logger.info(f"Article published at: {published_at}")
-            
-            self.parsed_articles += 1
+            fetched = await self.fetch_article(url)
+            if fetched is None:
+                metrics.ARTICLES.inc(outcome="fetch_failed")
+                await self.article_done(url, page)
+                continue
+            await html_queue.put((url, page, *fetched))
+
+    async def _parse_stage(self, html_queue: asyncio.Queue, row_queue: asyncio.Queue) -> None:
+        while (item := await html_queue.get()) is not None:
+            url, page, response, cached = item
+            try:
+                if cached is not None:
+                    logger.debug(f"Article {url} not modified, reusing cached parse result")
+                    article_dict = article_from_payload(cached.payload)
+                else:
+                    article_dict = await self.parser_pool.parse(response.text)
+                    self.http_cache.store(response.url, response.headers, article_to_payload(article_dict))
+            except Exception as e:
+                logger.error(f"Error occurred while parsing url='{url}'. Exception={e}")
+                metrics.ARTICLES.inc(outcome="parse_error")
+                if self.recrawling:
+                    self.checked_urls.append(url)
+                await self.article_done(url, page)
+                continue
+
+            article_dict = self.accept_article(url, page, article_dict)
+            if article_dict is not None:
+                self.unwritten[url] = page
+            # Before the URL leaves the frontier, so the walking replica knows by the time its page is done
+            if self.sharing and self.frontier.progress != (self.stop_page, self.accepted_page):
+                await self.sync_progress()
+            await self.article_done(url, page, unwritten=article_dict is not None)
+            if article_dict is not None:
+                await row_queue.put(article_dict)
+
+    async def _write_stage(self, row_queue: asyncio.Queue) -> None:
+        """Insert rows in batches, flushing once WRITE_BATCH_SIZE rows are buffered or WRITE_FLUSH_INTERVAL has passed"""
+        loop = asyncio.get_running_loop()
+        batch = []
+        flush_at = None
+
+        while True:
+            timeout = None if flush_at is None else max(0.0, flush_at - loop.time())
+            try:
+                row = await asyncio.wait_for(row_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await self.write_articles(batch)
+                batch, flush_at = [], None
+                continue
+
+            if row is None:
+                break
+            batch.append(row)
+            if flush_at is None:
+                flush_at = loop.time() + config.WRITE_FLUSH_INTERVAL
+            if len(batch) >= config.WRITE_BATCH_SIZE:
+                await self.write_articles(batch)
+                batch, flush_at = [], None
+
+        if batch:
+            await self.write_articles(batch)
+
+    async def write_articles(self, articles: list[dict[str, str | None | datetime]]) -> None:
+        logger.debug(f"Sample article data: {articles[0]}")
+        try:
+            with metrics.DB_WRITE_SECONDS.time():
+                # Revisited articles overwrite their stored row, unless their content hash is unchanged
+                on_conflict = "update" if self.recrawling else config.INSERT_ON_CONFLICT
+                insert_result = await db_services.insert_article_chunk(articles, on_conflict=on_conflict)
+        except Exception as e:
+            logger.error(f"Error writing {len(articles)} articles: {e}")
+            metrics.ARTICLES_WRITTEN.inc(len(articles), result="failed")
+            if self.sharing:
+                await self.release_unwritten([article["url"] for article in articles])
+            return
+        metrics.ARTICLES_WRITTEN.inc(insert_result.inserted, result="inserted")
+        metrics.ARTICLES_WRITTEN.inc(insert_result.updated, result="updated")
+        metrics.ARTICLES_WRITTEN.inc(insert_result.skipped, result="skipped")
+        self.known_urls.update(article["url"] for article in articles)
+        for article in articles:
+            self.unwritten.pop(article["url"], None)
+            if self.sharing:
+                self.frontier.complete(article["url"])
+        await self.save_checkpoint()
+        logger.info(f"Successfully inserted {insert_result.inserted} of {len(articles)} articles to database")
+
+    @property
+    def origin(self) -> str:
+        return self.base_url.format("")
+
+    def create_rate_limiter(self) -> RateLimiter:
+        limiter = create_rate_limiter()
+        if self.frontier is None:
+            return limiter
+        return SharedRateLimiter(limiter, origin=self.origin)
+
+    async def queue_urls(self, url_queue: asyncio.Queue, urls: list[str], page: int) -> None:
+        if self.sharing:
+            await self.frontier.add(urls, page, self.first_run or self.catching_up)
+            return
+        self.unfinished.update((url, page) for url in urls)
+        self.page_pending[page] = self.page_pending.get(page, 0) + len(urls)
+        for url in urls:
+            # Blocks while the fetch stage is behind, which bounds how far discovery runs ahead
+            await url_queue.put((url, page))
+
+    async def release_unwritten(self, urls: list[str]) -> None:
+        """Hand the URLs of articles that could not be written back to the frontier, so they get fetched again"""
+        try:
+            await self.frontier.release(urls)
+        except Exception as e:
+            # They are no longer renewed either way, their leases run out and they become claimable again
+            logger.warning(f"Error releasing {len(urls)} unwritten frontier URLs: {e}")
+
+    async def article_done(self, url: str, page: int, unwritten: bool = False) -> None:
+        self.unfinished.pop(url, None)
+        if self.sharing:
+            # An accepted article leaves the frontier once the write stage has stored it
+            if unwritten:
+                self.frontier.hold(url)
+            else:
+                self.frontier.complete(url)
+            return
+        async with self.page_done:
+            self.page_pending[page] -= 1
+            self.page_done.notify_all()
+
+    async def wait_for_pages(self, last_page: int) -> None:
+        """Wait until every article of listing pages up to last_page has been handled"""
+        if self.sharing:
+            await self.frontier.wait_for_pages(last_page)
+            return
+        async with self.page_done:
+            await self.page_done.wait_for(
+                lambda: all(count == 0 for page, count in self.page_pending.items() if page <= last_page)
+            )
+
+    async def sync_progress(self) -> None:
+        """Trade the stop page and the last page with an accepted article with the other replicas"""
+        if not self.sharing:
+            return
+        try:
+            stop_page, accepted_page = await self.frontier.sync_progress(self.origin, self.stop_page, self.accepted_page)
+        except Exception as e:
+            logger.warning(f"Error sharing crawl progress through the frontier: {e}")
+            return
+        if stop_page is not None:
+            self.stop(stop_page)
+        self.accepted_page = max(self.accepted_page, accepted_page)
+
+    def stop(self, page: int) -> None:
+        if self.stop_page is None or page < self.stop_page:
+            logger.info(f"Crawl will stop after page {page}")
+            self.stop_page = page
+
+    def accept_article(
+        self,
+        url: str,
+        page: int,
+        article_dict: dict[str, str | None | datetime] | None
+    ) -> dict[str, str | None | datetime] | None:
+        """Check a parse result against the time window, returning the row to store or None"""
+        if not article_dict:
+            logger.warning(f"Failed to parse article: {url}")
+            return self.reject_article(url)
             
-            # Check if we should continue parsing based on date
-            if self.first_run:
-                if not should_parse_article(published_at, days=30, parsing_start_at=self.start_time):
-                    logger.info(f"Article too old for first run (30 days limit): {published_at}")
-                    stop_parsing = True
-                    break
+        if not article_dict.get("published_at"):
+            logger.warning(f"Article missing published date: {url}")
+            return self.reject_article(url)
+
+        published_at = article_dict["published_at"]
+        logger.info(f"Article published at: {published_at}")
+        
+        self.stats.parsed_articles += 1
+
+        if self.recrawling:
+            return self.accept_revisit(url, article_dict)
+        
+        # Fallback for articles whose teaser had no timestamp, judged by the window of the run that found them
+        lease = self.frontier.leases.get(url) if self.sharing else None
+        first_run = lease.first_run if lease is not None else self.first_run or self.catching_up
+        if not self.within_window(published_at, first_run):
+            if first_run:
+                logger.info(f"Article too old for first run (30 days limit): {published_at}")
             else:
-                if not should_parse_article(published_at, hours=1, parsing_start_at=self.start_time):
-                    logger.info(f"Article too old for regular run (1 hour limit): {published_at}")
-                    stop_parsing = True
-                    break
+                logger.info(f"Article too old for regular run (1 hour limit): {published_at}")
+            self.stop(page)
+            metrics.ARTICLES.inc(outcome="out_of_window")
+            return None
+
+        metrics.ARTICLES.inc(outcome="accepted")
+        self.accepted_page = max(self.accepted_page, page)
+        article_dict["url"] = url
+        logger.info(f"Successfully processed article: {article_dict.get('title', 'Unknown')}")
+        return article_dict
+
+    def reject_article(self, url: str) -> None:
+        self.stats.rejected_articles += 1
+        metrics.ARTICLES.inc(outcome="rejected")
+        if self.recrawling:
+            self.checked_urls.append(url)
+        return None
+
+    def accept_revisit(
+        self,
+        url: str,
+        article_dict: dict[str, str | None | datetime]
+    ) -> dict[str, str | None | datetime] | None:
+        """Compare a revisited article with its stored content hash, returning the row to write if it changed"""
+        article_dict = compact_article(article_dict)
+        if article_dict["content_hash"] == self.recrawl_hashes.get(url):
+            logger.debug(f"Article {url} unchanged since the last visit")
+            self.stats.unchanged_articles += 1
+            self.checked_urls.append(url)
+            metrics.ARTICLES.inc(outcome="unchanged")
+            return None
+
+        logger.info(f"Article {url} changed since the last visit")
+        metrics.ARTICLES.inc(outcome="accepted")
+        article_dict["url"] = url
+        return article_dict
+
+    def within_window(self, published_at: datetime, first_run: bool | None = None) -> bool:
+        if first_run is None:
+            first_run = self.first_run or self.catching_up
+        if first_run:
+            return should_parse_article(published_at, days=30, parsing_start_at=self.start_time)
+        return should_parse_article(published_at, hours=1, parsing_start_at=self.start_time)
+
+    def select_new_urls(self, urls: list[str]) -> tuple[list[str], bool]:
+        """Drop already stored URLs from a listing page.
 
-            article_dict["url"] = url
-            article_dict["scraped_at"] = datetime.now()
-            result.append(article_dict)
-            logger.info(f"Successfully processed article: {article_dict.get('title', 'Unknown')}")
+        Returns the new URLs and whether the page listed stored ones as well. The listing
+        is newest first, so on a regular run that page is where the previous run may have
+        ended; end_at_stored_articles() settles it once the page's new URLs are handled.
+        """
+        new_urls = [url for url in urls if url not in self.known_urls]
+        logger.debug(f"{len(urls) - len(new_urls)} of {len(urls)} URLs are already stored")
+        return new_urls, len(new_urls) < len(urls)
+
+    async def end_at_stored_articles(self, page: int) -> None:
+        """Stop the walk after a page that listed stored articles, unless one of its new ones was accepted.
+
+        Stored articles also show up among new ones, pinned or moved up the listing after
+        an update, so such a page only marks the end of the previous run when none of its
+        new URLs turned out to be an article to store.
+        """
+        await self.wait_for_pages(page)
+        await self.sync_progress()
+        if self.accepted_page < page:
+            logger.info(f"No new articles accepted from page {page}, previous run ended there")
+            self.stop(page)
+
+    async def fetch_page(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        cookies: dict[str, str] | None = None,
+        kind: str = "listing"
+    ) -> tuple[FetchResponse, CacheEntry | None]:
+        """GET a page, revalidating it if it is cached. The cache entry is returned when the server answers 304"""
+        cached = self.http_cache.lookup(url)
+        if cached is not None:
+            headers = {**(headers or {}), **cached.validators()}
+
+        try:
+            with metrics.FETCH_SECONDS.time(kind=kind):
+                response = await self.fetcher.get(url, headers=headers, cookies=cookies)
+        except Exception:
+            metrics.FETCHES.inc(kind=kind, status="error")
+            raise
+        metrics.FETCHES.inc(kind=kind, status=str(response.status))
+        if response.status == 304 and cached is not None:
+            self.http_cache.touch(url)
+            return response, cached
+        return response, None
+
+    async def fetch_article(self, url: str) -> tuple[FetchResponse, CacheEntry | None] | None:
+        self.stats.requested_articles += 1
+        try:
+            response, cached = await self.fetch_page(
+                self.base_url.format(url),
+                cookies=config.coockies,
+                headers=config.headers,
+                kind="article"
+            )
+            logger.debug(f"Status code of request to url='{url}' is {response.status}")
+        except Exception as e:
+            logger.error(f"Error occurred while fetching url='{url}'. Exception={e}")
+            return None
 
-        logger.info(f"Processed {len(urls)} articles, got {len(result)} valid articles")
-        return result, stop_parsing
+        # Throttling (406/429/5xx) has already been retried with backoff by the fetcher
+        if cached is None and response.status != 200:
+            logger.warning(f"Bad response for {url}: {response.status}")
+            return None
+        return response, cached
 
 
 
 
 if __name__ == '__main__':
-    # Spider().parse_main_page()
-    s = Spider()
-    print(s.process_articles(["/content/2baeefcc-aa1d-419e-beb3-c5c1f0326d09", "/content/e31b6693-2849-49d1-84cb-912a8ba11b5c"]))
+    asyncio.run(Spider().run())
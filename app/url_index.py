@@ -0,0 +1,29 @@
+from typing import Iterable
+
+import app.database_operations as db_services
+from app.logger import logger
+
+
+class KnownUrlIndex:
+    """URLs of articles already stored in the database, so they are never fetched again"""
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self._urls = set(urls)
+
+    @classmethod
+    async def load(cls) -> "KnownUrlIndex":
+        return cls(await db_services.get_known_urls())
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def add(self, url: str) -> None:
+        self._urls.add(url)
+
+    def update(self, urls: Iterable[str]) -> None:
+        before = len(self._urls)
+        self._urls.update(urls)
+        logger.debug(f"Known URL index grew by {len(self._urls) - before} to {len(self._urls)} URLs")
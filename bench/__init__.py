@@ -0,0 +1 @@
+# Offline spider benchmarks
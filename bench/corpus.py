@@ -0,0 +1,133 @@
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DUMP_PATH = Path(__file__).resolve().parent.parent / "dump.sql"
+
+ARTICLE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><title>{title} | Financial Times</title>
+<script>window.FT = {{"flags": "a<b && c>d"}};</script><style>.x > .y {{ color: red; }}</style></head>
+<body><nav><a href="/world">World</a><a href="/content/00000000-0000-0000-0000-000000000000">Most read</a></nav>
+<div class="o-topper"><h1 class="o-topper__headline"><span class="headline__text">{title}</span></h1>
+<div class="o-topper__standfirst">{subtitle}</div>
+<!-- byline --><picture><source srcset="{image_url}"/><img src="{image_url}" alt=""/></picture></div>
+<p class="article-info__byline"><a class="o3-editorial-typography-byline-author" href="/stream/author">{author}</a>
+<time class="article-info__timestamp o3-editorial-typography-byline-timestamp o-date" datetime="{published_at}">{published_at}</time></p>
+<div class="article__content"><article id="article-body" class="n-content-body">{content}</article></div>
+<ul class="concept-list__list">{tags}</ul>
+{paywall}</body></html>"""
+
+TEASER_TEMPLATE = """<li class="o-teaser-collection__item o-grid-row">
+<div class="o-teaser o-teaser--article o-teaser--small" data-id="{uuid}">
+<div class="o-teaser__meta"><a href="/world" class="o-teaser__tag">World</a></div>
+<div class="o-teaser__heading"><a href="/content/{uuid}" class="js-teaser-heading-link">{title}</a></div>
+<p class="o-teaser__standfirst"><a href="/content/{uuid}" tabindex="-1">{subtitle}</a></p>
+<div class="o-teaser__timestamp"><time data-o-component="o-date" class="o-date o-teaser__timestamp-date" datetime="{published_at}">{published_at}</time></div>
+</div></li>"""
+
+LISTING_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><title>World | Financial Times</title></head>
+<body><nav><a href="/world">World</a><a href="/markets">Markets</a></nav>
+<main><ul class="o-teaser-collection__list">{teasers}</ul>
+<div class="stream__pagination"><a href="/world?page={next_page}">Next page</a></div></main></body></html>"""
+
+
+def load_dump_rows(path: Path = DUMP_PATH) -> list[dict]:
+    """Rows of the article table from the COPY block of a pg_dump file"""
+    with open(path, encoding="utf-8") as file:
+        lines = file.read().split("\n")
+
+    start = next(i for i, line in enumerate(lines) if line.startswith("COPY public.article"))
+    columns = re.search(r"\((.*)\)", lines[start]).group(1).split(", ")
+    rows = []
+    for line in lines[start + 1:]:
+        if line == "\\.":
+            break
+        values = [
+            None if value == "\\N" else re.sub(
+                r"\\(.)", lambda m: {"t": "\t", "n": "\n", "r": "\r"}.get(m.group(1), m.group(1)), value
+            )
+            for value in line.split("\t")
+        ]
+        rows.append(dict(zip(columns, values)))
+    return rows
+
+
+def parse_dump_tags(value: str | None) -> list[str]:
+    return [quoted or plain for quoted, plain in re.findall(r'"([^"]*)"|([^,{}]+)', value or "")]
+
+
+def render_article_page(row: dict, paywalled: bool = False) -> str:
+    return ARTICLE_TEMPLATE.format(
+        title=row["title"],
+        subtitle=row["subtitle"] or "",
+        author=row["author"],
+        image_url=row["image_url"] or "",
+        published_at=row["published_at"].replace(" ", "T") + "Z",
+        content=row["content"],
+        tags="".join(f'<li><a href="/topic">{tag}</a></li>' for tag in parse_dump_tags(row["tags"])),
+        paywall='<a id="charge-button" href="/products">Subscribe</a>' if paywalled else ""
+    )
+
+
+def render_listing_page(articles: list[dict], page: int) -> str:
+    teasers = "".join(
+        TEASER_TEMPLATE.format(
+            uuid=article["uuid"],
+            title=article["title"],
+            subtitle=article["subtitle"] or "",
+            published_at=article["published_at"].replace(" ", "T") + "Z"
+        )
+        for article in articles
+    )
+    return LISTING_TEMPLATE.format(teasers=teasers, next_page=page + 1)
+
+
+@dataclass
+class Corpus:
+    listing_pages: dict[int, str] = field(default_factory=dict)
+    articles: dict[str, str] = field(default_factory=dict)
+    rows: list[dict] = field(default_factory=list)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(html.encode("utf-8")) for html in [*self.listing_pages.values(), *self.articles.values()])
+
+
+def build_corpus(
+    article_count: int = 250,
+    per_page: int = 25,
+    interval: timedelta = timedelta(minutes=30),
+    paywall_ratio: float = 0.25,
+    now: datetime | None = None
+) -> Corpus:
+    """FT-shaped listing and article pages made by cycling the dump.sql articles.
+
+    Articles are published interval apart going back from now, newest first on the
+    listing like on ft.com, and paywall_ratio of them, spread evenly, carry the paywall button.
+    One more listing page of articles older than the first run window closes the corpus,
+    so a crawl of it ends on the time window the same way it does on the real site.
+    """
+    now = now or datetime.utcnow()
+    dump_rows = load_dump_rows()
+    stale_since = now - timedelta(days=60)
+    corpus = Corpus()
+    for i in range(article_count + per_page):
+        source = dump_rows[i % len(dump_rows)]
+        article_uuid = str(uuid.UUID(int=i + 1))
+        published_at = now - interval * (i + 1) if i < article_count else stale_since - interval * i
+        row = {
+            **source,
+            "uuid": article_uuid,
+            "url": f"/content/{article_uuid}",
+            "published_at": published_at.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            "paywalled": int((i + 1) * paywall_ratio) > int(i * paywall_ratio),
+        }
+        corpus.rows.append(row)
+        corpus.articles[row["url"]] = render_article_page(row, paywalled=row["paywalled"])
+
+    for page, start in enumerate(range(0, len(corpus.rows), per_page), 1):
+        corpus.listing_pages[page] = render_listing_page(corpus.rows[start:start + per_page], page)
+    return corpus
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Offline spider benchmarks.
+
+Runs the listing and article parsers over a fixture corpus built from dump.sql and,
+when the configured Postgres server is reachable, a full Spider run against a local
+stand-in of ft.com writing into a throwaway database. Results are written as JSON to
+bench/results/ so they can be compared between releases:
+
+    python -m bench.run
+    python -m bench.run --compare bench/results/<previous>.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# The spider is benchmarked on its own work: no pacing towards the stand-in and no HTTP cache.
+# Set before anything from app is imported, since app.config reads the environment on import
+BENCH_ENV = {
+    "RATE_LIMITER": "aimd",
+    "RATE_LIMIT_INITIAL_RATE": "10000",
+    "RATE_LIMIT_MAX_RATE": "10000",
+    "RATE_LIMIT_BURST": "100",
+    "HTTP_CACHE_ENABLED": "0",
+    "WRITE_FLUSH_INTERVAL": "1",
+}
+for name, value in BENCH_ENV.items():
+    os.environ.setdefault(name, value)
+
+from app.logger import logger
+from bench.corpus import Corpus, build_corpus
+from bench.standin import StandinServer
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# Metrics where a higher value is better, compared by --compare
+THROUGHPUT_METRICS = ("pages_per_second", "articles_per_second", "calls_per_second")
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process and of its (parser pool) children, in KiB"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    scale = 1024 if sys.platform == "darwin" else 1
+    return max(own, children) // scale
+
+
+def timed(function, items: list, repeat: int) -> float:
+    """Best wall time over repeat passes of function over items"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_listing(corpus: Corpus, repeat: int) -> dict:
+    from bs4 import BeautifulSoup
+    from app.spider import get_articles_teasers, get_articles_urls
+
+    pages = list(corpus.listing_pages.values())
+    urls_elapsed = timed(lambda html: get_articles_urls(BeautifulSoup(html, "html.parser")), pages, repeat)
+    teasers_elapsed = timed(lambda html: get_articles_teasers(BeautifulSoup(html, "html.parser")), pages, repeat)
+    return {
+        "pages": len(pages),
+        "seconds": urls_elapsed,
+        "pages_per_second": len(pages) / urls_elapsed,
+        "teasers_seconds": teasers_elapsed,
+        "teasers_pages_per_second": len(pages) / teasers_elapsed,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def bench_parse_article(corpus: Corpus, engine: str, repeat: int) -> dict:
+    from app.extractor import parse_article
+
+    pages = list(corpus.articles.values())
+    elapsed = timed(lambda html: parse_article(html, engine), pages, repeat)
+    return {
+        "articles": len(pages),
+        "seconds": elapsed,
+        "articles_per_second": len(pages) / elapsed,
+        "ms_per_article": elapsed / len(pages) * 1000,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def bench_should_parse_article(corpus: Corpus, repeat: int) -> dict:
+    from app.spider import should_parse_article
+
+    now = datetime.utcnow()
+    dates = [datetime.strptime(row["published_at"], "%Y-%m-%d %H:%M:%S.%f") for row in corpus.rows] * 100
+    elapsed = timed(lambda published_at: should_parse_article(published_at, days=30, parsing_start_at=now), dates, repeat)
+    return {
+        "calls": len(dates),
+        "seconds": elapsed,
+        "calls_per_second": len(dates) / elapsed,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def create_throwaway_database() -> str | None:
+    """Create an empty database on the configured Postgres server, None if it can't be reached"""
+    import psycopg2
+    import app.config as config
+
+    name = f"{config.POSTGRES_DB}_bench_{os.getpid()}"
+    try:
+        connection = psycopg2.connect(
+            host=config.POSTGRES_HOST,
+            port=config.POSTGRES_PORT,
+            user=config.POSTGRES_USERNAME,
+            password=config.POSTGRES_PASSWORD,
+            dbname="postgres",
+            connect_timeout=3
+        )
+    except psycopg2.OperationalError as e:
+        print(f"Postgres is not reachable, skipping the end to end benchmark: {str(e).strip()}")
+        return None
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE DATABASE "{name}"')
+    connection.close()
+    return name
+
+
+def drop_throwaway_database(name: str) -> None:
+    import psycopg2
+    import app.config as config
+
+    connection = psycopg2.connect(
+        host=config.POSTGRES_HOST,
+        port=config.POSTGRES_PORT,
+        user=config.POSTGRES_USERNAME,
+        password=config.POSTGRES_PASSWORD,
+        dbname="postgres"
+    )
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP DATABASE IF EXISTS "{name}"')
+    connection.close()
+
+
+async def bench_spider_run(corpus: Corpus, fetch_mode: str) -> dict:
+    from sqlalchemy import func, select, text
+    from app.database import AsyncSessionLocal, engine, init_db
+    from app.models import Article
+    from app.spider import Spider
+
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        await session.execute(text("TRUNCATE article"))
+        await session.commit()
+
+    async with StandinServer(corpus) as server:
+        spider = Spider(first_run=True, fetch_mode=fetch_mode, origin=server.origin)
+        started = time.perf_counter()
+        await spider.run()
+        elapsed = time.perf_counter() - started
+
+    async with AsyncSessionLocal() as session:
+        stored = await session.scalar(select(func.count()).select_from(Article))
+    await engine.dispose()
+
+    pages = spider.stats.listing_pages + spider.stats.requested_articles
+    return {
+        "fetch_mode": fetch_mode,
+        "pages": pages,
+        "articles": stored,
+        "seconds": elapsed,
+        "pages_per_second": pages / elapsed,
+        "articles_per_second": stored / elapsed,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Throughput metrics that dropped by more than tolerance against the baseline run"""
+    regressions = []
+    for name, metrics in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None:
+            continue
+        for metric in THROUGHPUT_METRICS:
+            if metric in metrics and previous.get(metric):
+                change = metrics[metric] / previous[metric] - 1
+                print(f"{name}.{metric}: {previous[metric]:.1f} -> {metrics[metric]:.1f} ({change:+.1%})")
+                if change < -tolerance:
+                    regressions.append(f"{name}.{metric}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline spider benchmarks")
+    parser.add_argument("--articles", type=int, default=250, help="number of articles in the corpus")
+    parser.add_argument("--per-page", type=int, default=25, help="articles per listing page")
+    parser.add_argument("--repeat", type=int, default=3, help="passes per micro benchmark, the best one is kept")
+    parser.add_argument("--skip-e2e", action="store_true", help="skip the end to end Spider.run benchmark")
+    parser.add_argument("--output", type=Path, help="results file, a timestamped one in bench/results/ by default")
+    parser.add_argument("--compare", type=Path, help="earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop for --compare")
+    args = parser.parse_args()
+    # Per article debug logging would drown the report; parser pool workers inherit the level
+    logger.setLevel(logging.WARNING)
+
+    # Has to happen before app.database is imported, it builds its engine from POSTGRES_DB
+    database = None if args.skip_e2e else create_throwaway_database()
+    if database is not None:
+        os.environ["POSTGRES_DB"] = database
+
+    corpus = build_corpus(article_count=args.articles, per_page=args.per_page)
+    results = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {
+            "listing_pages": len(corpus.listing_pages),
+            "articles": len(corpus.articles),
+            "bytes": corpus.size_bytes,
+        },
+        "benchmarks": {},
+    }
+    benchmarks = results["benchmarks"]
+    benchmarks["get_articles_urls"] = bench_listing(corpus, args.repeat)
+    benchmarks["parse_article_bs4"] = bench_parse_article(corpus, "bs4", args.repeat)
+    benchmarks["parse_article_lxml"] = bench_parse_article(corpus, "lxml", args.repeat)
+    benchmarks["should_parse_article"] = bench_should_parse_article(corpus, args.repeat)
+    if database is not None:
+        try:
+            for fetch_mode in ("sequential", "concurrent"):
+                benchmarks[f"spider_run_{fetch_mode}"] = asyncio.run(bench_spider_run(corpus, fetch_mode))
+        finally:
+            drop_throwaway_database(database)
+    results["peak_rss_kb"] = peak_rss_kb()
+
+    for name, metrics in benchmarks.items():
+        print(f"{name}: " + ", ".join(
+            f"{metric}={value:.2f}" if isinstance(value, float) else f"{metric}={value}"
+            for metric, value in metrics.items()
+        ))
+
+    output = args.output or RESULTS_DIR / f"{datetime.utcnow():%Y%m%dT%H%M%S}-{results['revision'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        if regressions:
+            print(f"Throughput regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
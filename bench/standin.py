@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Local stand-in of ft.com for load testing the spider.
+
+Serves a synthetic corpus (bench/corpus.py) under the same paths as the real site, with
+ETags that If-None-Match revalidates to a 304, and can slow responses down and answer with
+406, 429 and 5xx at configurable rates:
+
+    python -m bench.standin --pages 40 --latency 0.2 --rate-429 0.05 --retry-after 2
+    FT_ORIGIN=http://127.0.0.1:8080 python main.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from bench.corpus import Corpus, build_corpus
+
+STATS_KEY = web.AppKey("stats", Counter)
+
+
+@dataclass
+class Faults:
+    """Latency added to every response and the share of requests answered with an error instead"""
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_406: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    # Retry-After sent with 429 and 503 answers, seconds; None leaves the header out
+    retry_after: int | None = None
+    seed: int | None = None
+
+
+def page_response(request: web.Request, html: str) -> web.Response:
+    """The page, or a 304 when the client sends the ETag of this version of it"""
+    etag = '"' + hashlib.sha1(html.encode("utf-8")).hexdigest() + '"'
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers={"ETag": etag})
+    return web.Response(text=html, content_type="text/html", headers={"ETag": etag})
+
+
+def create_app(corpus: Corpus, faults: Faults | None = None) -> web.Application:
+    """Serves a corpus under the same paths as ft.com: /world?page=N and /content/<uuid>"""
+    faults = faults or Faults()
+    rng = random.Random(faults.seed)
+    stats: Counter = Counter()
+
+    @web.middleware
+    async def inject_faults(request: web.Request, handler) -> web.StreamResponse:
+        delay = faults.latency + rng.uniform(-faults.jitter, faults.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        headers = {"Retry-After": str(faults.retry_after)} if faults.retry_after is not None else {}
+        roll = rng.random()
+        if roll < faults.rate_406:
+            response = web.Response(status=406, text="Not Acceptable")
+        elif roll < faults.rate_406 + faults.rate_429:
+            response = web.Response(status=429, text="Too Many Requests", headers=headers)
+        elif roll < faults.rate_406 + faults.rate_429 + faults.rate_5xx:
+            response = web.Response(status=503, text="Service Unavailable", headers=headers)
+        else:
+            try:
+                response = await handler(request)
+            except web.HTTPException as e:
+                stats[e.status] += 1
+                raise
+        stats[response.status] += 1
+        return response
+
+    async def listing(request: web.Request) -> web.Response:
+        try:
+            page = int(request.query.get("page", "1"))
+        except ValueError:
+            raise web.HTTPBadRequest()
+        if page not in corpus.listing_pages:
+            raise web.HTTPNotFound()
+        return page_response(request, corpus.listing_pages[page])
+
+    async def article(request: web.Request) -> web.Response:
+        html = corpus.articles.get(request.path)
+        if html is None:
+            raise web.HTTPNotFound()
+        return page_response(request, html)
+
+    app = web.Application(middlewares=[inject_faults])
+    app[STATS_KEY] = stats
+    app.router.add_get("/world", listing)
+    app.router.add_get("/content/{uuid}", article)
+    return app
+
+
+class StandinServer:
+    """Runs the stand-in site on a local port for the lifetime of an async with block"""
+
+    def __init__(self, corpus: Corpus, faults: Faults | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.corpus = corpus
+        self.faults = faults
+        self.host = host
+        self.port = port
+        self.stats: Counter = Counter()
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def origin(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def __aenter__(self) -> "StandinServer":
+        app = create_app(self.corpus, self.faults)
+        self.stats = app[STATS_KEY]
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Port 0 lets the OS pick a free one
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self._runner.cleanup()
+        self._runner = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in of ft.com with fault and latency injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--pages", type=int, default=10, help="listing pages inside the first run window")
+    parser.add_argument("--per-page", type=int, default=25, help="articles per listing page")
+    parser.add_argument("--interval", type=float, default=30, help="minutes between consecutive articles")
+    parser.add_argument("--paywall-ratio", type=float, default=0.25, help="share of articles behind the paywall")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- seconds on top of the latency")
+    parser.add_argument("--rate-406", type=float, default=0.0, help="share of requests answered with 406")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--retry-after", type=int, help="Retry-After of 429 and 503 answers, seconds")
+    parser.add_argument("--seed", type=int, help="seed of the fault and jitter randomness")
+    args = parser.parse_args()
+
+    corpus = build_corpus(
+        article_count=args.pages * args.per_page,
+        per_page=args.per_page,
+        interval=timedelta(minutes=args.interval),
+        paywall_ratio=args.paywall_ratio
+    )
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_406=args.rate_406,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    app = create_app(corpus, faults)
+
+    async def report(app: web.Application) -> None:
+        print("Responses served: " + ", ".join(f"{status}: {count}" for status, count in sorted(app[STATS_KEY].items())))
+
+    app.on_cleanup.append(report)
+    print(
+        f"Serving {len(corpus.listing_pages)} listing pages and {len(corpus.articles)} articles, "
+        f"run the spider with FT_ORIGIN=http://{args.host}:{args.port}"
+    )
+    web.run_app(app, host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
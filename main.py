@@ -1,15 +1,37 @@
 from datetime import datetime
 
 from app import spider
+from app.frontier import Frontier
 from app.logger import logger
+from app.metrics import start_metrics_server
+from app.profiling import Profiler
+import app.config as config
 import asyncio
 
 
 async def main():
-    parser = spider.Spider(first_run=True)
+    if config.METRICS_PORT:
+        await start_metrics_server(config.METRICS_PORT)
+
+    profiler = Profiler("run", config.PROFILE_RUN_SAMPLE_RATE)
+    parser = spider.Spider(first_run=True, frontier=Frontier() if config.FRONTIER_ENABLED else None)
+    run_number = 0
     while True:
+        run_number += 1
         logger.info(f"Start parsing at {datetime.now()}")
-        await parser.run()
+        # A failed run (the database down, say) is retried with the next cycle instead of ending the process
+        try:
+            with profiler.profile(str(run_number)):
+                await parser.run()
+        except Exception as e:
+            logger.error(f"Run {run_number} failed: {e}")
+        if config.RECRAWL_ENABLED:
+            logger.info(f"Start recrawling updated articles at {datetime.now()}")
+            try:
+                with profiler.profile(f"{run_number}-recrawl"):
+                    await parser.run(recrawl=True)
+            except Exception as e:
+                logger.error(f"Recrawl {run_number} failed: {e}")
         await asyncio.sleep(3600)
 
 
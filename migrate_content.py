@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Article body migration script
+Moves the raw HTML content of stored articles to content_text and content_html_gz
+and reports how much storage, and I/O of queries reading whole rows, it saves
+
+Usage: python migrate_content.py [--batch-size 200] [--dry-run] [--vacuum-full]
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+from app.content import compact_article
+from app.database import engine, init_db
+from app.logger import logger
+
+# Stored sizes, i.e. after TOAST compression, which is what reads and the disk pay for
+SIZE_QUERY = text(
+    "SELECT count(*) AS articles, "
+    "count(content) AS raw_articles, "
+    "coalesce(sum(pg_column_size(content)), 0) AS raw_bytes, "
+    "coalesce(sum(pg_column_size(content_text)), 0) AS text_bytes, "
+    "coalesce(sum(pg_column_size(content_html_gz)), 0) AS gzip_bytes, "
+    "pg_table_size('article') AS table_bytes "
+    "FROM article"
+)
+BATCH_QUERY = text(
+    "SELECT url, content, pg_column_size(content) AS stored_bytes FROM article "
+    "WHERE content IS NOT NULL AND url > :after ORDER BY url LIMIT :limit"
+)
+UPDATE_QUERY = text(
+    "UPDATE article SET content_text = :content_text, content_html_gz = :content_html_gz, content = NULL "
+    "WHERE url = :url"
+)
+
+
+async def measure() -> dict[str, int]:
+    async with engine.connect() as conn:
+        return dict((await conn.execute(SIZE_QUERY)).mappings().one())
+
+
+def body_bytes(sizes: dict[str, int]) -> int:
+    return sizes["raw_bytes"] + sizes["text_bytes"] + sizes["gzip_bytes"]
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def format_report(before: dict[str, int], after: dict[str, int]) -> list[str]:
+    saved = body_bytes(before) - body_bytes(after)
+    share = saved / body_bytes(before) * 100 if body_bytes(before) else 0.0
+    per_article = saved / before["articles"] if before["articles"] else 0.0
+    return [
+        f"Articles with raw HTML content: {before['raw_articles']} -> {after['raw_articles']} (of {after['articles']})",
+        f"Stored body bytes: {format_bytes(body_bytes(before))} -> {format_bytes(body_bytes(after))} "
+        f"(saved {format_bytes(saved)}, {share:.1f}%)",
+        f"  raw HTML {format_bytes(after['raw_bytes'])}, plain text {format_bytes(after['text_bytes'])}, "
+        f"gzipped HTML {format_bytes(after['gzip_bytes'])}",
+        f"Read by a whole-row query, per article: {format_bytes(per_article)} less",
+        f"Table size on disk: {format_bytes(before['table_bytes'])} -> {format_bytes(after['table_bytes'])}",
+    ]
+
+
+async def migrate_content(batch_size: int, dry_run: bool) -> dict[str, int]:
+    """Convert articles batch by batch, each in its own transaction so the run can be resumed.
+
+    In a dry run nothing is written and the sizes after the migration are estimated.
+    """
+    estimate = {"raw_articles": 0, "raw_bytes": 0, "text_bytes": 0, "gzip_bytes": 0}
+    after, converted = "", 0
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(BATCH_QUERY, {"after": after, "limit": batch_size})).all()
+            if not rows:
+                break
+            updates = [
+                {"url": row.url, **compact_article({"content": row.content})}
+                for row in rows
+            ]
+            if not dry_run:
+                await conn.execute(UPDATE_QUERY, updates)
+
+        for row, update in zip(rows, updates):
+            estimate["raw_bytes"] -= row.stored_bytes
+            estimate["text_bytes"] += len(update["content_text"].encode("utf-8"))
+            estimate["gzip_bytes"] += len(update["content_html_gz"])
+        after = rows[-1].url
+        converted += len(rows)
+        logger.info(f"{'Checked' if dry_run else 'Converted'} {converted} articles")
+    return estimate
+
+
+async def vacuum_full() -> None:
+    # VACUUM can't run inside a transaction block
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        logger.info("Running VACUUM FULL article, which locks the table until it is done...")
+        await conn.execute(text("VACUUM FULL article"))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Move raw article HTML to plain text and gzipped HTML")
+    parser.add_argument("--batch-size", type=int, default=200, help="Articles converted per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Only estimate the savings, write nothing")
+    parser.add_argument(
+        "--vacuum-full", action="store_true",
+        help="Rewrite the table afterwards so the space is returned to the file system"
+    )
+    args = parser.parse_args()
+
+    try:
+        # Makes sure the content_text and content_html_gz columns exist
+        await init_db()
+        before = await measure()
+        estimate = await migrate_content(args.batch_size, args.dry_run)
+
+        if args.dry_run:
+            after = {
+                **before,
+                "raw_articles": 0,
+                **{key: before[key] + estimate[key] for key in ("raw_bytes", "text_bytes", "gzip_bytes")},
+            }
+            logger.info("Dry run, estimated savings:")
+        else:
+            if args.vacuum_full:
+                await vacuum_full()
+            after = await measure()
+            logger.info("Content migration completed:")
+        for line in format_report(before, after):
+            logger.info(line)
+        if not args.dry_run and not args.vacuum_full:
+            logger.info("The table only shrinks on disk after --vacuum-full, VACUUM makes the space reusable")
+    except Exception as e:
+        logger.error(f"Content migration failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test the API's result caches and their invalidation on article writes
+"""
+
+import asyncio
+import sys
+import os
+import threading
+import time
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app.config as config
+from api.cache import DataVersion, TtlCache
+from app.database_operations import ChunkInsertResult, _notify_article_changes
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl_and_on_new_data():
+    clock = FakeClock()
+    version = DataVersion("postgresql://unused")
+    cache = TtlCache(ttl=60, data_version=version, clock=clock)
+    computed = []
+
+    def compute():
+        computed.append(len(computed))
+        return len(computed)
+
+    assert cache.get_or_compute("stats", compute) == 1
+    clock.now = 59
+    assert cache.get_or_compute("stats", compute) == 1
+    clock.now = 60
+    assert cache.get_or_compute("stats", compute) == 2
+    version.bump()
+    assert cache.get_or_compute("stats", compute) == 3
+    assert cache.get_or_compute("stats", compute) == 3
+
+
+def test_concurrent_misses_compute_once():
+    cache = TtlCache(ttl=60)
+    calls = []
+
+    def slow_compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return "stats"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("stats", slow_compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["stats"] * 8
+    assert len(calls) == 1
+
+
+class RecordingSession:
+    def __init__(self):
+        self.executed = []
+
+    async def execute(self, statement, parameters=None):
+        self.executed.append((str(statement), parameters))
+
+
+def test_writes_notify_only_when_rows_changed():
+    session = RecordingSession()
+    asyncio.run(_notify_article_changes(session, ChunkInsertResult(skipped=3)))
+    assert session.executed == []
+
+    asyncio.run(_notify_article_changes(session, ChunkInsertResult(inserted=2, updated=1)))
+    (statement, parameters), = session.executed
+    assert statement == "SELECT pg_notify(:channel, :payload)"
+    assert parameters["channel"] == config.ARTICLE_NOTIFY_CHANNEL
+
+
+if __name__ == "__main__":
+    test_entries_expire_after_ttl_and_on_new_data()
+    test_concurrent_misses_compute_once()
+    test_writes_notify_only_when_rows_changed()
+    print("API cache tests passed!")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test the streaming NDJSON/CSV export of /api/articles/export
+"""
+
+import sys
+import os
+import csv
+import io
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import insert
+
+import app.config as config
+import api.app as api
+from app.content import compress_html
+from app.models import Article
+from db_test_support import database_configured, scratch_database, store_articles
+
+
+class FakeRow:
+    def __init__(self, index: int):
+        self._mapping = {
+            "url": f"/content/{index}",
+            "title": f"Title, \"{index}\"",
+            "subtitle": None,
+            "author": "Ben Hall",
+            "published_at": datetime(2025, 8, 1, 10, index),
+            "scraped_at": datetime(2025, 8, 2),
+            "updated_at": datetime(2025, 8, 2),
+            "tags": ["Europe", "Politics"],
+            "image_url": None,
+            "content_text": "Body\nwith a line break",
+            "content": None,
+            "content_html_gz": compress_html(f"<p>Body {index}</p>"),
+        }
+
+
+class FakeSession:
+    """Serves rows in partitions like a server-side cursor and records how far it was read"""
+
+    def __init__(self, partitions: int, per_partition: int, fetched: list[int], fail: bool = False):
+        self.partitions_count = partitions
+        self.per_partition = per_partition
+        self.fetched = fetched
+        self.fail = fail
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        if self.fail:
+            raise ConnectionRefusedError("database is down")
+        return self
+
+    def partitions(self):
+        for partition in range(self.partitions_count):
+            self.fetched.append(partition)
+            yield [FakeRow(partition * self.per_partition + i) for i in range(self.per_partition)]
+
+
+@contextmanager
+def fake_session(partitions: int, per_partition: int, fetched: list[int], fail: bool = False):
+    original = api.SessionLocal
+    api.SessionLocal = lambda: FakeSession(partitions, per_partition, fetched, fail)
+    try:
+        yield api.app.test_client()
+    finally:
+        api.SessionLocal = original
+
+
+def test_ndjson_is_streamed_chunk_by_chunk():
+    fetched = []
+    with fake_session(3, 2, fetched) as client:
+        response = client.get("/api/articles/export?start_date=2025-08-01T00:00", buffered=False)
+        chunks = response.response
+        first = next(chunks)
+        # Only the first partition was read from the cursor so far
+        assert fetched == [0]
+        body = first + b"".join(chunks)
+        response.close()
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert "attachment" in response.headers["Content-Disposition"]
+    lines = body.decode("utf-8").splitlines()
+    assert len(lines) == 6 and fetched == [0, 1, 2]
+    article = json.loads(lines[5])
+    assert article["url"] == "/content/5"
+    assert article["published_at"] == "2025-08-01T10:05:00"
+    assert article["tags"] == ["Europe", "Politics"]
+
+
+def test_csv_export_quotes_fields():
+    with fake_session(1, 2, []) as client:
+        response = client.get("/api/articles/export?format=csv&tag=Europe")
+        body = response.get_data(as_text=True)
+
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == list(api.EXPORT_COLUMNS)
+    assert len(rows) == 3
+    assert rows[1][api.EXPORT_COLUMNS.index("title")] == 'Title, "0"'
+    assert rows[1][api.EXPORT_COLUMNS.index("tags")] == "Europe|Politics"
+    assert rows[1][api.EXPORT_COLUMNS.index("content_text")] == "Body\nwith a line break"
+
+
+def test_html_is_only_decompressed_on_request():
+    with fake_session(1, 2, []) as client:
+        plain = client.get("/api/articles/export").get_data(as_text=True)
+        with_html = client.get("/api/articles/export?html=1").get_data(as_text=True)
+
+    assert "content" not in json.loads(plain.splitlines()[0])
+    assert json.loads(with_html.splitlines()[1])["content"] == "<p>Body 1</p>"
+    assert "content_html_gz" not in str(api.build_export_query())
+    assert "content_html_gz" in str(api.build_export_query(html=True))
+
+
+def test_export_reads_through_a_server_side_cursor():
+    options = api.build_export_query(start_date=datetime(2025, 8, 1)).get_execution_options()
+    assert options["stream_results"] is True
+    assert options["yield_per"] > 0
+
+    with fake_session(1, 1, [], fail=True) as client:
+        assert client.get("/api/articles/export?format=xml").status_code == 400
+        # A failing query has to show before the 200 goes out
+        response = client.get("/api/articles/export?format=csv")
+
+    assert response.status_code == 500
+    assert response.get_json()["success"] is False
+
+
+def test_export_of_stored_articles_line_by_line():
+    scraped_at = datetime(2025, 8, 2, 9, 0)
+    # Stored out of order, exported oldest first
+    stored = [
+        {"url": f"/content/{i}", "title": f"Title, \"{i}\"", "subtitle": None, "author": "Ben Hall",
+         "tags": ["Europe"], "image_url": None, "published_at": datetime(2025, 8, 1, 10) + timedelta(minutes=i),
+         "scraped_at": scraped_at, "content": f"<p>Body {i}</p><p>Second paragraph</p>"}
+        for i in (3, 0, 4, 1, 2)
+    ]
+    untagged = {**stored[0], "url": "/content/untagged", "tags": ["Markets"]}
+    # Stored before content_text, its text comes from the raw HTML
+    legacy = {
+        "url": "/content/legacy", "title": "Legacy", "author": "Ben Hall", "tags": ["Europe"],
+        "published_at": datetime(2025, 8, 1, 9), "scraped_at": scraped_at, "content": "<div><p>Legacy <b>body</b></p></div>"
+    }
+
+    def exported(i):
+        return {
+            "url": f"/content/{i}", "title": f"Title, \"{i}\"", "subtitle": None, "author": "Ben Hall",
+            "published_at": f"2025-08-01T10:0{i}:00", "scraped_at": "2025-08-02T09:00:00",
+            "updated_at": "2025-08-02T09:00:00", "tags": ["Europe"], "image_url": None,
+            "content_text": f"Body {i}\nSecond paragraph"
+        }
+
+    expected = [
+        {
+            "url": "/content/legacy", "title": "Legacy", "subtitle": None, "author": "Ben Hall",
+            "published_at": "2025-08-01T09:00:00", "scraped_at": "2025-08-02T09:00:00", "updated_at": None,
+            "tags": ["Europe"], "image_url": None, "content_text": "Legacy body"
+        },
+        *(exported(i) for i in range(5)),
+    ]
+
+    chunk_size = config.API_EXPORT_CHUNK_SIZE
+    # Several chunks from the server-side cursor
+    config.API_EXPORT_CHUNK_SIZE = 2
+    try:
+        with scratch_database() as db:
+            store_articles([*stored, untagged])
+            with db.engine.begin() as conn:
+                conn.execute(insert(Article), [legacy])
+            client = api.app.test_client()
+
+            ndjson = client.get("/api/articles/export?tag=Europe").get_data(as_text=True)
+            csv_body = client.get("/api/articles/export?tag=Europe&format=csv").get_data(as_text=True)
+            html = client.get("/api/articles/export?tag=Europe&html=1").get_data(as_text=True)
+    finally:
+        config.API_EXPORT_CHUNK_SIZE = chunk_size
+
+    lines = ndjson.splitlines()
+    assert len(lines) == len(expected)
+    for line, article in zip(lines, expected):
+        assert json.loads(line) == article
+
+    rows = list(csv.reader(io.StringIO(csv_body)))
+    assert rows[0] == list(api.EXPORT_COLUMNS)
+    assert len(rows) == len(expected) + 1
+    for row, article in zip(rows[1:], expected):
+        values = {**article, "tags": "|".join(article["tags"])}
+        assert row == ["" if values[name] is None else str(values[name]) for name in api.EXPORT_COLUMNS]
+
+    # The original HTML, decompressed or as stored before content_html_gz
+    contents = [json.loads(line)["content"] for line in html.splitlines()]
+    assert contents == [legacy["content"], *(f"<p>Body {i}</p><p>Second paragraph</p>" for i in range(5))]
+
+
+if __name__ == "__main__":
+    test_ndjson_is_streamed_chunk_by_chunk()
+    test_csv_export_quotes_fields()
+    test_html_is_only_decompressed_on_request()
+    test_export_reads_through_a_server_side_cursor()
+    if database_configured():
+        test_export_of_stored_articles_line_by_line()
+    print("Export tests passed!")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test tag and author filters and the facets of /api/articles/facets
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.dialects import postgresql
+
+import api.app as api
+from app.migrations import MIGRATIONS
+from app.models import Article
+from db_test_support import database_configured, scratch_database, store_articles
+
+
+def compile_sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_filters_use_indexed_operators():
+    sql = compile_sql(api.build_articles_query(tags=["Europe", "Politics"], author="Ben Hall"))
+
+    # Containment against the column type, which the GIN index on tags answers
+    assert "article.tags @> CAST(ARRAY['Europe', 'Politics'] AS VARCHAR[])" in sql
+    assert "article.author = 'Ben Hall'" in sql
+
+    sql = compile_sql(api.build_articles_query())
+    assert "article.tags" not in sql.split("WHERE")[1]
+
+
+def test_facets_aggregate_the_time_range():
+    tags_query, authors_query = api.build_facet_queries(datetime(2025, 8, 1), datetime(2025, 8, 8), limit=5)
+    tags_sql, authors_sql = compile_sql(tags_query), compile_sql(authors_query)
+
+    assert "unnest(article.tags) AS tag" in tags_sql
+    assert "article.published_at >= '2025-08-01 00:00:00' AND article.published_at <= '2025-08-08 00:00:00'" in tags_sql
+    assert "ORDER BY count DESC, anon_1.tag" in tags_sql and "LIMIT 5" in tags_sql
+    assert "GROUP BY article.author ORDER BY count DESC, article.author" in authors_sql
+    assert "article.author IS NOT NULL" in authors_sql
+
+
+def test_author_index_is_migrated():
+    indexes = {index.name for index in Article.__table__.indexes}
+    statements = [statement for migration in MIGRATIONS for statement in migration.statements]
+
+    assert "ix_article_author_published_at" in indexes
+    assert any("ix_article_author_published_at ON article (author, published_at)" in s for s in statements)
+
+
+def test_filters_and_facets_on_stored_articles():
+    def article(url, day, tags, author):
+        return {
+            "url": url, "title": url, "tags": tags, "author": author, "content": "<p>Body</p>",
+            "published_at": datetime(2025, 8, day), "scraped_at": datetime(2025, 8, 9)
+        }
+
+    with scratch_database():
+        store_articles([
+            article("/content/a", 2, ["Europe", "Politics"], "Ben Hall"),
+            article("/content/b", 3, ["Europe"], "Ben Hall"),
+            article("/content/c", 4, ["Europe", "Markets"], "Laura Noonan"),
+            article("/content/d", 5, ["Markets"], None),
+            article("/content/e", 6, ["Politics"], "Laura Noonan"),
+            # Before the facets' time range
+            {**article("/content/f", 1, ["Europe"], "Ben Hall"), "published_at": datetime(2025, 7, 20)},
+        ])
+        client = api.app.test_client()
+        week = {"start_date": "2025-08-01", "end_date": "2025-08-08"}
+
+        def get(path, **params):
+            response = client.get(path, query_string=params)
+            assert response.status_code == 200
+            return response.get_json()
+
+        facets = get("/api/articles/facets", **week)
+        assert facets["tags"] == [
+            {"tag": "Europe", "count": 3}, {"tag": "Markets", "count": 2}, {"tag": "Politics", "count": 2}
+        ]
+        # Articles without a byline don't make an author facet
+        assert facets["authors"] == [{"author": "Ben Hall", "count": 2}, {"author": "Laura Noonan", "count": 2}]
+
+        facets = get("/api/articles/facets", tag="Europe", **week)
+        assert facets["tags"] == [
+            {"tag": "Europe", "count": 3}, {"tag": "Markets", "count": 1}, {"tag": "Politics", "count": 1}
+        ]
+        assert facets["authors"] == [{"author": "Ben Hall", "count": 2}, {"author": "Laura Noonan", "count": 1}]
+        assert get("/api/articles/facets", limit=1, **week)["tags"] == [{"tag": "Europe", "count": 3}]
+
+        # Every given tag has to match
+        listed = get("/api/articles", tag=["Europe", "Politics"], fields="url")["articles"]
+        assert [article["url"] for article in listed] == ["/content/a"]
+        listed = get("/api/articles", author="Ben Hall", fields="url")["articles"]
+        assert [article["url"] for article in listed] == ["/content/b", "/content/a", "/content/f"]
+        assert get("/api/articles/count", tag="Europe", author="Ben Hall")["count"] == 3
+        assert get("/api/articles/count", tag="Europe", author="Laura Noonan", **week)["count"] == 1
+
+
+if __name__ == "__main__":
+    test_filters_use_indexed_operators()
+    test_facets_aggregate_the_time_range()
+    test_author_index_is_migrated()
+    if database_configured():
+        test_filters_and_facets_on_stored_articles()
+    print("Facet tests passed!")
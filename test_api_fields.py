@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test the list projection, ?fields= and /api/articles/detail
+"""
+
+import sys
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.dialects import postgresql
+
+import api.app as api
+from api.cache import LruCache
+
+
+class FakeRow:
+    def __init__(self, **values):
+        self._mapping = values
+
+
+@contextmanager
+def fake_detail(articles: dict[str, dict]):
+    def get_article_detail(url, html=False):
+        if url not in articles:
+            raise api.ArticleNotFound(f"No article with url {url}")
+        return dict(articles[url], html=html)
+
+    fakes = {
+        "response_cache": LruCache(max_entries=16),
+        "get_data_version": lambda: "v1",
+        "get_article_detail": get_article_detail,
+    }
+    originals = {name: getattr(api, name) for name in fakes}
+    for name, value in fakes.items():
+        setattr(api, name, value)
+    try:
+        yield api.app.test_client()
+    finally:
+        for name, value in originals.items():
+            setattr(api, name, value)
+
+
+def test_lists_never_select_the_body():
+    for query in (api.build_articles_query(), api.build_search_query("ukraine")):
+        sql = str(query.compile(dialect=postgresql.dialect()))
+        # Bodies only appear inside the preview expression, cut before they leave Postgres
+        assert sql.count("article.content_text") == 1 and sql.count("article.content,") == 1
+        assert "left(article.content_text, %(left_1)s)" in sql
+        assert "content_html_gz" not in sql
+
+    sql = str(api.build_articles_query(fields=("title",)).compile(dialect=postgresql.dialect()))
+    assert "article.content" not in sql
+    # The cursor still gets what it needs
+    assert "SELECT article.title, article.published_at, article.url" in sql
+
+    # The preview asked for under its own name too is still no body
+    sql = str(api.build_articles_query(fields=("content", "preview")).compile(dialect=postgresql.dialect()))
+    assert "AS content," in sql and "AS preview" in sql and "content_html_gz" not in sql
+
+
+def test_fields_are_validated_and_normalized():
+    # The preview goes out as content, like it always did; under its own name only on request
+    assert api.parse_fields(None) == api.DEFAULT_LIST_FIELDS
+    assert "content" in api.DEFAULT_LIST_FIELDS and "preview" not in api.DEFAULT_LIST_FIELDS
+    assert api.parse_fields("preview, title,url,title") == ("url", "title", "preview")
+    assert api.parse_fields("preview,content") == ("content", "preview")
+
+    for bad in ("content_text", "title,search_vector"):
+        try:
+            api.parse_fields(bad)
+            assert False, bad
+        except api.InvalidFields:
+            pass
+
+    response = api.app.test_client().get("/api/articles?fields=content_text")
+    assert response.status_code == 400
+
+
+def test_preview_and_missing_content():
+    published_at = datetime(2025, 8, 3, 10, 0)
+    long_row = FakeRow(url="/content/a", preview="x" * 201, published_at=published_at)
+    empty_row = FakeRow(url="/content/b", preview=None, published_at=published_at)
+
+    assert api.row_to_dict(long_row, ("url", "preview")) == {"url": "/content/a", "preview": "x" * 200 + "..."}
+    long_row = FakeRow(url="/content/a", content="x" * 201, published_at=published_at)
+    assert api.row_to_dict(long_row, ("url", "content")) == {"url": "/content/a", "content": "x" * 200 + "..."}
+    assert api.row_to_dict(empty_row, ("preview", "published_at")) == {
+        "preview": None, "published_at": "2025-08-03T10:00:00"
+    }
+
+
+def test_detail_returns_the_whole_article():
+    article = {"url": "/content/a", "title": "A", "content_text": "Full body"}
+    with fake_detail({"/content/a": article}) as client:
+        found = client.get("/api/articles/detail?url=/content/a")
+        with_html = client.get("/api/articles/detail?url=/content/a&html=1")
+        missing = client.get("/api/articles/detail?url=/content/b")
+        no_url = client.get("/api/articles/detail")
+
+    assert found.status_code == 200
+    assert found.get_json()["article"]["content_text"] == "Full body"
+    assert found.get_json()["article"]["html"] is False
+    assert with_html.get_json()["article"]["html"] is True
+    assert with_html.headers["ETag"] != found.headers["ETag"]
+    assert missing.status_code == 404
+    assert no_url.status_code == 400
+
+
+if __name__ == "__main__":
+    test_lists_never_select_the_body()
+    test_fields_are_validated_and_normalized()
+    test_preview_and_missing_content()
+    test_detail_returns_the_whole_article()
+    print("Field selection tests passed!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test keyset pagination of /api/articles
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.dialects import postgresql
+
+import app.config as config
+import api.app as api
+from db_test_support import database_configured, scratch_database, store_articles
+
+
+def test_cursor_round_trip():
+    published_at = datetime(2025, 8, 3, 10, 1, 4, 123000)
+    cursor = api.encode_cursor(published_at, "/content/6ae3cd28")
+
+    assert "=" not in cursor and "/" not in cursor
+    assert api.decode_cursor(cursor) == (published_at, "/content/6ae3cd28")
+
+    for broken in ("not-a-cursor", cursor[:-3], api.encode_cursor(published_at, "x")[:8]):
+        try:
+            api.decode_cursor(broken)
+            assert False, broken
+        except api.InvalidCursor:
+            pass
+
+
+def test_pages_continue_after_cursor_without_offset():
+    cursor = api.encode_cursor(datetime(2025, 8, 3, 10, 0), "/content/b")
+    query = api.build_articles_query(start_date=datetime(2025, 8, 1), limit=20, cursor=cursor)
+    sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    assert "(article.published_at, article.url) < ('2025-08-03 10:00:00', '/content/b')" in sql
+    assert "ORDER BY article.published_at DESC, article.url DESC" in sql
+    assert "LIMIT 21" in sql
+    assert "OFFSET" not in sql
+
+
+def test_page_size_is_capped():
+    assert api.clamp_page_size(10 ** 6) == config.API_MAX_PAGE_SIZE
+    assert api.clamp_page_size(0) == 1
+
+
+def test_invalid_cursor_is_a_bad_request():
+    response = api.app.test_client().get("/api/articles?cursor=garbage")
+
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+def test_pages_cover_every_article_once_while_new_ones_arrive():
+    newest = datetime(2025, 8, 3, 12, 0)
+    # Three articles per published_at, so page boundaries fall between equal timestamps
+    articles = [
+        {"url": f"/content/{i:02d}", "title": f"Article {i}", "published_at": newest - timedelta(minutes=i // 3),
+         "scraped_at": newest, "content": f"<p>Body {i}</p>"}
+        for i in range(20)
+    ]
+    expected = [article["url"] for article in sorted(
+        articles, key=lambda article: (article["published_at"], article["url"]), reverse=True
+    )]
+
+    with scratch_database():
+        store_articles(articles)
+        client = api.app.test_client()
+
+        urls, cursor = [], None
+        while True:
+            response = client.get("/api/articles?limit=4&fields=url" + (f"&cursor={cursor}" if cursor else ""))
+            assert response.status_code == 200
+            body = response.get_json()
+            urls += [article["url"] for article in body["articles"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+            if len(urls) == 4:
+                # Written while the client pages, an OFFSET would now repeat the last row of the page
+                store_articles([{
+                    **articles[0], "url": "/content/new",
+                    "published_at": newest + timedelta(hours=1), "scraped_at": newest + timedelta(hours=1)
+                }])
+
+        first_page = client.get("/api/articles?limit=4&fields=url").get_json()["articles"]
+
+    assert urls == expected
+    assert first_page[0]["url"] == "/content/new"
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_pages_continue_after_cursor_without_offset()
+    test_page_size_is_capped()
+    test_invalid_cursor_is_a_bad_request()
+    if database_configured():
+        test_pages_cover_every_article_once_while_new_ones_arrive()
+    print("Pagination tests passed!")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test ETags, 304 answers and the response cache of the article read endpoints
+"""
+
+import sys
+import os
+from contextlib import contextmanager
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import api.app as api
+from api.cache import LruCache
+
+
+@contextmanager
+def fake_data(version: list[str], calls: list[str]):
+    """Stand in for the database behind the API module for the duration of the block"""
+    def get_articles_with_filters(start_date, end_date, limit, cursor, tags=None, author=None, fields=None):
+        calls.append("articles")
+        return [{"url": "/content/a", "title": "A"}], None
+
+    def get_article_count(start_date, end_date, tags=None, author=None):
+        calls.append("count")
+        return 42
+
+    fakes = {
+        "response_cache": LruCache(max_entries=16),
+        "get_data_version": lambda: version[0],
+        "get_articles_with_filters": get_articles_with_filters,
+        "get_article_count": get_article_count,
+    }
+    originals = {name: getattr(api, name) for name in fakes}
+    for name, value in fakes.items():
+        setattr(api, name, value)
+    try:
+        yield api.app.test_client()
+    finally:
+        for name, value in originals.items():
+            setattr(api, name, value)
+
+
+def test_unchanged_data_is_revalidated_with_304():
+    version, calls = ["2025-08-03T10:00:00"], []
+    with fake_data(version, calls) as client:
+        first = client.get("/api/articles?start_date=2025-08-01T00:00&limit=10")
+        etag = first.headers["ETag"]
+        again = client.get("/api/articles?start_date=2025-08-01T00:00&limit=10", headers={"If-None-Match": etag})
+        version[0] = "2025-08-03T11:00:00"
+        changed = client.get("/api/articles?start_date=2025-08-01T00:00&limit=10", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.data == b""
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert calls == ["articles", "articles"]
+
+
+def test_equivalent_requests_share_a_cache_entry():
+    version, calls = ["2025-08-03T10:00:00"], []
+    with fake_data(version, calls) as client:
+        first = client.get("/api/articles/count?start_date=2025-08-01T00:00")
+        second = client.get("/api/articles/count?start_date=2025-08-01 00:00:00")
+        other = client.get("/api/articles?start_date=2025-08-01T00:00")
+        tagged = client.get("/api/articles/count?tag=Politics&tag=Europe")
+        reordered = client.get("/api/articles/count?tag=Europe&tag=Politics&tag=")
+
+    assert first.get_json()["count"] == 42
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.data == second.data
+    assert other.headers["ETag"] != first.headers["ETag"]
+    assert tagged.headers["ETag"] == reordered.headers["ETag"]
+    assert tagged.get_json()["filters"]["tags"] == ["Europe", "Politics"]
+    assert calls == ["count", "articles", "count"]
+
+
+def test_lru_keeps_most_recently_used():
+    cache = LruCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+if __name__ == "__main__":
+    test_unchanged_data_is_revalidated_with_304()
+    test_equivalent_requests_share_a_cache_entry()
+    test_lru_keeps_most_recently_used()
+    print("Response cache tests passed!")
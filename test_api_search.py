@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test full-text search of /api/articles/search
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import insert
+
+import api.app as api
+from app.database_operations import article_columns
+from app.migrations import MIGRATIONS
+from app.models import Article, SEARCH_VECTOR_EXPRESSION
+from db_test_support import database_configured, scratch_database, store_articles
+
+
+def test_search_vector_is_generated_by_postgres():
+    statements = [statement for migration in MIGRATIONS for statement in migration.statements]
+    definitions = [statement for statement in statements if "ADD COLUMN" in statement and "search_vector" in statement]
+
+    # Released migrations are frozen, the latest definition has to match the model
+    assert f"GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED" in definitions[-1]
+    assert statements[statements.index(definitions[-1]) + 1].endswith("USING gin (search_vector)")
+    # Writers never send it, Postgres computes it on insert and update
+    assert "search_vector" not in article_columns()
+
+
+def test_search_cursor_round_trip():
+    cursor = api.encode_search_cursor(0.0607927, datetime(2025, 8, 3, 10, 0), "/content/b")
+    assert api.decode_search_cursor(cursor) == (0.0607927, datetime(2025, 8, 3, 10, 0), "/content/b")
+
+
+def test_search_ranks_title_over_standfirst_over_body_and_pages_through_every_match():
+    published_at = datetime(2025, 8, 3, 12, 0)
+
+    def article(url, hours_ago, title="Markets update", subtitle="Stocks and bonds", body="Trading was quiet."):
+        return {
+            "url": url, "title": title, "subtitle": subtitle, "content": f"<p>{body}</p>",
+            "published_at": published_at - timedelta(hours=hours_ago), "scraped_at": published_at
+        }
+
+    articles = [
+        # Older than the body matches, yet the title match ranks first
+        article("/content/title", 10, title="Ukraine ceasefire talks resume"),
+        article("/content/subtitle", 9, subtitle="Kyiv and Ukraine allies meet"),
+        # Equal rank, so newest first
+        *(article(f"/content/body-{i}", i, body="Aid for Ukraine was approved.") for i in range(5)),
+        article("/content/excluded", 1, body="Ukraine and Russia exchanged prisoners."),
+        article("/content/unrelated", 1),
+    ]
+
+    with scratch_database():
+        store_articles(articles)
+        client = api.app.test_client()
+
+        urls, cursor, pages = [], None, 0
+        while True:
+            query = "/api/articles/search?q=ukraine%20-russia&limit=2&fields=url"
+            response = client.get(query + (f"&cursor={cursor}" if cursor else ""))
+            assert response.status_code == 200
+            body = response.get_json()
+            urls += [article["url"] for article in body["articles"]]
+            ranks = [article["rank"] for article in body["articles"]]
+            assert ranks == sorted(ranks, reverse=True)
+            pages += 1
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+    # Every match exactly once, across page boundaries that fall between equal ranks
+    assert urls == ["/content/title", "/content/subtitle", *(f"/content/body-{i}" for i in range(5))]
+    assert pages == 4
+
+
+def test_search_covers_raw_html_bodies_and_the_time_range():
+    with scratch_database() as db:
+        store_articles([
+            {"url": "/content/new", "title": "Climate", "published_at": datetime(2025, 8, 3),
+             "scraped_at": datetime(2025, 8, 3), "content": "<p>Glacier melt speeds up</p>"},
+            {"url": "/content/old", "title": "Climate", "published_at": datetime(2025, 7, 1),
+             "scraped_at": datetime(2025, 7, 1), "content": "<p>Glacier retreat measured</p>"},
+        ])
+        # Stored before content_text, migrate_content.py hasn't reached it yet
+        with db.engine.begin() as conn:
+            conn.execute(insert(Article), [{
+                "url": "/content/legacy", "title": "Alps", "published_at": datetime(2025, 8, 2),
+                "scraped_at": datetime(2025, 8, 2), "content": '<p>A <strong class="glacier">glaciers</strong> survey</p>'
+            }])
+        client = api.app.test_client()
+
+        def search(query):
+            body = client.get(f"/api/articles/search?fields=url&{query}").get_json()
+            return [article["url"] for article in body["articles"]]
+
+        assert search("q=glacier") == ["/content/new", "/content/legacy", "/content/old"]
+        assert search("q=glacier&start_date=2025-08-01") == ["/content/new", "/content/legacy"]
+        # Markup of raw bodies isn't indexed
+        assert search("q=strong") == []
+
+
+def test_search_needs_a_query_and_a_valid_cursor():
+    client = api.app.test_client()
+
+    response = client.get("/api/articles/search?q=%20")
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+    # A list cursor doesn't carry a rank
+    list_cursor = api.encode_cursor(datetime(2025, 8, 3), "/content/b")
+    response = client.get(f"/api/articles/search?q=ukraine&cursor={list_cursor}")
+    assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    test_search_vector_is_generated_by_postgres()
+    test_search_cursor_round_trip()
+    if database_configured():
+        test_search_ranks_title_over_standfirst_over_body_and_pages_through_every_match()
+        test_search_covers_raw_html_bodies_and_the_time_range()
+    test_search_needs_a_query_and_a_valid_cursor()
+    print("Search tests passed!")
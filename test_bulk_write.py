@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test the outcome counts of bulk article writes
+"""
+
+import asyncio
+import sys
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app.config as config
+import app.database_operations as db_services
+from app.database_operations import insert_article_chunk
+from app.models import Article
+from db_test_support import database_configured, scratch_database
+
+
+class ScriptedResult:
+    def __init__(self, rows: list):
+        self._rows = rows
+
+    def all(self) -> list:
+        return self._rows
+
+
+class ScriptedSession:
+    """Async session answering each INSERT with the next scripted RETURNING (xmax = 0) AS inserted rows"""
+
+    def __init__(self, returned: list[list[bool]], fail_at: int | None = None):
+        self.returned = list(returned)
+        self.fail_at = fail_at
+        self.inserts = []
+        self.notifications = []
+        self.committed = False
+        self.rolled_back = False
+
+    async def __aenter__(self) -> "ScriptedSession":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        pass
+
+    async def execute(self, statement, parameters=None):
+        if parameters is not None:
+            self.notifications.append(parameters)
+            return ScriptedResult([])
+        if self.fail_at == len(self.inserts):
+            raise ConnectionError("connection lost")
+        self.inserts.append(statement)
+        return ScriptedResult([SimpleNamespace(inserted=inserted) for inserted in self.returned.pop(0)])
+
+    async def commit(self) -> None:
+        self.committed = True
+
+    async def rollback(self) -> None:
+        self.rolled_back = True
+
+
+@contextmanager
+def scripted_database(session: ScriptedSession, insert_batch_size: int):
+    originals = (db_services.AsyncSessionLocal, config.INSERT_BATCH_SIZE)
+    db_services.AsyncSessionLocal = lambda: session
+    config.INSERT_BATCH_SIZE = insert_batch_size
+    try:
+        yield
+    finally:
+        db_services.AsyncSessionLocal, config.INSERT_BATCH_SIZE = originals
+
+
+def make_articles(*urls: str) -> list[dict]:
+    return [
+        {"url": url, "title": f"Title {url}", "published_at": datetime(2025, 8, 1), "content": "<p>Body</p>"}
+        for url in urls
+    ]
+
+
+def test_counts_come_from_the_returned_rows():
+    # Two statements of two rows: one inserted and one updated, then one inserted and one left
+    # alone by ON CONFLICT, which returns no row for it
+    session = ScriptedSession(returned=[[True, False], [True]])
+    articles = make_articles("/content/a", "/content/b", "/content/c", "/content/a", "/content/d")
+
+    with scripted_database(session, insert_batch_size=2):
+        result = asyncio.run(insert_article_chunk(articles, on_conflict="update"))
+
+    # Skipped: the repeated URL, which goes out once, and the row ON CONFLICT returned nothing for
+    assert (result.inserted, result.updated, result.skipped) == (2, 1, 2)
+    assert len(session.inserts) == 2
+    assert session.committed and not session.rolled_back
+    assert session.notifications[0]["payload"] == '{"inserted": 2, "updated": 1}'
+
+
+def test_rows_are_stamped_by_the_database_as_it_stores_them():
+    session = ScriptedSession(returned=[[True, True]])
+    scraped_at = datetime(2025, 8, 2)
+
+    with scripted_database(session, insert_batch_size=2):
+        asyncio.run(insert_article_chunk([
+            *make_articles("/content/a"), {**make_articles("/content/b")[0], "scraped_at": scraped_at}
+        ]))
+
+    compiled = session.inserts[0].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    # a was handed over unstamped, b keeps the scrape time it came with
+    assert sql.count("LOCALTIMESTAMP") == 3
+    assert sorted(value for value in compiled.params.values() if value == scraped_at) == [scraped_at] * 3
+
+
+def test_unchanged_chunk_writes_nothing_and_sends_no_notification():
+    session = ScriptedSession(returned=[[]])
+
+    with scripted_database(session, insert_batch_size=10):
+        result = asyncio.run(insert_article_chunk(make_articles("/content/a", "/content/b")))
+
+    assert (result.inserted, result.updated, result.skipped) == (0, 0, 2)
+    assert session.notifications == []
+
+
+def test_failed_chunk_is_rolled_back_as_a_whole():
+    session = ScriptedSession(returned=[[True, True]], fail_at=1)
+
+    with scripted_database(session, insert_batch_size=2):
+        try:
+            asyncio.run(insert_article_chunk(make_articles("/content/a", "/content/b", "/content/c")))
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("the write error was swallowed")
+
+    assert session.rolled_back and not session.committed
+
+
+def test_counts_and_rewrites_on_postgres():
+    first_scrape, second_scrape = datetime(2025, 8, 2), datetime(2025, 8, 3)
+
+    def scraped(articles, scraped_at, **changes):
+        return [{**article, "scraped_at": scraped_at, **changes.get(article["url"], {})} for article in articles]
+
+    with scratch_database() as db:
+        stored = make_articles("/content/a", "/content/b", "/content/c")
+        result = asyncio.run(insert_article_chunk(scraped(stored, first_scrape), on_conflict="update"))
+        assert (result.inserted, result.updated, result.skipped) == (3, 0, 0)
+
+        # a was edited, b and its repeat are unchanged, d is new
+        again = scraped(make_articles("/content/a", "/content/b", "/content/d", "/content/b"), second_scrape, **{
+            "/content/a": {"content": "<p>Corrected body</p>"}
+        })
+        result = asyncio.run(insert_article_chunk(again, on_conflict="update"))
+        assert (result.inserted, result.updated, result.skipped) == (1, 1, 2)
+
+        # Without update, existing rows are left as they are whatever changed
+        edited = scraped(make_articles("/content/c"), second_scrape, **{"/content/c": {"content": "<p>New</p>"}})
+        result = asyncio.run(insert_article_chunk(edited, on_conflict="nothing"))
+        assert (result.inserted, result.updated, result.skipped) == (0, 0, 1)
+
+        with db.engine.connect() as conn:
+            rows = dict(conn.execute(select(Article.url, Article.updated_at)).all())
+
+    assert rows == {
+        "/content/a": second_scrape, "/content/b": first_scrape,
+        "/content/c": first_scrape, "/content/d": second_scrape
+    }
+
+
+if __name__ == "__main__":
+    test_counts_come_from_the_returned_rows()
+    test_rows_are_stamped_by_the_database_as_it_stores_them()
+    test_unchanged_chunk_writes_nothing_and_sends_no_notification()
+    test_failed_chunk_is_rolled_back_as_a_whole()
+    if database_configured():
+        test_counts_and_rewrites_on_postgres()
+    print("Bulk write tests passed!")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test resuming interrupted crawls from their checkpoint
+"""
+
+import asyncio
+import sys
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app.database_operations as db_services
+from app.checkpoint import Checkpoint
+from app.spider import Spider
+from app.url_index import KnownUrlIndex
+
+
+@contextmanager
+def fake_checkpoints(store: dict[str, Checkpoint]):
+    """Stand in for the crawl_checkpoint functions of the database module for the duration of the block"""
+    async def load_crawl_checkpoint(origin):
+        return store.get(origin)
+
+    async def save_crawl_checkpoint(origin, checkpoint):
+        store[origin] = checkpoint
+
+    originals = (db_services.load_crawl_checkpoint, db_services.save_crawl_checkpoint)
+    db_services.load_crawl_checkpoint = load_crawl_checkpoint
+    db_services.save_crawl_checkpoint = save_crawl_checkpoint
+    try:
+        yield
+    finally:
+        db_services.load_crawl_checkpoint, db_services.save_crawl_checkpoint = originals
+
+
+def make_spider(stored_urls=()) -> Spider:
+    spider = Spider(first_run=True, origin="http://standin")
+    spider.known_urls = KnownUrlIndex(stored_urls)
+    spider.start_time = datetime(2025, 8, 10, 12, 0)
+    return spider
+
+
+def test_interrupted_run_carries_on_where_it_stopped():
+    started_at = datetime(2025, 8, 10, 9, 30)
+    store = {"http://standin": Checkpoint(
+        started_at=started_at, first_run=True, catching_up=False, page=41, stop_page=None,
+        pending={"/content/c": 40, "/content/a": 39, "/content/b": 40}
+    )}
+    spider = make_spider(stored_urls=["/content/b"])
+    url_queue = asyncio.Queue()
+
+    with fake_checkpoints(store):
+        page = asyncio.run(spider.resume(url_queue))
+
+    assert page == 41
+    assert spider.resumed and spider.first_run
+    # The window stays that of the interrupted run
+    assert spider.start_time == started_at
+    # Pending URLs go first, in listing order, except what was stored before the crash
+    assert [url_queue.get_nowait() for _ in range(url_queue.qsize())] == [("/content/a", 39), ("/content/c", 40)]
+    assert spider.unfinished == {"/content/a": 39, "/content/c": 40}
+
+
+def test_progress_is_saved_with_unwritten_articles():
+    store = {}
+    spider = make_spider()
+
+    async def scenario():
+        await spider.resume(asyncio.Queue())
+        spider.unfinished = {"/content/b": 3}
+        spider.unwritten = {"/content/a": 2}
+        await spider.save_checkpoint(4)
+
+    with fake_checkpoints(store):
+        asyncio.run(scenario())
+        checkpoint = store["http://standin"]
+        assert (checkpoint.page, checkpoint.first_run, checkpoint.finished_at) == (4, True, None)
+        assert checkpoint.pending == {"/content/a": 2, "/content/b": 3}
+
+        asyncio.run(spider.save_checkpoint(finished=True))
+        assert store["http://standin"].page == 4
+        assert store["http://standin"].pending == {}
+        assert store["http://standin"].finished_at is not None
+
+
+def test_restart_after_a_finished_run_catches_up_instead_of_backfilling():
+    store = {"http://standin": Checkpoint(
+        started_at=datetime(2025, 8, 10, 8, 0), first_run=False, catching_up=False, page=3,
+        finished_at=datetime(2025, 8, 10, 8, 5)
+    )}
+    spider = make_spider(stored_urls=["/content/b"])
+
+    with fake_checkpoints(store):
+        assert asyncio.run(spider.resume(asyncio.Queue())) == 1
+
+    assert not spider.first_run and spider.catching_up and not spider.resumed
+    # Anything published while the parser was down is in the window...
+    assert spider.within_window(spider.start_time - timedelta(days=10))
+    # ...but a page listing articles stored before may end the walk
+    assert spider.select_new_urls(["/content/a", "/content/b", "/content/c"]) == (["/content/a", "/content/c"], True)
+
+
+def test_unreadable_checkpoint_falls_back_to_a_fresh_walk():
+    spider = make_spider()
+    url_queue = asyncio.Queue()
+
+    async def load_crawl_checkpoint(origin):
+        raise ConnectionError("database is down")
+
+    original = db_services.load_crawl_checkpoint
+    db_services.load_crawl_checkpoint = load_crawl_checkpoint
+    try:
+        assert asyncio.run(spider.resume(url_queue)) == 1
+    finally:
+        db_services.load_crawl_checkpoint = original
+
+    assert spider.first_run and not spider.resumed and not spider.catching_up
+    assert url_queue.empty()
+
+
+if __name__ == "__main__":
+    test_interrupted_run_carries_on_where_it_stopped()
+    test_progress_is_saved_with_unwritten_articles()
+    test_restart_after_a_finished_run_catches_up_instead_of_backfilling()
+    test_unreadable_checkpoint_falls_back_to_a_fresh_walk()
+    print("Checkpoint tests passed!")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test plain-text and gzipped HTML storage of article bodies
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.content import compact_article, compress_html, decompress_html, html_to_text
+from app.database_operations import _prepare_rows
+from migrate_content import format_report
+
+
+def test_plain_text_keeps_one_line_per_block():
+    html = (
+        '<p>First <a href="/content/x">linked</a> paragraph.</p><!-- ad slot -->'
+        '<script>track()</script><h2>Heading</h2><ul><li>one</li><li>two</li></ul>'
+        '<p>Line<br>break &amp; entity</p>'
+    )
+
+    assert html_to_text(html) == "First linked paragraph.\nHeading\none\ntwo\nLine\nbreak & entity"
+    assert html_to_text(None) is None
+    assert html_to_text("  ") == ""
+
+
+def test_ingest_stores_text_and_gzipped_html():
+    html = "<p>" + "Markets rallied. " * 200 + "</p>"
+    article = {"url": "/content/a", "title": "A", "content": html, "published_at": datetime(2025, 8, 3)}
+
+    compacted = compact_article(article)
+    assert "content" not in compacted
+    assert compacted["content_text"].startswith("Markets rallied.")
+    assert decompress_html(compacted["content_html_gz"]) == html
+    assert len(compacted["content_html_gz"]) < len(html) // 10
+    # Same input, same bytes
+    assert compress_html(html) == compacted["content_html_gz"]
+    assert compact_article({"url": "/content/b", "title": "B"}) == {"url": "/content/b", "title": "B"}
+
+    rows = _prepare_rows([article, {"url": "/content/b", "title": "B", "content": None}])
+    assert set(rows[0]) == {
+        "url", "title", "published_at", "content_text", "content_html_gz", "content_hash", "content",
+        "scraped_at", "updated_at", "last_checked_at"
+    }
+    # Re-scraped legacy rows drop their raw HTML
+    assert rows[0]["content"] is None
+    assert rows[1]["content_text"] is None and rows[1]["content_html_gz"] is None
+
+
+def test_report_compares_stored_sizes():
+    before = {"articles": 4, "raw_articles": 4, "raw_bytes": 40960, "text_bytes": 0, "gzip_bytes": 0,
+              "table_bytes": 65536}
+    after = {"articles": 4, "raw_articles": 0, "raw_bytes": 0, "text_bytes": 8192, "gzip_bytes": 12288,
+             "table_bytes": 32768}
+
+    report = format_report(before, after)
+    assert report[1] == "Stored body bytes: 40.0 KiB -> 20.0 KiB (saved 20.0 KiB, 50.0%)"
+    assert report[3] == "Read by a whole-row query, per article: 5.0 KiB less"
+    assert report[4] == "Table size on disk: 64.0 KiB -> 32.0 KiB"
+
+
+if __name__ == "__main__":
+    test_plain_text_keeps_one_line_per_block()
+    test_ingest_stores_text_and_gzipped_html()
+    test_report_compares_stored_sizes()
+    print("Content storage tests passed!")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test that the lxml article extractor matches the BeautifulSoup one
+"""
+
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.extractor import parse_article
+from bench.corpus import load_dump_rows, render_article_page
+
+
+def test_engines_match_on_dump_corpus():
+    rows = load_dump_rows()
+    assert rows
+
+    for row in rows:
+        page = render_article_page(row)
+        expected = parse_article(page, engine="bs4")
+        actual = parse_article(page, engine="lxml")
+        assert expected is not None
+        assert actual == expected, row["url"]
+        assert actual["content"] == row["content"]
+
+
+def test_engines_agree_on_rejected_pages():
+    row = load_dump_rows()[0]
+    paywalled = render_article_page(row, paywalled=True)
+    assert parse_article(paywalled, engine="bs4") is None
+    assert parse_article(paywalled, engine="lxml") is None
+
+    undated = render_article_page(row).replace('datetime="', 'data-datetime="')
+    assert parse_article(undated, engine="bs4") is None
+    assert parse_article(undated, engine="lxml") is None
+
+
+if __name__ == "__main__":
+    test_engines_match_on_dump_corpus()
+    test_engines_agree_on_rejected_pages()
+    print("Extractor tests passed!")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test the pooled HTTP fetcher against the local ft.com stand-in
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+import aiohttp
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.fetcher import Fetcher
+from app.rate_limiter import AimdRateLimiter, FixedDelayRateLimiter
+from bench.corpus import build_corpus
+from bench.standin import Faults, StandinServer
+
+CORPUS = build_corpus(article_count=40, per_page=10)
+
+
+class RecordingRateLimiter(FixedDelayRateLimiter):
+    """No delay between requests, keeps the outcomes it is told about"""
+
+    def __init__(self):
+        super().__init__(delay=0, backoff=0)
+        self.outcomes = []
+
+    def record(self, status, retry_after=None):
+        self.outcomes.append((status, retry_after))
+        super().record(status, retry_after)
+
+
+class FlakyFetcher(Fetcher):
+    """Loses the connection on the first `failures` requests it sends"""
+
+    def __init__(self, failures: int, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    async def _request(self, url, headers, cookies):
+        if self.failures > 0:
+            self.failures -= 1
+            raise aiohttp.ServerDisconnectedError()
+        return await super()._request(url, headers, cookies)
+
+
+async def fetch_all(server: StandinServer, fetcher: Fetcher, urls: list[str]) -> list:
+    return await asyncio.gather(*(fetcher.get(server.origin + url) for url in urls))
+
+
+def test_concurrent_fetches_share_the_per_host_limit():
+    urls = [row["url"] for row in CORPUS.rows[:8]]
+
+    async def scenario(concurrency_per_host: int):
+        async with StandinServer(CORPUS, Faults(latency=0.2)) as server:
+            async with Fetcher(concurrency_per_host=concurrency_per_host, rate_limiter=RecordingRateLimiter()) as fetcher:
+                started = time.perf_counter()
+                responses = await fetch_all(server, fetcher, urls)
+                return responses, time.perf_counter() - started, server.origin
+
+    responses, concurrent_elapsed, origin = asyncio.run(scenario(concurrency_per_host=4))
+    assert [response.status for response in responses] == [200] * 8
+    assert [response.url for response in responses] == [origin + url for url in urls]
+    assert "Financial Times" in responses[0].text
+    # Two rounds of four connections
+    assert 0.4 <= concurrent_elapsed < 0.75
+
+    # One connection per host: the same requests go out one after another
+    responses, sequential_elapsed, _ = asyncio.run(scenario(concurrency_per_host=1))
+    assert [response.status for response in responses] == [200] * 8
+    assert sequential_elapsed >= 1.6
+
+
+def test_throttled_requests_are_retried_up_to_the_limit():
+    url = CORPUS.rows[0]["url"]
+
+    async def scenario(faults: Faults, path: str = url):
+        limiter = RecordingRateLimiter()
+        async with StandinServer(CORPUS, faults) as server, Fetcher(retries=3, rate_limiter=limiter) as fetcher:
+            response = await fetcher.get(server.origin + path)
+            return response, limiter.outcomes, dict(server.stats)
+
+    # Always throttled: the last answer is returned after three retries, each one reported with its Retry-After
+    response, outcomes, stats = asyncio.run(scenario(Faults(rate_429=1.0, retry_after=0)))
+    assert response.status == 429
+    assert response.headers["Retry-After"] == "0"
+    assert outcomes == [(429, 0.0)] * 4
+    assert stats == {429: 4}
+
+    # Not a throttling answer, so nothing to retry
+    response, outcomes, stats = asyncio.run(scenario(Faults(), path="/content/missing"))
+    assert response.status == 404
+    assert outcomes == [(404, None)]
+
+
+def test_fetches_recover_from_intermittent_errors():
+    urls = [row["url"] for row in CORPUS.rows[:10]]
+
+    async def scenario():
+        limiter = RecordingRateLimiter()
+        faults = Faults(rate_406=0.2, rate_5xx=0.2, seed=7)
+        async with StandinServer(CORPUS, faults) as server:
+            async with Fetcher(concurrency_per_host=1, retries=10, rate_limiter=limiter) as fetcher:
+                responses = [await fetcher.get(server.origin + url) for url in urls]
+            return responses, limiter.outcomes, dict(server.stats)
+
+    responses, outcomes, stats = asyncio.run(scenario())
+
+    assert [response.status for response in responses] == [200] * 10
+    assert stats[200] == 10 and stats[406] + stats[503] > 0
+    # Every attempt, failed or not, went through the rate limiter
+    assert len(outcomes) == sum(stats.values())
+
+
+def test_connection_errors_are_retried_without_pausing_the_limiter():
+    url = CORPUS.rows[0]["url"]
+    limiter = AimdRateLimiter(initial_rate=50, max_rate=50, backoff=60)
+    initial_rate = limiter.rate
+
+    async def scenario(failures: int, retries: int):
+        async with StandinServer(CORPUS) as server:
+            async with FlakyFetcher(failures, retries=retries, error_retry_delay=0.05, rate_limiter=limiter) as fetcher:
+                started = time.perf_counter()
+                try:
+                    response = await fetcher.get(server.origin + url)
+                except aiohttp.ClientError as e:
+                    response = e
+                return response, time.perf_counter() - started
+
+    response, elapsed = asyncio.run(scenario(failures=2, retries=3))
+    assert response.status == 200
+    # Two short retry delays instead of the 60 s throttling pause, and the rate isn't cut
+    assert elapsed < 1
+    assert limiter.pause_remaining() == 0 and limiter.consecutive_throttles == 0
+    assert limiter.rate >= initial_rate
+
+    # Out of retries the error is raised, still without pausing the other fetches
+    response, elapsed = asyncio.run(scenario(failures=5, retries=1))
+    assert isinstance(response, aiohttp.ServerDisconnectedError)
+    assert elapsed < 1 and limiter.pause_remaining() == 0
+
+
+def test_fetcher_must_be_opened():
+    async def scenario():
+        await Fetcher(rate_limiter=RecordingRateLimiter()).get("http://127.0.0.1/world")
+
+    try:
+        asyncio.run(scenario())
+    except RuntimeError:
+        return
+    raise AssertionError("an unopened fetcher sent a request")
+
+
+if __name__ == "__main__":
+    test_concurrent_fetches_share_the_per_host_limit()
+    test_throttled_requests_are_retried_up_to_the_limit()
+    test_fetches_recover_from_intermittent_errors()
+    test_connection_errors_are_retried_without_pausing_the_limiter()
+    test_fetcher_must_be_opened()
+    print("Fetcher tests passed!")
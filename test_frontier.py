@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Test the crawl frontier shared by parser replicas and their shared rate limit
+"""
+
+import asyncio
+import re
+import sys
+import os
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.dialects import postgresql
+
+import app.database_operations as db_services
+import app.frontier as frontier_module
+from app.database_operations import ChunkInsertResult, _claim_frontier_query
+from app.frontier import Frontier, SharedRateLimiter
+from app.rate_limiter import AimdRateLimiter, FixedDelayRateLimiter
+from app.spider import Spider
+from bench.corpus import build_corpus
+from bench.standin import StandinServer
+from db_test_support import database_configured, scratch_database
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@contextmanager
+def fake_frontier_table(rows: dict[str, int], calls: list):
+    """Stand in for the crawl_frontier functions of the database module for the duration of the block"""
+    async def claim_frontier_urls(owner, limit, lease, max_attempts):
+        claimed = sorted(rows.items(), key=lambda row: row[1])[:limit]
+        for url, _ in claimed:
+            del rows[url]
+        return [(url, page, True) for url, page in claimed]
+
+    async def complete_frontier_urls(owner, urls):
+        calls.append(("complete", owner, list(urls)))
+
+    async def release_frontier_urls(owner, urls):
+        calls.append(("release", owner, list(urls)))
+
+    fakes = {
+        "claim_frontier_urls": claim_frontier_urls,
+        "complete_frontier_urls": complete_frontier_urls,
+        "release_frontier_urls": release_frontier_urls,
+    }
+    originals = {name: getattr(db_services, name) for name in fakes}
+    for name, fake in fakes.items():
+        setattr(db_services, name, fake)
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(db_services, name, original)
+
+
+class SharedTables:
+    """In-memory crawl_frontier and crawl_frontier_progress tables, and the article table the replicas write"""
+
+    def __init__(self):
+        self.frontier: dict[str, dict] = {}
+        self.progress: dict[str, dict] = {}
+        self.listing_lock_held = False
+        self.written: list[str] = []
+
+    async def enqueue_frontier_urls(self, urls, page, first_run):
+        new = [url for url in urls if url not in self.frontier]
+        for url in new:
+            self.frontier[url] = {"page": page, "first_run": first_run, "owner": None, "attempts": 0}
+        return len(new)
+
+    async def claim_frontier_urls(self, owner, limit, lease, max_attempts):
+        claimable = sorted(
+            (row["page"], url) for url, row in self.frontier.items()
+            if row["owner"] is None and row["attempts"] < max_attempts
+        )[:limit]
+        for _, url in claimable:
+            self.frontier[url]["owner"] = owner
+            self.frontier[url]["attempts"] += 1
+        return [(url, page, self.frontier[url]["first_run"]) for page, url in claimable]
+
+    async def renew_frontier_leases(self, owner, urls, lease):
+        return len(urls)
+
+    async def complete_frontier_urls(self, owner, urls):
+        for url in urls:
+            if self.frontier.get(url, {}).get("owner") == owner:
+                del self.frontier[url]
+
+    async def release_frontier_urls(self, owner, urls):
+        for url in urls:
+            if self.frontier.get(url, {}).get("owner") == owner:
+                self.frontier[url]["owner"] = None
+                self.frontier[url]["attempts"] -= 1
+
+    async def count_frontier_urls(self, max_attempts, through_page=None, excluding=()):
+        return sum(
+            1 for url, row in self.frontier.items()
+            if row["attempts"] < max_attempts and (through_page is None or row["page"] <= through_page)
+            and url not in excluding
+        )
+
+    async def purge_exhausted_frontier_urls(self, max_attempts):
+        return []
+
+    async def advisory_lock_held(self, lock_id):
+        return self.listing_lock_held
+
+    async def start_frontier_progress(self, origin):
+        self.progress[origin] = {"stop_page": None, "accepted_page": 0}
+
+    async def sync_frontier_progress(self, origin, stop_page, accepted_page):
+        row = self.progress.get(origin)
+        if row is None:
+            return None
+        if stop_page is not None:
+            row["stop_page"] = stop_page if row["stop_page"] is None else min(row["stop_page"], stop_page)
+        row["accepted_page"] = max(row["accepted_page"], accepted_page)
+        return row["stop_page"], row["accepted_page"]
+
+    async def end_frontier_progress(self, origin):
+        self.progress.pop(origin, None)
+
+    async def insert_article_chunk(self, articles, on_conflict="nothing"):
+        self.written.extend(article["url"] for article in articles)
+        return ChunkInsertResult(inserted=len(articles))
+
+    async def get_known_urls(self):
+        return set(self.written)
+
+    async def load_crawl_checkpoint(self, origin):
+        return None
+
+    async def save_crawl_checkpoint(self, origin, checkpoint):
+        pass
+
+    @contextmanager
+    def installed(self):
+        """Stand in for the database module's functions on these tables for the duration of the block"""
+        names = [
+            name for name in vars(SharedTables)
+            if not name.startswith("_") and name != "installed" and hasattr(db_services, name)
+        ]
+        originals = {name: getattr(db_services, name) for name in names}
+        for name in names:
+            setattr(db_services, name, getattr(self, name))
+        try:
+            yield
+        finally:
+            for name, original in originals.items():
+                setattr(db_services, name, original)
+
+
+class ReplicaFrontier(Frontier):
+    """Frontier whose listing lock is a flag of the shared tables instead of a Postgres advisory lock"""
+
+    def __init__(self, tables: SharedTables, leader: bool, **kwargs):
+        super().__init__(poll_interval=0.01, **kwargs)
+        self.tables = tables
+        self.leader = leader
+
+    @asynccontextmanager
+    async def leadership(self):
+        self.tables.listing_lock_held |= self.leader
+        try:
+            yield self.leader
+        finally:
+            if self.leader:
+                self.tables.listing_lock_held = False
+
+
+def test_claims_skip_locked_and_leased_rows():
+    query = _claim_frontier_query("parser-1", limit=10, lease=timedelta(seconds=300), max_attempts=3)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "crawl_frontier.lease_expires_at IS NULL OR crawl_frontier.lease_expires_at < LOCALTIMESTAMP" in sql
+    assert "crawl_frontier.attempts < " in sql
+    assert "ORDER BY crawl_frontier.page, crawl_frontier.queued_at" in sql
+    assert "attempts=(crawl_frontier.attempts + " in sql
+    assert "RETURNING crawl_frontier.url, crawl_frontier.page, crawl_frontier.first_run" in sql
+
+
+def test_frontier_completes_in_batches_and_releases_the_rest():
+    rows = {"/content/c": 2, "/content/a": 1, "/content/b": 1}
+    calls = []
+    frontier = Frontier(worker_id="parser-1", claim_batch=2)
+
+    async def scenario():
+        items = await frontier.claim()
+        assert [item.url for item in items] == ["/content/a", "/content/b"]
+        assert set(frontier.leases) == {"/content/a", "/content/b"}
+
+        frontier.complete("/content/a")
+        # Unclaimed URLs are not this replica's to complete
+        frontier.complete("/content/x")
+        assert calls == []
+
+        await frontier.claim()
+        assert calls == [("complete", "parser-1", ["/content/a"])]
+        await frontier.release()
+
+    with fake_frontier_table(rows, calls):
+        asyncio.run(scenario())
+
+    assert calls[-1] == ("release", "parser-1", ["/content/b", "/content/c"])
+    assert frontier.leases == {}
+
+
+def test_shared_rate_limit_books_slots_and_spreads_pauses():
+    clock = FakeClock()
+    reservations = []
+
+    async def reserve(origin, spacing, pause):
+        reservations.append((origin, spacing, pause))
+        return 1.5
+
+    local = AimdRateLimiter(initial_rate=2, backoff=60, clock=clock, sleep=clock.sleep)
+    limiter = SharedRateLimiter(local, origin="https://www.ft.com", reserve=reserve, clock=clock, sleep=clock.sleep)
+
+    async def scenario():
+        await limiter.acquire()
+        limiter.record(429, retry_after=30)
+        await limiter.acquire()
+        await limiter.acquire()
+
+    asyncio.run(scenario())
+
+    assert reservations[0] == ("https://www.ft.com", 0.5, 0.0)
+    # The throttled replica's pause goes out with its next booking only, at the reduced pace
+    assert reservations[1] == ("https://www.ft.com", 1.0, 30.0)
+    assert reservations[2][2] == 0.0
+    assert clock.now == 4.5
+
+    async def unavailable(origin, spacing, pause):
+        raise ConnectionError("database is down")
+
+    # Without the database the replica falls back to pacing on its own
+    limiter = SharedRateLimiter(local, reserve=unavailable, clock=clock, sleep=clock.sleep)
+    asyncio.run(limiter.acquire())
+    assert local.slept_seconds > 0
+
+
+def test_walk_ends_on_an_article_another_replica_parsed():
+    # A regular run's hour holds the first 11 articles, a page and a bit; no teaser timestamps
+    # on the listing, so only the articles themselves tell where the window ends
+    corpus = build_corpus(article_count=100, per_page=10, interval=timedelta(minutes=5), paywall_ratio=0)
+    for page, html in corpus.listing_pages.items():
+        corpus.listing_pages[page] = re.sub(r'<div class="o-teaser__timestamp">.*?</div>', "", html)
+    tables = SharedTables()
+
+    def make_replica(origin: str, frontier: ReplicaFrontier) -> Spider:
+        spider = Spider(origin=origin, frontier=frontier)
+        spider.http_cache.enabled = False
+        spider.create_rate_limiter = lambda: FixedDelayRateLimiter(delay=0)
+        return spider
+
+    async def scenario():
+        async with StandinServer(corpus) as server:
+            # The walking replica claims nothing, every article is parsed by the other one
+            walker = make_replica(server.origin, ReplicaFrontier(tables, leader=True, worker_id="walker", claim_batch=0))
+            worker = make_replica(server.origin, ReplicaFrontier(tables, leader=False, worker_id="worker"))
+
+            async def run_worker():
+                # Let the walker take the listing lock first
+                await asyncio.sleep(0.05)
+                await worker.run()
+
+            await asyncio.gather(walker.run(), run_worker())
+            return walker, worker
+
+    with tables.installed():
+        walker, worker = asyncio.run(scenario())
+
+    assert sorted(tables.written) == sorted(row["url"] for row in corpus.rows[:11])
+    assert worker.stop_page == walker.stop_page == 2
+    # Page 3 is read ahead while page 2 is in flight, nothing past it
+    assert walker.stats.listing_pages <= 3
+    assert tables.frontier == {} and tables.progress == {}
+
+
+def test_failed_write_leaves_the_urls_claimable():
+    corpus = build_corpus(article_count=30, per_page=10, interval=timedelta(minutes=5), paywall_ratio=0)
+    tables = SharedTables()
+    attempted = []
+
+    async def failing_insert(articles, on_conflict="nothing"):
+        attempted.extend(article["url"] for article in articles)
+        raise ConnectionError("database is down")
+
+    tables.insert_article_chunk = failing_insert
+
+    async def scenario():
+        async with StandinServer(corpus) as server:
+            spider = Spider(origin=server.origin, frontier=ReplicaFrontier(tables, leader=True, worker_id="parser-1"))
+            spider.http_cache.enabled = False
+            spider.create_rate_limiter = lambda: FixedDelayRateLimiter(delay=0)
+            await spider.run()
+            return spider
+
+    with tables.installed():
+        spider = asyncio.run(scenario())
+        assert attempted and tables.written == []
+        # Parsed and accepted, but never stored: the URLs stay queued and unleased, the next claim gets them
+        assert all(tables.frontier[url]["owner"] is None and tables.frontier[url]["attempts"] == 0 for url in attempted)
+        assert spider.frontier.leases == {} and spider.frontier.unwritten == set()
+        claimed = asyncio.run(Frontier(worker_id="parser-2", claim_batch=100).claim())
+
+    assert set(attempted) <= {item.url for item in claimed}
+
+
+def test_replicas_share_the_frontier_through_postgres():
+    pages = {**{f"/content/1-{i}": 1 for i in range(10)}, **{f"/content/2-{i}": 2 for i in range(5)}}
+
+    async def scenario():
+        a = Frontier(worker_id="a", claim_batch=6, lease_seconds=60, max_attempts=2)
+        b = Frontier(worker_id="b", claim_batch=6, lease_seconds=60, max_attempts=2)
+        await a.add([url for url, page in pages.items() if page == 2], 2, False)
+        await a.add([url for url, page in pages.items() if page == 1], 1, True)
+        # Queued URLs are left alone, with their page and window
+        assert await db_services.enqueue_frontier_urls(["/content/1-0"], 3, False) == 0
+
+        claimed_a, claimed_b = await asyncio.gather(a.claim(), b.claim())
+        held_a, held_b = {item.url for item in claimed_a}, {item.url for item in claimed_b}
+        # No URL is leased to both, and the lower page goes first
+        assert len(held_a) == len(held_b) == 6 and not held_a & held_b
+        assert {url for url, page in pages.items() if page == 1} <= held_a | held_b
+        assert all(item.page == pages[item.url] and item.first_run == (item.page == 1) for item in claimed_a + claimed_b)
+        assert await a.pending() == 15
+
+        for url in held_a:
+            a.complete(url)
+        await b.release()
+        left = sorted((page, url) for url, page in pages.items() if url not in held_a)
+        assert await a.pending() == len(left) == 9
+
+        # Handed back URLs are claimable right away, still lowest page first
+        reclaimed = await a.claim()
+        assert sorted(item.page for item in reclaimed) == [page for page, _ in left[:6]]
+        rest = {url for _, url in left} - {item.url for item in reclaimed}
+
+        # A lease that runs out goes to the next replica to claim, the first owner can't complete it any more
+        c = Frontier(worker_id="c", claim_batch=6, lease_seconds=0.05, max_attempts=2)
+        d = Frontier(worker_id="d", claim_batch=6, lease_seconds=0.05, max_attempts=2)
+        assert {item.url for item in await c.claim()} == rest
+        await asyncio.sleep(0.2)
+        assert {item.url for item in await d.claim()} == rest
+        for url in rest:
+            c.complete(url)
+        await c.flush()
+        await asyncio.sleep(0.2)
+
+        # Claimed max_attempts times without being handled: not claimable, not pending, purged
+        assert await b.claim() == []
+        assert await a.pending() == 6
+        assert set(await db_services.purge_exhausted_frontier_urls(2)) == rest
+
+        # A held URL is handled but keeps its lease until the article is written; a failed write hands it back
+        held = reclaimed[0].url
+        a.hold(held)
+        assert await a.pending() == 5
+        await a.release([held])
+        assert await a.pending() == 6
+        assert held not in a.leases
+
+        for item in reclaimed[1:]:
+            a.complete(item.url)
+        assert [item.url for item in await a.claim()] == [held]
+        a.complete(held)
+        assert await a.pending() == 0
+
+    with scratch_database():
+        asyncio.run(scenario())
+
+
+def test_walk_progress_and_leadership_through_postgres():
+    origin = "https://www.ft.com"
+
+    async def scenario(db):
+        walker, worker = Frontier(worker_id="walker"), Frontier(worker_id="worker")
+        # Nothing to share before a walk starts
+        assert await worker.sync_progress(origin, 4, 1) == (4, 1)
+
+        await walker.start_walk(origin)
+        assert await worker.sync_progress(origin, None, 2) == (None, 2)
+        assert await walker.sync_progress(origin, 5, 1) == (5, 2)
+        # The lowest stop page and the highest accepted page win
+        assert await worker.sync_progress(origin, 3, 0) == (3, 2)
+        assert await walker.sync_progress(origin, None, 0) == (3, 2)
+        await walker.end_walk(origin)
+        assert await db_services.sync_frontier_progress(origin, None, 0) is None
+
+        engine = frontier_module.engine
+        frontier_module.engine = db.async_engine
+        try:
+            async with walker.leadership() as leading, worker.leadership() as also_leading:
+                assert leading and not also_leading
+                assert await worker.leader_active()
+            assert not await worker.leader_active()
+        finally:
+            frontier_module.engine = engine
+
+    with scratch_database() as db:
+        asyncio.run(scenario(db))
+
+
+def test_request_slots_are_booked_in_postgres():
+    origin = "https://www.ft.com"
+
+    async def scenario():
+        first = await db_services.reserve_request_slot(origin, 1.0)
+        second = await db_services.reserve_request_slot(origin, 1.0)
+        # A throttled replica holds back the next slot of every replica
+        paused = await db_services.reserve_request_slot(origin, 1.0, pause=5.0)
+        after_pause = await db_services.reserve_request_slot(origin, 1.0)
+        return first, second, paused, after_pause
+
+    with scratch_database():
+        first, second, paused, after_pause = asyncio.run(scenario())
+
+    # Seconds until each booked slot, less the time the reservations themselves took
+    assert first <= 0.05
+    assert 0.8 <= second <= 1.05
+    assert 4.8 <= paused <= 5.05
+    assert 5.8 <= after_pause <= 6.05
+
+
+if __name__ == "__main__":
+    test_claims_skip_locked_and_leased_rows()
+    test_frontier_completes_in_batches_and_releases_the_rest()
+    test_shared_rate_limit_books_slots_and_spreads_pauses()
+    test_walk_ends_on_an_article_another_replica_parsed()
+    test_failed_write_leaves_the_urls_claimable()
+    if database_configured():
+        test_replicas_share_the_frontier_through_postgres()
+        test_walk_progress_and_leadership_through_postgres()
+        test_request_slots_are_booked_in_postgres()
+    print("Frontier tests passed!")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test the on-disk HTTP validator cache and the spider's revalidation through it
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import http_cache
+from app.extractor import parse_article
+from app.fetcher import Fetcher
+from app.http_cache import HttpCache
+from app.rate_limiter import FixedDelayRateLimiter
+from app.spider import Spider, article_from_payload, article_to_payload
+from bench.corpus import build_corpus
+from bench.standin import StandinServer
+
+
+def make_cache(directory: str, max_bytes: int = 10_000_000, max_age: float = 3600) -> HttpCache:
+    return HttpCache(directory=directory, max_bytes=max_bytes, max_age=max_age, enabled=True)
+
+
+def age(cache: HttpCache, url: str, seconds: float) -> None:
+    """Make an entry look last used seconds ago"""
+    then = time.time() - seconds
+    os.utime(cache._path(url), (then, then))
+
+
+def test_lookup_returns_stored_validators_and_payload():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(directory)
+        cache.store("https://www.ft.com/world?page=1", {"ETag": '"v1"', "Last-Modified": "Sun, 10 Aug 2025 09:00:00 GMT"}, ["/content/a"])
+        # Nothing to revalidate with, so nothing is kept
+        cache.store("https://www.ft.com/world?page=2", {}, ["/content/b"])
+
+        entry = cache.lookup("https://www.ft.com/world?page=1")
+        assert entry.payload == ["/content/a"]
+        assert entry.validators() == {"If-None-Match": '"v1"', "If-Modified-Since": "Sun, 10 Aug 2025 09:00:00 GMT"}
+        assert cache.lookup("https://www.ft.com/world?page=2") is None
+        assert cache.lookup("https://www.ft.com/world?page=3") is None
+
+        # Unreadable entries are dropped rather than failing the crawl
+        cache._path("https://www.ft.com/world?page=1").write_text("{not json")
+        assert cache.lookup("https://www.ft.com/world?page=1") is None
+        assert not cache._path("https://www.ft.com/world?page=1").exists()
+
+        disabled = HttpCache(directory=directory, enabled=False)
+        disabled.store("https://www.ft.com/world?page=4", {"ETag": '"v1"'}, [])
+        assert cache.lookup("https://www.ft.com/world?page=4") is None
+
+
+def test_entries_expire_unless_revalidated():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(directory, max_age=60)
+        for url in ("/content/a", "/content/b"):
+            cache.store(url, {"ETag": '"v1"'}, None)
+            age(cache, url, 90)
+        # A successful revalidation counts as a fresh use
+        cache.touch("/content/b")
+
+        assert cache.lookup("/content/a") is None
+        assert not cache._path("/content/a").exists()
+        assert cache.lookup("/content/b") is not None
+
+
+def test_eviction_drops_expired_then_least_recently_used_entries():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(directory, max_age=3600)
+        urls = [f"/content/{i}" for i in range(5)]
+        for i, url in enumerate(urls):
+            cache.store(url, {"ETag": '"v1"'}, "x" * 100)
+            age(cache, url, 500 - i * 100)
+        age(cache, urls[4], 7200)
+        # Room for the two most recently used entries, whose sizes vary with the stored_at digits
+        cache.max_bytes = sum(cache._path(url).stat().st_size for url in urls[2:4])
+
+        cache.evict()
+
+        assert [url for url in urls if cache._path(url).exists()] == urls[2:4]
+
+
+def test_concurrent_stores_leave_a_whole_entry():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(directory)
+        # Large enough for a write to take several flushes
+        payloads = [[f"/content/{i}-{n}" for n in range(5000)] for i in range(8)]
+        failures = []
+        warning = http_cache.logger.warning
+        http_cache.logger.warning = failures.append
+
+        def store(payload):
+            for _ in range(10):
+                cache.store("/world", {"ETag": '"v1"'}, payload)
+                # A torn entry would be dropped here with a warning
+                cache.lookup("/world")
+
+        threads = [threading.Thread(target=store, args=(payload,)) for payload in payloads]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            http_cache.logger.warning = warning
+
+        assert failures == []
+        assert cache.lookup("/world").payload in payloads
+        assert list(Path(directory).glob("*/*.tmp")) == []
+
+
+def test_not_modified_article_reuses_the_cached_parse():
+    corpus = build_corpus(article_count=10, per_page=10, paywall_ratio=0)
+    url = corpus.rows[0]["url"]
+
+    async def scenario(directory: str):
+        async with StandinServer(corpus) as server, Fetcher(rate_limiter=FixedDelayRateLimiter(delay=0)) as fetcher:
+            spider = Spider(origin=server.origin)
+            spider.http_cache = make_cache(directory)
+            spider.fetcher = fetcher
+
+            response, cached = await spider.fetch_article(url)
+            assert (response.status, cached) == (200, None)
+            article = parse_article(response.text)
+            spider.http_cache.store(response.url, response.headers, article_to_payload(article))
+
+            response, cached = await spider.fetch_article(url)
+            return article, response, cached, dict(server.stats)
+
+    with tempfile.TemporaryDirectory() as directory:
+        article, response, cached, stats = asyncio.run(scenario(directory))
+
+    # The revalidation comes back without a body, the stored parse stands in for it
+    assert response.status == 304 and not response.text
+    assert article_from_payload(cached.payload) == article
+    assert stats == {200: 1, 304: 1}
+
+
+if __name__ == "__main__":
+    test_lookup_returns_stored_validators_and_payload()
+    test_entries_expire_unless_revalidated()
+    test_eviction_drops_expired_then_least_recently_used_entries()
+    test_concurrent_stores_leave_a_whole_entry()
+    test_not_modified_article_reuses_the_cached_parse()
+    print("HTTP cache tests passed!")
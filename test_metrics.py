@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus metrics of the parser process
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import aiohttp
+
+from app.metrics import Counter, Gauge, Histogram, Metric, Registry, start_metrics_server
+
+
+def test_metrics_render_in_text_format():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ("status",)))
+    depth = registry.register(Gauge("queue_depth", "Queue depth", ("queue",)))
+    latency = registry.register(Histogram("fetch_seconds", "Fetch time", ("kind",), buckets=(0.1, 1)))
+
+    requests.inc(status="200")
+    requests.inc(2, status="429")
+    depth.set_function(lambda: 3, queue="urls")
+    latency.observe(0.05, kind="article")
+    latency.observe(0.5, kind="article")
+    latency.observe(5, kind="article")
+
+    assert registry.render() == "\n".join([
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{status="200"} 1',
+        'requests_total{status="429"} 2',
+        "# HELP queue_depth Queue depth",
+        "# TYPE queue_depth gauge",
+        'queue_depth{queue="urls"} 3',
+        "# HELP fetch_seconds Fetch time",
+        "# TYPE fetch_seconds histogram",
+        'fetch_seconds_bucket{kind="article",le="0.1"} 1',
+        'fetch_seconds_bucket{kind="article",le="1"} 2',
+        'fetch_seconds_bucket{kind="article",le="+Inf"} 3',
+        'fetch_seconds_sum{kind="article"} 5.55',
+        'fetch_seconds_count{kind="article"} 3',
+    ]) + "\n"
+
+    try:
+        requests.inc(kind="article")
+        assert False, "unknown label accepted"
+    except ValueError:
+        pass
+
+
+def test_metrics_endpoint_serves_registry():
+    registry = Registry()
+    registry.register(Counter("runs_total", "Runs")).inc()
+
+    async def scrape():
+        runner = await start_metrics_server(port=0, host="127.0.0.1", registry=registry)
+        port = runner.addresses[0][1]
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                    return response.status, response.headers["Content-Type"], await response.text()
+        finally:
+            await runner.cleanup()
+
+    status, content_type, body = asyncio.run(scrape())
+    assert status == 200
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "runs_total 1\n" in body
+
+
+def test_metric_must_render_its_samples():
+    class Untyped(Metric):
+        type_name = "untyped"
+
+    try:
+        Untyped("jobs", "Jobs")
+    except TypeError:
+        return
+    raise AssertionError("a metric without samples() was instantiated")
+
+
+if __name__ == "__main__":
+    test_metrics_render_in_text_format()
+    test_metrics_endpoint_serves_registry()
+    test_metric_must_render_its_samples()
+    print("Metrics tests passed!")
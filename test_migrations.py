@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test the schema migrations of the article table
+"""
+
+import asyncio
+import sys
+import os
+from datetime import datetime
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+import api.app as api
+from app.migrations import MIGRATIONS, migrate
+from app.models import Article
+from db_test_support import database_configured, scratch_database, store_articles
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class RecordingConnection:
+    """Answers the schema version query with a fixed version and records every statement"""
+
+    def __init__(self, version: int):
+        self.version = version
+        self.statements = []
+
+    async def execute(self, statement, parameters=None):
+        self.statements.append((str(statement), parameters))
+        return FakeResult(self.version)
+
+
+def test_migration_versions_increase():
+    versions = [migration.version for migration in MIGRATIONS]
+    assert versions == list(range(1, len(MIGRATIONS) + 1))
+
+
+def test_every_model_index_has_a_migration():
+    statements = {statement for migration in MIGRATIONS for statement in migration.statements}
+    for index in Article.__table__.indexes:
+        ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        assert ddl.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1) in statements, ddl
+
+
+def test_only_pending_migrations_are_applied():
+    conn = RecordingConnection(version=1)
+
+    assert asyncio.run(migrate(conn)) == len(MIGRATIONS)
+
+    executed = [statement for statement, _ in conn.statements]
+    assert executed[0].startswith("SELECT pg_advisory_xact_lock")
+    assert not any(statement in executed for statement in MIGRATIONS[0].statements)
+    assert all(statement in executed for statement in MIGRATIONS[1].statements)
+    recorded = [parameters["version"] for statement, parameters in conn.statements if "INSERT INTO schema_version" in statement]
+    assert recorded == [migration.version for migration in MIGRATIONS[1:]]
+
+    conn = RecordingConnection(version=len(MIGRATIONS))
+    asyncio.run(migrate(conn))
+    assert len(conn.statements) == 3
+
+
+def search_vector_column(db) -> tuple[int, str]:
+    """Position and generation expression of article.search_vector, a rebuilt column gets a new position"""
+    with db.engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT a.attnum, pg_get_expr(d.adbin, d.adrelid) FROM pg_attribute a "
+            "JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum "
+            "WHERE a.attrelid = 'article'::regclass AND a.attname = 'search_vector' AND NOT a.attisdropped"
+        )).one()
+
+
+def run_migrations(db, migrations=MIGRATIONS) -> int:
+    async def apply():
+        async with db.async_engine.begin() as conn:
+            return await migrate(conn, migrations)
+
+    return asyncio.run(apply())
+
+
+def test_new_database_keeps_the_search_vector_create_all_made():
+    with scratch_database() as db:
+        before = search_vector_column(db)
+
+        assert run_migrations(db) == len(MIGRATIONS)
+
+        assert search_vector_column(db) == before
+        assert "content_text" in before[1]
+
+
+def test_search_vector_of_an_older_database_is_rebuilt_over_content_text():
+    with scratch_database() as db:
+        # The article table as the first migrations left it, search_vector made from the raw HTML
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE article DROP COLUMN search_vector"))
+        assert run_migrations(db, MIGRATIONS[:4]) == 4
+        assert "content_text" not in search_vector_column(db)[1]
+        # Stored with its body as plain text only, which that vector doesn't cover
+        store_articles([{
+            "url": "/content/a", "title": "Markets", "published_at": datetime(2025, 8, 1),
+            "scraped_at": datetime(2025, 8, 1), "content": "<p>Glacier melt speeds up</p>"
+        }])
+        assert api.search_articles("glacier")[0] == []
+
+        assert run_migrations(db) == len(MIGRATIONS)
+
+        assert "content_text" in search_vector_column(db)[1]
+        assert [article["url"] for article in api.search_articles("glacier")[0]] == ["/content/a"]
+
+
+if __name__ == "__main__":
+    test_migration_versions_increase()
+    test_every_model_index_has_a_migration()
+    test_only_pending_migrations_are_applied()
+    if database_configured():
+        test_new_database_keeps_the_search_vector_create_all_made()
+        test_search_vector_of_an_older_database_is_rebuilt_over_content_text()
+    print("Migration tests passed!")
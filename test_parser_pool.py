@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test the parser pool's bound on documents in flight and its parse time metric
+"""
+
+import asyncio
+import sys
+import os
+from concurrent.futures import Executor, Future
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import metrics
+from app.parser_pool import ParserPool, parse_document
+from bench.corpus import build_corpus
+
+
+class HeldExecutor(Executor):
+    """Executor whose submitted parses finish only when the test resolves them"""
+
+    def __init__(self):
+        self.submitted: list[tuple[str, Future]] = []
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        self.submitted.append((args[0], future))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False) -> None:
+        pass
+
+
+def test_max_in_flight_holds_callers_back():
+    pool = ParserPool(workers=1, max_in_flight=2)
+    executor = HeldExecutor()
+    pool._executor = executor
+    parse_seconds = (metrics.PARSE_SECONDS.count(), metrics.PARSE_SECONDS.sum())
+
+    async def scenario():
+        tasks = [asyncio.create_task(pool.parse(f"<html>{i}</html>")) for i in range(5)]
+        await asyncio.sleep(0.01)
+        # Two documents handed to the workers, the other callers wait for a free slot
+        assert [text for text, _ in executor.submitted] == ["<html>0</html>", "<html>1</html>"]
+
+        # A slow parse doesn't hold back a faster one behind it, only the number in flight counts
+        executor.submitted[1][1].set_result(({"title": "b"}, 0.25))
+        await asyncio.sleep(0.01)
+        assert len(executor.submitted) == 3
+        assert tasks[1].done() and not tasks[0].done()
+
+        for i in (0, 2, 3, 4):
+            while len(executor.submitted) <= i:
+                await asyncio.sleep(0.01)
+            executor.submitted[i][1].set_result((None, 0.5))
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(scenario())
+    assert results == [None, {"title": "b"}, None, None, None]
+    # The parse time comes from the worker, not from how long the caller waited
+    assert metrics.PARSE_SECONDS.count() - parse_seconds[0] == 5
+    assert metrics.PARSE_SECONDS.sum() - parse_seconds[1] == 0.25 + 4 * 0.5
+
+
+def test_parse_document_times_the_parse():
+    html = next(iter(build_corpus(article_count=1, per_page=1, paywall_ratio=0).articles.values()))
+    article, seconds = parse_document(html, "lxml")
+    assert article["title"]
+    assert 0 < seconds < 5
+
+
+if __name__ == "__main__":
+    test_max_in_flight_holds_callers_back()
+    test_parse_document_times_the_parse()
+    print("Parser pool tests passed!")
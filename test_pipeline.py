@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test the spider pipeline end to end against the local ft.com stand-in, with the database stubbed out
+"""
+
+import asyncio
+import sys
+import os
+from contextlib import contextmanager
+from datetime import timedelta
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app.config as config
+import app.database_operations as db_services
+from app.database_operations import ChunkInsertResult
+from app.rate_limiter import FixedDelayRateLimiter
+from app.spider import Spider
+from app.url_index import KnownUrlIndex
+from bench.corpus import build_corpus
+from bench.standin import StandinServer
+
+
+@contextmanager
+def fake_database(batches: list[list[str]]):
+    """Stand in for the article and crawl_checkpoint functions of the database module for the duration of the block"""
+    async def insert_article_chunk(articles, on_conflict="nothing"):
+        batches.append([article["url"] for article in articles])
+        return ChunkInsertResult(inserted=len(articles))
+
+    async def load_crawl_checkpoint(origin):
+        return None
+
+    async def save_crawl_checkpoint(origin, checkpoint):
+        pass
+
+    fakes = {
+        "insert_article_chunk": insert_article_chunk,
+        "load_crawl_checkpoint": load_crawl_checkpoint,
+        "save_crawl_checkpoint": save_crawl_checkpoint,
+    }
+    originals = {name: getattr(db_services, name) for name in fakes}
+    for name, fake in fakes.items():
+        setattr(db_services, name, fake)
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(db_services, name, original)
+
+
+@contextmanager
+def settings(**values):
+    """Override app.config values for the duration of the block"""
+    originals = {name: getattr(config, name) for name in values}
+    for name, value in values.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(config, name, value)
+
+
+def make_spider(origin: str, first_run: bool = True, stored_urls=(), fetch_mode: str = "concurrent") -> Spider:
+    spider = Spider(first_run=first_run, fetch_mode=fetch_mode, origin=origin)
+    spider.known_urls = KnownUrlIndex(stored_urls)
+    spider.http_cache.enabled = False
+    spider.create_rate_limiter = lambda: FixedDelayRateLimiter(delay=0)
+    return spider
+
+
+def test_stored_articles_among_new_ones_do_not_end_the_walk():
+    # Ten pages of ten articles, all within a regular run's hour
+    corpus = build_corpus(article_count=100, per_page=10, interval=timedelta(seconds=20), paywall_ratio=0)
+    urls = [row["url"] for row in corpus.rows]
+    # One stored article pinned to the top of page 1, and the previous run's articles from page 4 on
+    stored = [urls[3], *urls[30:]]
+    batches = []
+
+    async def scenario():
+        async with StandinServer(corpus) as server:
+            spider = make_spider(server.origin, first_run=False, stored_urls=stored)
+            await spider.run()
+            return spider
+
+    with fake_database(batches):
+        spider = asyncio.run(scenario())
+
+    written = [url for batch in batches for url in batch]
+    assert sorted(written) == sorted(set(urls[:30]) - {urls[3]})
+    # Page 4 lists nothing new, so the walk ends there without reading page 5
+    assert spider.stats.listing_pages == 4
+    assert spider.stop_page == 4
+
+
+def test_both_fetch_modes_store_the_same_articles():
+    corpus = build_corpus(article_count=60, per_page=10)
+    expected = sorted(row["url"] for row in corpus.rows[:60] if not row["paywalled"])
+
+    async def scenario(fetch_mode: str):
+        async with StandinServer(corpus) as server:
+            spider = make_spider(server.origin, fetch_mode=fetch_mode)
+            await spider.run()
+            return spider, dict(server.stats)
+
+    for fetch_mode in ("sequential", "concurrent"):
+        batches = []
+        with fake_database(batches):
+            spider, stats = asyncio.run(scenario(fetch_mode))
+        assert sorted(url for batch in batches for url in batch) == expected
+        # Every article of the window fetched once, plus the listing pages up to the stale one
+        assert spider.stats.requested_articles == 60
+        assert stats == {200: 60 + spider.stats.listing_pages}
+
+
+def test_writes_flush_at_batch_size_and_the_rest_on_shutdown():
+    corpus = build_corpus(article_count=60, per_page=10)
+    batches = []
+
+    async def scenario():
+        async with StandinServer(corpus) as server:
+            spider = make_spider(server.origin)
+            await spider.run()
+            return spider
+
+    with settings(WRITE_BATCH_SIZE=10, WRITE_FLUSH_INTERVAL=60), fake_database(batches):
+        spider = asyncio.run(scenario())
+
+    # 45 articles outside the paywall: full batches as they fill up, the remainder once the
+    # end-of-input marker reaches the write stage
+    assert [len(batch) for batch in batches] == [10, 10, 10, 10, 5]
+    assert (spider.stats.parsed_articles, spider.stats.rejected_articles) == (45, 15)
+    assert spider.unwritten == {} and spider.unfinished == {}
+
+
+def test_writes_flush_after_interval():
+    spider = Spider()
+    written = []
+
+    async def write_articles(articles):
+        written.append(list(articles))
+
+    spider.write_articles = write_articles
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        row_queue = asyncio.Queue()
+        writer = asyncio.create_task(spider._write_stage(row_queue))
+        for url in ("/content/a", "/content/b", "/content/c"):
+            await row_queue.put({"url": url})
+        started = loop.time()
+        while not written:
+            await asyncio.sleep(0.01)
+        waited = loop.time() - started
+
+        await row_queue.put({"url": "/content/d"})
+        await row_queue.put(None)
+        await asyncio.wait_for(writer, 1)
+        return waited
+
+    with settings(WRITE_BATCH_SIZE=10, WRITE_FLUSH_INTERVAL=0.1):
+        waited = asyncio.run(scenario())
+
+    # A partial batch goes out once it is WRITE_FLUSH_INTERVAL old, whatever is left at shutdown
+    assert 0.09 <= waited < 0.5
+    assert written == [
+        [{"url": "/content/a"}, {"url": "/content/b"}, {"url": "/content/c"}],
+        [{"url": "/content/d"}],
+    ]
+
+
+def test_failing_stage_fails_the_run_instead_of_stalling_it():
+    corpus = build_corpus(article_count=200, per_page=10)
+
+    async def fail(*args):
+        raise RuntimeError("stage failed")
+
+    def fail_to_accept(*args):
+        raise ValueError("stage failed")
+
+    async def scenario(break_stage):
+        async with StandinServer(corpus) as server:
+            spider = make_spider(server.origin)
+            break_stage(spider)
+            # Upstream stages fill their queues within seconds once a stage stops taking items
+            await asyncio.wait_for(spider.run(), 20)
+
+    for break_stage, error in [
+        (lambda spider: setattr(spider, "write_articles", fail), RuntimeError),
+        (lambda spider: setattr(spider, "accept_article", fail_to_accept), ValueError),
+    ]:
+        with settings(WRITE_BATCH_SIZE=5), fake_database([]):
+            try:
+                asyncio.run(scenario(break_stage))
+            except error:
+                continue
+        raise AssertionError(f"the run survived a failing stage, expected {error.__name__}")
+
+
+if __name__ == "__main__":
+    test_stored_articles_among_new_ones_do_not_end_the_walk()
+    test_both_fetch_modes_store_the_same_articles()
+    test_writes_flush_at_batch_size_and_the_rest_on_shutdown()
+    test_writes_flush_after_interval()
+    test_failing_stage_fails_the_run_instead_of_stalling_it()
+    print("Pipeline tests passed!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test the opt-in profiling of crawl runs and API requests
+"""
+
+import asyncio
+import re
+import sys
+import os
+import tempfile
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.profiling import Profiler
+
+
+def busy_work() -> list[str]:
+    return [str(i) * 10 for i in range(20000)]
+
+
+def test_sampled_run_writes_cpu_and_memory_reports():
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = Profiler("run", sample_rate=1, enabled=True, directory=directory, profiler="cprofile")
+
+        async def run():
+            await asyncio.sleep(0)
+            return busy_work()
+
+        with profiler.profile("1") as session:
+            kept = asyncio.run(run())
+
+        assert session is not None and session.name.startswith("run-") and session.name.endswith("-1")
+        files = sorted(os.listdir(directory))
+        assert files == [f"{session.name}.memory.txt", f"{session.name}.prof", f"{session.name}.txt"]
+        with open(os.path.join(directory, f"{session.name}.txt")) as file:
+            assert "busy_work" in file.read()
+        with open(os.path.join(directory, f"{session.name}.memory.txt")) as file:
+            assert "test_profiling.py" in file.read()
+        assert kept
+
+
+def test_overlapping_sessions_report_their_own_peaks():
+    def reported_peak(directory, session):
+        with open(os.path.join(directory, f"{session.name}.memory.txt")) as file:
+            return float(re.search(r"peak ([\d.]+) KiB", file.read()).group(1))
+
+    with tempfile.TemporaryDirectory() as directory:
+        profiler = Profiler("run", sample_rate=1, enabled=True, directory=directory, profiler="cprofile")
+        run = profiler.session("run")
+        spike = bytearray(8 * 1024 * 1024)
+        del spike
+        # Starting a session resets the process-wide peak, the run's spike must survive it
+        request = profiler.session("request")
+        busy_work()
+        request.stop()
+        run.stop()
+
+        assert reported_peak(directory, run) >= 8 * 1024
+        assert reported_peak(directory, request) < 8 * 1024
+
+
+def test_unsampled_and_disabled_profilers_do_nothing():
+    with tempfile.TemporaryDirectory() as directory:
+        for profiler in (
+            Profiler("run", sample_rate=0, enabled=True, directory=directory),
+            Profiler("run", sample_rate=1, enabled=False, directory=directory),
+        ):
+            with profiler.profile("1") as session:
+                busy_work()
+            assert session is None
+        assert os.listdir(directory) == []
+
+
+def test_api_requests_are_profiled_by_request_id():
+    import api.app as api
+
+    with tempfile.TemporaryDirectory() as directory:
+        api.profiler = Profiler("request", sample_rate=1, enabled=True, directory=directory, memory=False)
+        response = api.app.test_client().get("/", headers={"X-Request-ID": "abc/../123"})
+
+        assert response.status_code == 200
+        assert response.headers["X-Profile-Id"].endswith("-index-abc123")
+        assert sorted(os.listdir(directory)) == [
+            response.headers["X-Profile-Id"] + ".prof", response.headers["X-Profile-Id"] + ".txt"
+        ]
+
+
+if __name__ == "__main__":
+    test_sampled_run_writes_cpu_and_memory_reports()
+    test_overlapping_sessions_report_their_own_peaks()
+    test_unsampled_and_disabled_profilers_do_nothing()
+    test_api_requests_are_profiled_by_request_id()
+    print("Profiling tests passed!")
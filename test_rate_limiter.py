@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test request pacing of the spider's rate limiters
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.rate_limiter import AimdRateLimiter, FixedDelayRateLimiter, RateLimiter, create_rate_limiter, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_limiter(limiter_class, **kwargs):
+    clock = FakeClock()
+    return limiter_class(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_fixed_delay_spaces_requests():
+    limiter, clock = make_limiter(FixedDelayRateLimiter, delay=5, backoff=360)
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.acquire()
+        return clock.now
+
+    assert asyncio.run(scenario()) == 10
+
+
+def test_aimd_increases_on_success_and_backs_off_on_throttle():
+    limiter, clock = make_limiter(
+        AimdRateLimiter, initial_rate=1, increase=0.5, decrease_factor=0.5, max_rate=3, backoff=60
+    )
+
+    for _ in range(10):
+        limiter.record(200)
+    assert limiter.rate == 3
+
+    limiter.record(406)
+    assert limiter.rate == 1.5
+    assert limiter.paused_until == clock.now + 60
+
+    limiter.record(429)
+    assert limiter.paused_until == clock.now + 120
+
+    limiter.record(503, retry_after=5)
+    assert limiter.consecutive_throttles == 3
+
+
+def test_aimd_honours_retry_after():
+    limiter, clock = make_limiter(AimdRateLimiter, initial_rate=10, burst=1)
+    limiter.record(429, retry_after=30)
+
+    async def scenario():
+        await limiter.acquire()
+        return clock.now
+
+    assert asyncio.run(scenario()) >= 30
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert create_rate_limiter("fixed").name == "fixed"
+
+
+def test_limiter_must_implement_the_whole_interface():
+    class NoSpacing(RateLimiter):
+        async def acquire(self) -> None:
+            pass
+
+        def record(self, status, retry_after=None) -> None:
+            pass
+
+        def describe(self) -> str:
+            return "no spacing"
+
+    for limiter_class in (RateLimiter, NoSpacing):
+        try:
+            limiter_class()
+        except TypeError:
+            continue
+        raise AssertionError(f"{limiter_class.__name__} was instantiated")
+
+
+if __name__ == "__main__":
+    test_fixed_delay_spaces_requests()
+    test_aimd_increases_on_success_and_backs_off_on_throttle()
+    test_aimd_honours_retry_after()
+    test_parse_retry_after()
+    test_limiter_must_implement_the_whole_interface()
+    print("Rate limiter tests passed!")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test content-hash change detection and the recrawl schedule
+"""
+
+import asyncio
+import sys
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+import app.database_operations as db_services
+from app.content import compact_article
+from app.database_operations import ChunkInsertResult, _prepare_rows, _with_conflict_handling
+from app.extractor import parse_article
+from app.models import Article
+from app.rate_limiter import FixedDelayRateLimiter
+from app.recrawl import RecrawlCandidate, RecrawlSchedule
+from app.spider import Spider
+from app.url_index import KnownUrlIndex
+from bench.corpus import build_corpus
+from bench.standin import StandinServer
+
+
+def test_schedule_checks_older_articles_less_often():
+    schedule = RecrawlSchedule.parse("72:6, 24:1,168:24")
+    now = datetime(2025, 8, 10, 12, 0)
+
+    assert schedule.horizon == timedelta(hours=168)
+    assert schedule.interval(timedelta(hours=2)) == timedelta(hours=1)
+    assert schedule.interval(timedelta(hours=30)) == timedelta(hours=6)
+    assert schedule.interval(timedelta(days=8)) is None
+
+    def candidate(age_hours, checked_hours_ago):
+        last_checked_at = None if checked_hours_ago is None else now - timedelta(hours=checked_hours_ago)
+        return RecrawlCandidate("/content/a", now - timedelta(hours=age_hours), last_checked_at, None)
+
+    assert schedule.is_due(candidate(5, None), now)
+    assert schedule.is_due(candidate(5, 1), now)
+    # A run starting a little early still counts
+    assert schedule.is_due(candidate(5, 0.95), now)
+    assert not schedule.is_due(candidate(30, 2), now)
+    assert schedule.is_due(candidate(30, 6), now)
+    assert not schedule.is_due(candidate(200, None), now)
+
+    for spec in ("24", "24:0", "a:b"):
+        try:
+            RecrawlSchedule.parse(spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"{spec} was accepted")
+
+
+def test_hash_ignores_markup_but_not_text():
+    article = {"title": "Title", "published_at": datetime(2025, 8, 1), "tags": ["World"]}
+    first = compact_article({**article, "content": "<p>Body text</p>"})
+    restyled = compact_article({**article, "content": '<div class="x"><p>Body  text</p></div>'})
+    edited = compact_article({**article, "content": "<p>Body text, corrected</p>"})
+    retitled = compact_article({**article, "title": "New title", "content": "<p>Body text</p>"})
+
+    assert first["content_hash"] == restyled["content_hash"]
+    assert first["content_hash"] != edited["content_hash"]
+    assert first["content_hash"] != retitled["content_hash"]
+
+
+def test_upsert_only_rewrites_changed_rows():
+    scraped_at = datetime(2025, 8, 2, 9, 0)
+    rows = _prepare_rows([{
+        "url": "/content/a", "title": "Title", "published_at": datetime(2025, 8, 1),
+        "scraped_at": scraped_at, "content": "<p>Body</p>"
+    }])
+    assert rows[0]["updated_at"] == rows[0]["last_checked_at"] == scraped_at
+
+    fields = list(rows[0])
+    stmt = _with_conflict_handling(pg_insert(Article).values(rows), fields, "update")
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (url) DO UPDATE SET" in sql
+    assert "WHERE article.content_hash IS DISTINCT FROM excluded.content_hash" in sql
+
+    stmt = _with_conflict_handling(pg_insert(Article).values(rows), fields, "nothing")
+    assert "DO NOTHING" in str(stmt.compile(dialect=postgresql.dialect()))
+
+
+
+@contextmanager
+def fake_recrawl_database(candidates: list[RecrawlCandidate], written: list[str], checked: list[str]):
+    """Stand in for the database functions a recrawl run calls for the duration of the block"""
+    async def get_recrawl_candidates(published_since):
+        return candidates
+
+    async def insert_article_chunk(articles, on_conflict="nothing"):
+        written.extend(article["url"] for article in articles)
+        return ChunkInsertResult(updated=len(articles))
+
+    async def mark_articles_checked(urls, checked_at):
+        checked.extend(urls)
+
+    fakes = {
+        "get_recrawl_candidates": get_recrawl_candidates,
+        "insert_article_chunk": insert_article_chunk,
+        "mark_articles_checked": mark_articles_checked,
+    }
+    originals = {name: getattr(db_services, name) for name in fakes}
+    for name, fake in fakes.items():
+        setattr(db_services, name, fake)
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(db_services, name, original)
+
+
+def test_recrawl_marks_unchanged_and_rejected_articles_checked():
+    corpus = build_corpus(article_count=20, per_page=10, paywall_ratio=0.25)
+    free = [row["url"] for row in corpus.rows if not row["paywalled"]]
+    paywalled = [row["url"] for row in corpus.rows if row["paywalled"]]
+    unchanged, changed = free[:3], free[3:5]
+    stored_hashes = {url: compact_article(parse_article(corpus.articles[url]))["content_hash"] for url in unchanged}
+    # Gone from the site: a failed fetch is retried on the next recrawl rather than marked
+    missing = "/content/removed"
+
+    now = datetime.now()
+    candidates = [
+        RecrawlCandidate(url, now - timedelta(hours=2), None, stored_hashes.get(url))
+        for url in [*unchanged, *changed, *paywalled[:2], missing]
+    ]
+    written, checked = [], []
+
+    async def scenario():
+        async with StandinServer(corpus) as server:
+            spider = Spider(origin=server.origin)
+            spider.known_urls = KnownUrlIndex([])
+            spider.http_cache.enabled = False
+            spider.create_rate_limiter = lambda: FixedDelayRateLimiter(delay=0)
+            await spider.run(recrawl=True)
+            return spider
+
+    with fake_recrawl_database(candidates, written, checked):
+        spider = asyncio.run(scenario())
+
+    assert sorted(written) == sorted(changed)
+    # Paywalled revisits wait for their next due visit like unchanged ones, not for the next recrawl
+    assert sorted(checked) == sorted([*unchanged, *paywalled[:2]])
+    assert (spider.stats.unchanged_articles, spider.stats.rejected_articles) == (3, 2)
+
+
+if __name__ == "__main__":
+    test_schedule_checks_older_articles_less_often()
+    test_hash_ignores_markup_but_not_text()
+    test_upsert_only_rewrites_changed_rows()
+    test_recrawl_marks_unchanged_and_rejected_articles_checked()
+    print("Recrawl tests passed!")
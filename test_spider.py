@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Test listing page helpers of the spider
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+
+from app.spider import get_articles_teasers, get_articles_urls, should_parse_article
+
+TEASER_TEMPLATE = """<li class="o-teaser-collection__item o-grid-row">
+<div class="o-teaser o-teaser--article o-teaser--small" data-id="{uuid}">
+<div class="o-teaser__meta"><a href="/world" class="o-teaser__tag">World</a></div>
+<div class="o-teaser__heading"><a href="/content/{uuid}" class="js-teaser-heading-link">Headline {uuid}</a></div>
+<p class="o-teaser__standfirst"><a href="/content/{uuid}" tabindex="-1">Standfirst</a></p>
+<div class="o-teaser__timestamp"><time data-o-component="o-date" class="o-date o-teaser__timestamp-date" datetime="{datetime}">{datetime}</time></div>
+</div></li>"""
+
+
+def render_listing(published: dict[str, str]) -> BeautifulSoup:
+    teasers = "".join(TEASER_TEMPLATE.format(uuid=uuid, datetime=value) for uuid, value in published.items())
+    return BeautifulSoup(
+        f'<nav><a href="/content/most-read">Most read</a></nav><ul class="o-teaser-collection__list">{teasers}</ul>',
+        "html.parser"
+    )
+
+
+def test_teaser_timestamps_are_extracted_per_article():
+    soup = render_listing({"a": "2025-08-03T10:01:04+0000", "b": "2025-08-03T09:00:00.000Z", "c": "soon"})
+
+    teasers = get_articles_teasers(soup)
+
+    assert list(teasers) == ["/content/most-read", "/content/a", "/content/b", "/content/c"]
+    assert teasers["/content/most-read"] is None
+    assert teasers["/content/a"] == datetime(2025, 8, 3, 10, 1, 4)
+    assert teasers["/content/b"] == datetime(2025, 8, 3, 9, 0)
+    assert teasers["/content/c"] is None
+    assert get_articles_urls(soup) == list(teasers)
+
+
+def test_should_parse_article_defaults_to_current_time():
+    assert should_parse_article(datetime.now() - timedelta(minutes=30), hours=1)
+    assert not should_parse_article(datetime.now() - timedelta(hours=2), hours=1)
+    assert should_parse_article(datetime.now() - timedelta(days=29), days=30)
+
+
+if __name__ == "__main__":
+    test_teaser_timestamps_are_extracted_per_article()
+    test_should_parse_article_defaults_to_current_time()
+    print("Spider tests passed!")
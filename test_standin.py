@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test the local ft.com stand-in used for load testing the spider
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+import app.config as config
+from app.extractor import parse_article
+from app.spider import Spider, get_articles_urls
+from bench.corpus import build_corpus
+from bench.standin import Faults, StandinServer
+
+
+async def get(session: aiohttp.ClientSession, url: str) -> tuple[int, str, str | None]:
+    async with session.get(url) as response:
+        return response.status, await response.text(), response.headers.get("Retry-After")
+
+
+def test_standin_serves_ft_shaped_pages():
+    corpus = build_corpus(article_count=20, per_page=10, paywall_ratio=0.5)
+
+    async def scenario():
+        async with StandinServer(corpus) as server, aiohttp.ClientSession() as session:
+            status, listing, _ = await get(session, f"{server.origin}/world?page=1")
+            urls = get_articles_urls(BeautifulSoup(listing, "html.parser"))
+            articles = [await get(session, server.origin + url) for url in urls]
+            missing, _, _ = await get(session, f"{server.origin}/world?page=99")
+            return status, urls, articles, missing, dict(server.stats)
+
+    status, urls, articles, missing, stats = asyncio.run(scenario())
+
+    assert status == 200
+    assert len(urls) == 10
+    parsed = [parse_article(text) for status, text, _ in articles if status == 200]
+    assert len(parsed) == 10
+    assert sum(article is None for article in parsed) == 5
+    assert missing == 404
+    assert stats == {200: 11, 404: 1}
+
+
+def test_standin_injects_throttling():
+    corpus = build_corpus(article_count=10, per_page=10)
+
+    async def scenario(faults: Faults):
+        async with StandinServer(corpus, faults) as server, aiohttp.ClientSession() as session:
+            return [await get(session, f"{server.origin}/world?page=1") for _ in range(20)]
+
+    throttled = asyncio.run(scenario(Faults(rate_429=1.0, retry_after=7, latency=0.01)))
+    assert {(status, retry_after) for status, _, retry_after in throttled} == {(429, "7")}
+
+    mixed = asyncio.run(scenario(Faults(rate_406=0.3, rate_5xx=0.3, seed=1)))
+    assert {status for status, _, _ in mixed} == {200, 406, 503}
+
+
+def test_spider_origin_is_configurable():
+    assert Spider.main_page_url == config.FT_ORIGIN + "/world?page={}"
+
+    spider = Spider(origin="http://127.0.0.1:8080/")
+    assert spider.base_url.format("/content/a") == "http://127.0.0.1:8080/content/a"
+    assert spider.main_page_url.format(2) == "http://127.0.0.1:8080/world?page=2"
+
+
+if __name__ == "__main__":
+    test_standin_serves_ft_shaped_pages()
+    test_standin_injects_throttling()
+    test_spider_origin_is_configurable()
+    print("Stand-in tests passed!")